@@ -0,0 +1,102 @@
+"""
+bench_hotpaths 기록 비교: 기준 실행(base)과 비교 실행(head)의 같은 (크기, 케이스, 지표)를 나란히 놓고
+threshold 비율 이상 느려진 항목을 회귀로 표시. 회귀가 있으면 종료 코드 1 (CI에서 사용)
+비교 지표: cold, warm 중앙값, 학습 단계별 시간. min_ms보다 작은 차이는 측정 잡음으로 보고 무시
+
+python -m benchmarks.bench_compare                         # 마지막 두 실행
+python -m benchmarks.bench_compare --base before-index --head -1 --threshold 0.15
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+from benchmarks.bench_hotpaths import HISTORY_PATH
+
+
+def load_history(path: str) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def select_run(history: List[dict], ref: str) -> dict:
+    """ref: 음수/양수 인덱스(-1은 마지막), label, 또는 commit 앞부분"""
+    try:
+        return history[int(ref)]
+    except ValueError:
+        pass
+    for run in reversed(history):
+        if run.get("label") == ref or (run.get("commit") or "").startswith(ref):
+            return run
+    raise KeyError(f"기록에서 찾을 수 없습니다: {ref}")
+
+def flatten(run: dict) -> Dict[Tuple[str, str, str], float]:
+    """{(크기, 케이스, 지표): ms}. 오류가 난 케이스는 빠짐"""
+    metrics = {}
+    for size, cases in run.get("results", {}).items():
+        for case, r in cases.items():
+            if "error" in r:
+                continue
+            metrics[(size, case, "cold")] = r["cold_ms"]
+            if "warm_ms" in r:
+                metrics[(size, case, "warm")] = r["warm_ms"]["median"]
+            for stage, ms in r.get("stages_ms", {}).items():
+                metrics[(size, case, f"stage:{stage}")] = ms
+    return metrics
+
+def compare(base: dict, head: dict, threshold: float = 0.10, min_ms: float = 1.0) -> List[dict]:
+    """두 실행에 모두 있는 지표별 비교 결과. status: regression / improvement / same"""
+    base_metrics, head_metrics = flatten(base), flatten(head)
+    rows = []
+    for key in sorted(base_metrics.keys() & head_metrics.keys()):
+        before, after = base_metrics[key], head_metrics[key]
+        change = (after - before) / before if before else 0.0
+        status = "same"
+        if abs(after - before) >= min_ms:
+            if change > threshold:
+                status = "regression"
+            elif change < -threshold:
+                status = "improvement"
+        size, case, metric = key
+        rows.append({"size": size, "case": case, "metric": metric, "base_ms": before, "head_ms": after, "change": change, "status": status})
+    return rows
+
+def describe(run: dict) -> str:
+    return f"{run.get('label') or run.get('commit')}{' +변경' if run.get('dirty') else ''} ({run.get('timestamp')})"
+
+MARKS = {"regression": "❌", "improvement": "✅", "same": "  "}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="bench_hotpaths 결과 비교")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--base", default="-2", help="기준 실행 (인덱스, label, commit)")
+    parser.add_argument("--head", default="-1", help="비교할 실행 (인덱스, label, commit)")
+    parser.add_argument("--threshold", type=float, default=0.10, help="회귀로 볼 변화 비율 (0.10 = 10%%)")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="이보다 작은 차이는 무시 (ms)")
+    parser.add_argument("--all", action="store_true", help="변화 없는 항목도 출력")
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+    base, head = select_run(history, args.base), select_run(history, args.head)
+    rows = compare(base, head, args.threshold, args.min_ms)
+
+    print(f"base: {describe(base)}\nhead: {describe(head)}\n")
+    print(f"   {'size':<8}{'case':<32}{'metric':<20}{'base ms':>10}{'head ms':>10}{'change':>9}")
+    for row in rows:
+        if row["status"] == "same" and not args.all:
+            continue
+        print(
+            f"{MARKS[row['status']]} {row['size']:<8}{row['case']:<32}{row['metric']:<20}"
+            f"{row['base_ms']:>10.1f}{row['head_ms']:>10.1f}{row['change'] * 100:>8.1f}%"
+        )
+
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n⚠️ {len(regressions)}개 항목이 {args.threshold * 100:.0f}% 이상 느려졌습니다.")
+        sys.exit(1)
+    print(f"\n✅ 회귀 없음 ({len(rows)}개 항목 비교)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+int8 임베더(src.embedder_quant) 검증: 성공률 예측 일치도 + fp32 대비 encode 지연/메모리
+1) 일치도: DB의 퀘스트 표본을 fp32 임베더와 int8 임베더로 각각 model.predict_success_rate에 넣어
+   임베딩 코사인 유사도, 예측 확률 차이(평균/최대), 0.5 기준 판정 일치율, 실제 완료 여부에 대한 AUC를 비교
+   최대 차이가 --tolerance를 넘거나 판정 일치율이 --min-agreement보다 낮으면 종료 코드 1
+2) 지연/메모리: 모드마다 새 프로세스에서 임베더만 로드하고 퀘스트 이름 하나씩 encode (p50/p90), 로드 전후 RSS/USS 증가량
+
+DATABASE_URL의 DB를 읽기만 함
+python -m benchmarks.bench_embedder_quant --samples 500 --repeat 200
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+WORKER_TIMEOUT = 1800
+
+
+# ----------------------------
+# 일치도
+def sample_quests(n: int, seed: int):
+    from sqlalchemy import select
+    from src.database import SessionLocal, Quest, init_db
+
+    init_db()
+    db = SessionLocal()
+    try:
+        ids = db.execute(select(Quest.id).order_by(Quest.id)).scalars().all()
+        if not ids:
+            raise SystemExit("DB에 퀘스트가 없습니다. python -m src.seed를 먼저 실행하세요.")
+        picked = np.random.default_rng(seed).choice(ids, size=min(n, len(ids)), replace=False).tolist()
+        rows = []
+        for start in range(0, len(picked), 500):
+            rows += db.execute(
+                select(Quest.user_id, Quest.name, Quest.motivation, Quest.duration, Quest.difficulty, Quest.completed)
+                .where(Quest.id.in_(picked[start:start + 500]))
+            ).all()
+    finally:
+        db.close()
+    return rows
+
+def predict_all(rows, ml_model, embedder, projector=None):
+    from src import model
+
+    model.ML_MODEL, model.EMBEDDER, model.PROJECTOR = ml_model, embedder, projector
+    return np.array([
+        model.predict_success_rate(r.user_id, r.name, r.duration, r.difficulty, motivation=r.motivation)
+        for r in rows
+    ])
+
+def auc(y, scores):
+    from sklearn.metrics import roc_auc_score
+
+    return float(roc_auc_score(y, scores)) if len(set(y)) == 2 else None
+
+def parity(ml_model, fp32, int8, rows, projector=None) -> dict:
+    texts = [f"{r.name} {r.motivation or ''}" for r in rows]
+    a, b = fp32.encode(texts), int8.encode(texts)
+    cosine = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+    p32, p8 = predict_all(rows, ml_model, fp32, projector), predict_all(rows, ml_model, int8, projector)
+    diff = np.abs(p32 - p8)
+    y = [int(bool(r.completed)) for r in rows]
+    return {
+        "samples": len(rows),
+        "cosine_mean": float(cosine.mean()),
+        "cosine_min": float(cosine.min()),
+        "prob_diff_mean": float(diff.mean()),
+        "prob_diff_max": float(diff.max()),
+        "decision_agreement": float(((p32 >= 0.5) == (p8 >= 0.5)).mean()),
+        "auc_fp32": auc(y, p32),
+        "auc_int8": auc(y, p8),
+    }
+
+
+# ----------------------------
+# 지연 / 메모리 (워커 프로세스)
+def run_worker(embedder_path: str, repeat: int, texts, out_path: str):
+    import torch
+    from src.serve import memory_usage
+    from src.thread_budget import apply_policy
+
+    # 두 모드 모두 요청당 스레드 1개(웹 워커와 같은 조건)
+    apply_policy("server", verbose=False)
+    # 라이브러리 임포트 비용은 두 모드가 같으므로 로드 전에 미리 임포트해 가중치 메모리만 비교
+    import sentence_transformers  # noqa: F401
+    before = memory_usage(os.getpid())
+    embedder = torch.load(embedder_path, map_location="cpu", weights_only=False)
+    loaded = memory_usage(os.getpid())
+
+    embedder.encode(texts[0])
+    latencies = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        embedder.encode(texts[i % len(texts)])
+        latencies.append((time.perf_counter() - started) * 1000)
+    after = memory_usage(os.getpid())
+
+    latencies.sort()
+    result = {
+        "max_seq_length": getattr(embedder, "max_seq_length", None),
+        "encode_ms": {"p50": statistics.median(latencies), "p90": latencies[int(len(latencies) * 0.9)], "min": latencies[0]},
+    }
+    if before and after:
+        result["rss_mib"] = after["rss"] / 1024
+        result["load_rss_mib"] = (loaded["rss"] - before["rss"]) / 1024
+        result["load_uss_mib"] = (loaded["uss"] - before["uss"]) / 1024
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+def run_mode(mode: str, args, embedder_path: str, texts_path: str, workdir: str) -> dict:
+    out_path = os.path.join(workdir, f"{mode}.json")
+    cmd = [
+        sys.executable, "-m", "benchmarks.bench_embedder_quant", "--worker", embedder_path,
+        "--repeat", str(args.repeat), "--texts", texts_path, "--out", out_path,
+    ]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=WORKER_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timeout ({WORKER_TIMEOUT}s)"}
+    if not os.path.exists(out_path):
+        tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or [f"exit {proc.returncode}"]
+        return {"error": tail[0]}
+    with open(out_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="int8 임베더 일치도/지연/메모리 비교")
+    parser.add_argument("--model-path", default="model/model.pkl")
+    parser.add_argument("--samples", type=int, default=500, help="일치도 검사에 쓸 퀘스트 수")
+    parser.add_argument("--repeat", type=int, default=200, help="encode 지연 측정 횟수")
+    parser.add_argument("--max-seq-length", type=int, default=None, help="기본값: EMBEDDER_MAX_SEQ_LENGTH")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="허용할 예측 확률 최대 차이")
+    parser.add_argument("--min-agreement", type=float, default=0.98, help="허용할 최소 판정 일치율")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json-out", default=None)
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--texts", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--out", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        with open(args.texts, encoding="utf-8") as f:
+            texts = json.load(f)
+        return run_worker(args.worker, args.repeat, texts, args.out)
+
+    import joblib
+    from src.embedder_quant import EMBEDDER_MAX_SEQ_LENGTH, quantize_embedder, save_quantized
+
+    loaded = joblib.load(args.model_path)
+    if not (isinstance(loaded, tuple) and len(loaded) >= 2):
+        raise SystemExit(f"{args.model_path}에 임베더가 없습니다. python -m src.train을 먼저 실행하세요.")
+    ml_model, fp32 = loaded[:2]
+    projector = loaded[2] if len(loaded) > 2 else None
+    max_seq_length = args.max_seq_length or EMBEDDER_MAX_SEQ_LENGTH
+    int8 = quantize_embedder(fp32, max_seq_length)
+
+    rows = sample_quests(args.samples, args.seed)
+    report = {"max_seq_length": max_seq_length, "parity": parity(ml_model, fp32, int8, rows, projector)}
+
+    workdir = tempfile.mkdtemp(prefix="bench-quant-")
+    try:
+        # 두 모드 모두 임베더만 같은 형식(torch.save)으로 저장해 워커에서 로드 (랜덤 포레스트 메모리가 섞이지 않도록)
+        paths = {mode: os.path.join(workdir, f"embedder_{mode}.pt") for mode in ("fp32", "int8")}
+        save_quantized(fp32, paths["fp32"])
+        save_quantized(int8, paths["int8"])
+        report["artifact_mib"] = {mode: os.path.getsize(path) / 2**20 for mode, path in paths.items()}
+        texts_path = os.path.join(workdir, "texts.json")
+        with open(texts_path, "w", encoding="utf-8") as f:
+            json.dump([r.name for r in rows], f, ensure_ascii=False)
+        report["modes"] = {mode: run_mode(mode, args, path, texts_path, workdir) for mode, path in paths.items()}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    p = report["parity"]
+    fmt = lambda v: "n/a" if v is None else f"{v:.3f}"
+    print(f"\n=== 일치도 (퀘스트 {p['samples']}개, max_seq_length {max_seq_length}) ===")
+    print(f"임베딩 코사인 유사도: 평균 {p['cosine_mean']:.4f}, 최소 {p['cosine_min']:.4f}")
+    print(f"예측 확률 차이: 평균 {p['prob_diff_mean']:.4f}, 최대 {p['prob_diff_max']:.4f}")
+    print(f"0.5 기준 판정 일치율: {p['decision_agreement'] * 100:.1f}%, AUC fp32 {fmt(p['auc_fp32'])} / int8 {fmt(p['auc_int8'])}")
+    sizes = report["artifact_mib"]
+    print(f"\n=== encode 지연/메모리 (파일 크기 fp32 {sizes['fp32']:.1f} MiB → int8 {sizes['int8']:.1f} MiB) ===")
+    print(f"{'mode':<6}{'p50 ms':>9}{'p90 ms':>9}{'로드 RSS':>11}{'로드 USS':>11}{'RSS':>9}")
+    for mode, r in report["modes"].items():
+        if "error" in r:
+            print(f"{mode:<6}  ⚠️ {r['error']}")
+            continue
+        print(f"{mode:<6}{r['encode_ms']['p50']:>9.1f}{r['encode_ms']['p90']:>9.1f}"
+              f"{r.get('load_rss_mib', float('nan')):>11.1f}{r.get('load_uss_mib', float('nan')):>11.1f}{r.get('rss_mib', float('nan')):>9.1f}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"✅ 결과 저장: {args.json_out}")
+
+    if p["prob_diff_max"] > args.tolerance or p["decision_agreement"] < args.min_agreement:
+        print(f"⚠️ 일치도 기준 미달 (최대 차이 {args.tolerance}, 판정 일치율 {args.min_agreement}): int8을 켜기 전에 max_seq_length를 늘리거나 fp32 유지")
+        sys.exit(1)
+    print("✅ 일치도 기준 통과")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+임베딩 차원 축소(train.py의 EMBEDDING_DIM/EMBEDDING_PROJECTION) 평가
+시드 DB로 학습 데이터와 임베딩을 한 번 만든 뒤 방법(pca/random) x 차원마다 성공 여부 모델을 다시 학습하고
+테스트 정확도/AUC, 변환+모델 학습 시간, 예측 한 건(차원 축소 + 1행 DataFrame + predict_proba) 지연을 비교
+차원 0은 축소하지 않은 원래 384차원 (기준선)
+
+- 차원 축소 변환은 학습 분할(75%)의 임베딩으로만 맞추므로 평가 분할의 정확도/AUC에 평가 데이터가 새지 않음
+- 학습은 trainer 스레드 예산, 예측 지연은 웹 워커와 같게 n_jobs=1로 측정
+- 임베더는 기본으로 허깅페이스 모델을 받으며, --embedder로 로컬에 저장한 SentenceTransformer 경로를 지정 가능
+
+python -m benchmarks.bench_embedding_dims --size small --dims 0,8,16,32,64,128 --methods pca,random
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_hotpaths import SIZES
+from benchmarks.loadtest import prepare_database
+
+
+def predict_latency(model, projector, X_test, raw_embeddings, repeat: int) -> dict:
+    """예측 한 건: 원래 임베딩을 줄이고 피처와 합쳐 1행 DataFrame으로 predict_proba (model.py와 같은 순서)"""
+    import pandas as pd
+    from src.model import project_embeddings
+
+    emb_cols = [c for c in X_test.columns if c.startswith("emb_")]
+    base = X_test.drop(columns=emb_cols)
+    columns = list(base.columns) + emb_cols
+    latencies = []
+    for i in range(repeat):
+        row = i % len(X_test)
+        started = time.perf_counter()
+        emb = project_embeddings(projector, raw_embeddings[row:row + 1])[0]
+        df = pd.DataFrame([np.concatenate([base.iloc[row].to_numpy(dtype=float), emb])], columns=columns)
+        model.predict_proba(df[X_test.columns])
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {"p50": statistics.median(latencies), "p90": latencies[int(len(latencies) * 0.9)]}
+
+def evaluate(df, embeddings, method: str, dim: int, repeat: int) -> dict:
+    from sklearn.metrics import roc_auc_score
+    from src.thread_budget import limit_estimator_jobs
+    from src.train import fit_success_model
+
+    timings = {}
+    # 변환은 fit_success_model 안에서 학습 분할의 임베딩으로만 맞춤 (평가 분할은 정확도/AUC/지연 측정에만 사용)
+    model, projector, accuracy, X_test, y_test = fit_success_model(df, embeddings, dim, method, timings)
+
+    limit_estimator_jobs(model, 1)
+    proba = model.predict_proba(X_test)[:, 1]
+    return {
+        "method": method if projector is not None else "none",
+        "dim": projector.n_components_ if projector is not None else embeddings.shape[1],
+        "features": X_test.shape[1],
+        "accuracy": accuracy,
+        "auc": float(roc_auc_score(y_test, proba)) if len(set(y_test)) == 2 else None,
+        "train_s": timings["fit_projection"] + timings["project"] + timings["fit"],
+        "predict_ms": predict_latency(model, projector, X_test, embeddings[X_test.index.to_numpy()], repeat),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="임베딩 차원 축소별 정확도/학습 시간/예측 지연 비교")
+    parser.add_argument("--size", default="small", help=f"시드 DB 크기 ({', '.join(SIZES)})")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dims", default="0,8,16,32,64,128", help="줄일 차원, 쉼표로 구분 (0 = 축소 안 함)")
+    parser.add_argument("--methods", default="pca,random")
+    parser.add_argument("--repeat", type=int, default=200, help="예측 지연 측정 횟수")
+    parser.add_argument("--embedder", default=None, help="로컬 SentenceTransformer 경로 (기본: 허깅페이스 모델)")
+    parser.add_argument("--json-out", default=None)
+    args = parser.parse_args(argv)
+    if args.size not in SIZES:
+        parser.error(f"알 수 없는 크기: {args.size}")
+
+    workdir = tempfile.mkdtemp(prefix="bench-dims-")
+    try:
+        # src는 DATABASE_URL을 정한 뒤에 임포트 (학습이 User 통계를 갱신하므로 복사본 사용)
+        os.environ["DATABASE_URL"] = f"sqlite:///{prepare_database(args.size, args.seed, workdir, SIZES)}"
+        from src.thread_budget import apply_policy
+        from src.train import prepare_training_data
+
+        apply_policy("trainer")
+        embedder = None
+        if args.embedder:
+            from sentence_transformers import SentenceTransformer
+            embedder = SentenceTransformer(args.embedder, device="cpu")
+        df, embeddings, _ = prepare_training_data(embedder=embedder)
+
+        dims = [int(d) for d in args.dims.split(",")]
+        runs = [("none", 0)] if 0 in dims else []
+        runs += [(method, dim) for method in args.methods.split(",") for dim in dims if dim]
+        results = []
+        for method, dim in runs:
+            print(f"⏳ {method} {dim or embeddings.shape[1]}차원 학습 중 ...")
+            results.append(evaluate(df, embeddings, method, dim, args.repeat))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    fmt = lambda v: "n/a" if v is None else f"{v:.3f}"
+    print(f"\n=== {args.size} (학습 데이터 {len(df)}행, 원래 임베딩 {embeddings.shape[1]}차원) ===")
+    print(f"{'method':<8}{'dim':>5}{'피처':>6}{'정확도':>8}{'AUC':>8}{'학습 s':>9}{'예측 p50':>10}{'p90 ms':>8}")
+    for r in results:
+        print(f"{r['method']:<8}{r['dim']:>5}{r['features']:>6}{r['accuracy']:>8.3f}{fmt(r['auc']):>8}"
+              f"{r['train_s']:>9.2f}{r['predict_ms']['p50']:>10.2f}{r['predict_ms']['p90']:>8.2f}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"size": args.size, "rows": len(df), "results": results}, f, ensure_ascii=False, indent=1)
+        print(f"✅ 결과 저장: {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+벤치마크: async 라우트에서의 이벤트 루프 지연
+같은 대시보드/캘린더 쿼리를 (1) async def 안에서 sync 세션으로 실행할 때와 (2) aiosqlite async 세션으로 실행할 때
+동시 요청 처리량과 이벤트 루프 지연(1ms sleep이 실제로 얼마나 늦게 깨어나는지)을 비교
+
+python -m benchmarks.bench_event_loop --concurrency 32 --seconds 5 --quests 20000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from src.database import Base, User, Quest, UserDailyActivity
+from src.habit_analysis import user_progress_statements, success_rate_by_category_statements, growth_trend_statements, fetch_plot_data, fetch_plot_data_async
+from src.migrations import run_migrations
+from src.storage import create_configured_engine, create_configured_async_engine
+
+USERS = 50
+
+
+def seed(engine, quests):
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": u, "name": f"u{u}", "email": f"u{u}@bench.local"} for u in range(1, USERS + 1)])
+        conn.execute(insert(Quest), [
+            {"user_id": rng.randint(1, USERS), "name": f"퀘스트_{i}", "category": rng.choice(["study", "health", "work"]),
+             "duration": 7, "difficulty": 3, "completed": rng.random() < 0.5, "success_rate": rng.random()}
+            for i in range(quests)
+        ])
+        conn.execute(insert(UserDailyActivity), [
+            {"user_id": u, "date": date.today() - timedelta(days=d), "completions": 1, "progress_events": 0}
+            for u in range(1, USERS + 1) for d in range(300)
+        ])
+
+
+def statements_for(user_id):
+    return {**user_progress_statements(user_id), **success_rate_by_category_statements(user_id), **growth_trend_statements(user_id)}
+
+
+async def measure(handler, concurrency, seconds):
+    lags, done = [], 0
+    stop = time.perf_counter() + seconds
+
+    async def probe():
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - t0 - 0.001)
+
+    async def client(n):
+        nonlocal done
+        rng = random.Random(n)
+        while time.perf_counter() < stop:
+            await handler(rng.randint(1, USERS))
+            done += 1
+
+    await asyncio.gather(probe(), *(client(n) for n in range(concurrency)))
+    lags.sort()
+    return {
+        "req_per_sec": done / seconds,
+        "lag_p50_ms": statistics.median(lags) * 1000,
+        "lag_p99_ms": lags[int(len(lags) * 0.99) - 1] * 1000,
+        "lag_max_ms": lags[-1] * 1000,
+    }
+
+
+async def main_async(args):
+    workdir = tempfile.mkdtemp(prefix="bench_loop_")
+    url = f"sqlite:///{os.path.join(workdir, 'bench.sqlite3')}"
+    engine = create_configured_engine(url)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    seed(engine, args.quests)
+
+    SyncSession = sessionmaker(bind=engine)
+    async_engine = create_configured_async_engine(url)
+    AsyncSession = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def sync_in_async(user_id):
+        # 기존 방식: async def 라우트 안에서 sync 세션 사용 (쿼리 동안 루프가 멈춤)
+        db = SyncSession()
+        try:
+            fetch_plot_data(db, statements_for(user_id))
+        finally:
+            db.close()
+
+    async def fully_async(user_id):
+        async with AsyncSession() as db:
+            await fetch_plot_data_async(db, statements_for(user_id))
+
+    print(f"concurrency={args.concurrency}, seconds={args.seconds}, quests={args.quests}")
+    print(f"{'mode':<16}{'req/s':>10}{'lag p50':>10}{'lag p99':>10}{'lag max':>10}  (ms)")
+    for name, handler in (("sync session", sync_in_async), ("async session", fully_async)):
+        r = await measure(handler, args.concurrency, args.seconds)
+        print(f"{name:<16}{r['req_per_sec']:>10.1f}{r['lag_p50_ms']:>10.2f}{r['lag_p99_ms']:>10.2f}{r['lag_max_ms']:>10.2f}")
+
+    await async_engine.dispose()
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sync vs async DB 세션의 이벤트 루프 지연 비교")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--quests", type=int, default=20000)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+ML/분석 핫패스 마이크로벤치마크
+시드 DB 크기별로 model.predict_success_rate, crud.get_similar_quests, crud.calculate_streak_days,
+habit_analysis.plot_*, local_coach.local_recommendation(DB로 만든 유사 퀘스트 인덱스), utils.load_data, train.train_model(단계별)을 cold(새 프로세스의 첫 호출)와 warm(반복 호출)으로 측정하고
+결과를 JSON 기록 파일(benchmarks/results/history.json)에 실행마다 추가. 비교는 benchmarks.bench_compare로
+
+- 케이스마다 새 프로세스에서 실행 (앞 케이스가 불러 둔 모델/임베더가 다음 케이스의 cold 측정에 섞이지 않도록)
+- 사용자 단위 케이스는 퀘스트가 가장 많은 사용자로 측정 (최악의 경우)
+- 학습은 임시 경로에 모델을 저장하므로 model/model.pkl은 바뀌지 않음
+
+python -m benchmarks.bench_hotpaths --size small,medium --repeat 20
+python -m benchmarks.bench_hotpaths --size large --cases predict,similar,streak --label "after-index"
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+from benchmarks.loadtest import prepare_database
+
+# 시드 DB 크기 프리셋 (src.seed 옵션)
+SIZES = {
+    "small": {"users": 100, "quests-per-user": 20},
+    "medium": {"users": 1000, "quests-per-user": 40, "quest-dist": "poisson"},
+    "large": {"users": 5000, "quests-per-user": 80, "quest-dist": "lognormal", "events-per-quest": 2},
+}
+# 학습은 DB(User 통계)를 갱신하므로 마지막에 실행
+CASES = [
+    "predict", "similar", "streak",
+    "plot_user_progress", "plot_success_rate_by_category", "plot_growth_trend", "plot_focus_area",
+    "local_coach", "load_data", "train",
+]
+HISTORY_PATH = os.path.join("benchmarks", "results", "history.json")
+SAMPLE_QUEST = ("매일 30분 운동하기", "exercise", 14, 3)
+CASE_TIMEOUT = 1800
+
+
+# ----------------------------
+# 측정 (워커 프로세스)
+# train 케이스의 단계별 소요 시간(초), train.train_model(timings=)이 채움
+stages: Dict[str, float] = {}
+
+def measure(fn: Callable, repeat: int) -> dict:
+    """첫 호출(cold)과 이후 repeat번 호출(warm)의 소요 시간(ms)"""
+    started = time.perf_counter()
+    fn()
+    cold = (time.perf_counter() - started) * 1000
+
+    warm = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        warm.append((time.perf_counter() - started) * 1000)
+
+    result = {"cold_ms": cold}
+    if warm:
+        warm.sort()
+        result["warm_ms"] = {
+            "median": statistics.median(warm),
+            "p90": warm[min(len(warm) - 1, int(len(warm) * 0.9))],
+            "min": warm[0],
+        }
+        result["runs"] = len(warm)
+    return result
+
+def make_case(case: str, db, user_id: int, model_path: str, workdir: str) -> Callable:
+    # src는 워커에서 DATABASE_URL을 지정한 뒤에 임포트
+    from src import crud, habit_analysis, local_coach, model, train, utils
+
+    name, category, duration, difficulty = SAMPLE_QUEST
+    if case == "predict":
+        model.MODEL_PATH = model_path
+        return lambda: model.predict_success_rate(user_id, name, duration, difficulty, category)
+    if case == "similar":
+        return lambda: crud.get_similar_quests(db, user_id, name, category)
+    if case == "streak":
+        return lambda: crud.calculate_streak_days(db, user_id)
+    if case in habit_analysis.PLOTS:
+        return lambda: getattr(habit_analysis, case)(db, user_id)
+    if case == "local_coach":
+        # 인덱스 구축(DB 조회)은 한 번만 하고 조언 생성(행렬곱 + argpartition)만 측정
+        local_coach.ensure_index(force=True)
+        return lambda: local_coach.local_recommendation(name, duration, difficulty, 3, 3, 20, 10, category=category)
+    if case == "load_data":
+        return utils.load_data
+    if case == "train":
+        return lambda: train.train_model(model_path=os.path.join(workdir, "bench_model.pkl"), timings=stages)
+    raise ValueError(f"알 수 없는 케이스: {case}")
+
+def run_worker(case: str, repeat: int, model_path: str, out_path: str):
+    from sqlalchemy import func, select
+    from src.database import SessionLocal, Quest
+
+    db = SessionLocal()
+    try:
+        user_id = db.execute(
+            select(Quest.user_id).group_by(Quest.user_id).order_by(func.count().desc(), Quest.user_id).limit(1)
+        ).scalar() or 1
+        fn = make_case(case, db, user_id, model_path, os.path.dirname(out_path))
+        try:
+            # 학습은 한 번만 (cold)
+            result = measure(fn, 0 if case == "train" else repeat)
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        result["user_id"] = user_id
+        if stages:
+            result["stages_ms"] = {stage: sec * 1000 for stage, sec in stages.items()}
+    finally:
+        db.close()
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+# ----------------------------
+# 실행 / 기록
+def run_case(case: str, db_path: str, args, workdir: str) -> dict:
+    out_path = os.path.join(workdir, f"{case}.json")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", DB_PROFILE=os.getenv("DB_PROFILE", "production"))
+    cmd = [
+        sys.executable, "-m", "benchmarks.bench_hotpaths", "--worker", case,
+        "--repeat", str(args.repeat), "--model-path", os.path.abspath(args.model_path), "--out", out_path,
+    ]
+    try:
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=CASE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timeout ({CASE_TIMEOUT}s)"}
+    if not os.path.exists(out_path):
+        tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or [f"exit {proc.returncode}"]
+        return {"error": tail[0]}
+    with open(out_path, encoding="utf-8") as f:
+        return json.load(f)
+
+def git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+def append_history(path: str, record: dict):
+    history = []
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            history = json.load(f)
+    history.append(record)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+def print_results(size: str, results: Dict[str, dict]):
+    print(f"\n=== {size} ===")
+    print(f"{'case':<32}{'cold ms':>10}{'warm p50':>10}{'warm p90':>10}")
+    for case, r in results.items():
+        if "error" in r:
+            print(f"{case:<32}  ⚠️ {r['error']}")
+            continue
+        warm = r.get("warm_ms", {})
+        print(f"{case:<32}{r['cold_ms']:>10.1f}{warm.get('median', float('nan')):>10.1f}{warm.get('p90', float('nan')):>10.1f}")
+        for stage, ms in r.get("stages_ms", {}).items():
+            print(f"  └ {stage:<28}{ms:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ML/분석 핫패스 마이크로벤치마크")
+    parser.add_argument("--size", default="small,medium", help=f"시드 DB 크기, 쉼표로 여러 개 ({', '.join(SIZES)})")
+    parser.add_argument("--cases", default=",".join(CASES), help="측정할 케이스, 쉼표로 구분")
+    parser.add_argument("--repeat", type=int, default=20, help="warm 반복 횟수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--model-path", default="model/model.pkl", help="predict에 쓸 모델 파일")
+    parser.add_argument("--history", default=HISTORY_PATH, help="결과를 추가할 JSON 기록 파일")
+    parser.add_argument("--label", default=None, help="이 실행의 이름 (비교 시 참조용)")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--out", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        return run_worker(args.worker, args.repeat, args.model_path, args.out)
+
+    cases = args.cases.split(",")
+    for case in cases:
+        if case not in CASES:
+            parser.error(f"알 수 없는 케이스: {case} (가능: {', '.join(CASES)})")
+
+    commit, dirty = git_revision()
+    record = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "label": args.label,
+        "commit": commit,
+        "dirty": dirty,
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPU",
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": {},
+    }
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    try:
+        for size in args.size.split(","):
+            if size not in SIZES:
+                parser.error(f"알 수 없는 크기: {size}")
+            db_path = prepare_database(size, args.seed, workdir, SIZES)
+            results = {}
+            for case in [c for c in CASES if c in cases]:
+                case_dir = os.path.join(workdir, size)
+                os.makedirs(case_dir, exist_ok=True)
+                results[case] = run_case(case, db_path, args, case_dir)
+            record["results"][size] = results
+            print_results(size, results)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    append_history(args.history, record)
+    print(f"\n✅ 결과 기록: {args.history} (commit {commit}{' +변경' if dirty else ''})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+스레드 예산(src.thread_budget)별 추론 처리량 비교
+설정마다 새 프로세스에서(torch/BLAS 스레드 수는 프로세스 전역이라) 동시 요청 수를 바꿔가며
+성공률 예측의 두 단계(문장 임베딩 encode, 랜덤 포레스트 predict_proba)를 반복 호출하고 초당 처리 수와 p50/p99 지연을 측정
+
+- default: 정책 적용 전 (torch 기본 스레드 수, 모델에 저장된 n_jobs=-1), server/inference: 역할별 정책, tN: 모든 값을 N으로 고정
+- 포레스트는 train.py와 같은 하이퍼파라미터로 임의 데이터에 학습한 모델을 사용 (--model-path로 실제 model.pkl 지정 가능)
+- 임베더를 불러올 수 없으면(오프라인 등) encode 단계는 건너뛰고 포레스트만 측정
+
+python -m benchmarks.bench_threads --settings default,server,inference,t2 --concurrency 1,4,16 --duration 5
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+SETTINGS = ["default", "server", "inference"]
+EMBEDDING_WIDTH = 384  # paraphrase-multilingual-MiniLM-L12-v2
+FEATURES = 8 + 14  # 수치형 + 카테고리 OHE (train.py)
+SAMPLE_TEXTS = ["매일 30분 운동하기 건강", "영어 단어 20개 외우기", "책 한 챕터 읽기 습관", "주 3회 코딩 공부"]
+WORKER_TIMEOUT = 1800
+
+
+def build_forest(path: str, rows: int = 2000, seed: int = 42):
+    """train.py와 같은 구조(CalibratedClassifierCV(RandomForest), n_jobs=-1, 임베딩 피처 수)를 임의 데이터로 학습해 저장"""
+    import joblib
+    import numpy as np
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.ensemble import RandomForestClassifier
+    from src.train import EMBEDDING_DIM
+
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, FEATURES + (EMBEDDING_DIM or EMBEDDING_WIDTH))).astype(np.float32)
+    y = (X[:, 0] + rng.normal(scale=2, size=rows) > 0).astype(int)
+    rf = RandomForestClassifier(n_estimators=500, max_depth=18, class_weight={0: 1.0, 1: 3.0}, n_jobs=-1, random_state=seed)
+    joblib.dump(CalibratedClassifierCV(rf, cv=3).fit(X, y), path)
+
+
+# ----------------------------
+# 측정 (워커 프로세스)
+def load_workload(setting: str, model_path: str, workers: int):
+    import joblib
+    import numpy as np
+    from src import thread_budget
+
+    if setting in ("server", "inference"):
+        thread_budget.apply_policy(setting, workers=workers)
+    elif setting.startswith("t"):
+        os.environ.update({"THREADS_TORCH": setting[1:], "THREADS_BLAS": setting[1:], "THREADS_N_JOBS": setting[1:]})
+        thread_budget.apply_policy("inference", workers=workers)
+
+    forest = joblib.load(model_path)
+    if isinstance(forest, tuple):
+        forest = forest[0]
+    if thread_budget.current():
+        thread_budget.limit_estimator_jobs(forest)
+    row = np.random.default_rng(0).normal(size=(1, getattr(forest, "n_features_in_", FEATURES + EMBEDDING_WIDTH)))
+
+    embedder = None
+    try:
+        from sentence_transformers import SentenceTransformer
+        embedder = SentenceTransformer("sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2", device="cpu")
+    except Exception as e:
+        print(f"⚠️ 임베더를 불러오지 못해 encode 단계는 건너뜀: {type(e).__name__}")
+
+    def predict(i: int):
+        if embedder is not None:
+            embedder.encode(SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)])
+        forest.predict_proba(row)
+
+    return predict, embedder is not None
+
+def run_load(fn, concurrency: int, duration: float) -> dict:
+    """concurrency개 스레드가 duration초 동안 fn을 반복 호출"""
+    latencies: List[float] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def loop(tid: int):
+        local, i = [], tid
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            fn(i)
+            local.append(time.perf_counter() - started)
+            i += concurrency
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=loop, args=(t,)) for t in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000 if latencies else float("nan")
+    return {"ops": len(latencies), "ops_per_sec": len(latencies) / elapsed, "p50_ms": pick(0.5), "p99_ms": pick(0.99)}
+
+def run_worker(setting: str, model_path: str, workers: int, concurrency: List[int], duration: float, out_path: str):
+    predict, with_encode = load_workload(setting, model_path, workers)
+    predict(0)  # 첫 호출(지연 초기화)은 측정에서 제외
+
+    import torch
+    from src import thread_budget
+
+    result = {
+        "torch_threads": torch.get_num_threads(),
+        "n_jobs": thread_budget.n_jobs(),
+        "encode": with_encode,
+        "load": {str(c): run_load(predict, c, duration) for c in concurrency},
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+# ----------------------------
+# 실행
+def run_setting(setting: str, args, model_path: str, workdir: str) -> dict:
+    out_path = os.path.join(workdir, f"{setting}.json")
+    cmd = [
+        sys.executable, "-m", "benchmarks.bench_threads", "--worker", setting, "--model-path", model_path,
+        "--workers", str(args.workers), "--concurrency", args.concurrency, "--duration", str(args.duration), "--out", out_path,
+    ]
+    # 부모의 스레드 관련 환경 변수가 default 설정에 섞이지 않도록 제거
+    env = {k: v for k, v in os.environ.items() if not k.startswith("THREADS_")}
+    try:
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=WORKER_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timeout ({WORKER_TIMEOUT}s)"}
+    if not os.path.exists(out_path):
+        tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or [f"exit {proc.returncode}"]
+        return {"error": tail[0]}
+    with open(out_path, encoding="utf-8") as f:
+        return json.load(f)
+
+def print_results(results: Dict[str, dict]):
+    print(f"\n{'setting':<12}{'torch':>6}{'n_jobs':>7}{'동시':>6}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for setting, r in results.items():
+        if "error" in r:
+            print(f"{setting:<12}  ⚠️ {r['error']}")
+            continue
+        for concurrency, load in r["load"].items():
+            print(f"{setting:<12}{r['torch_threads']:>6}{r['n_jobs']:>7}{concurrency:>6}"
+                  f"{load['ops_per_sec']:>10.1f}{load['p50_ms']:>10.1f}{load['p99_ms']:>10.1f}")
+    if not any(r.get("encode") for r in results.values()):
+        print("⚠️ encode 단계 없이 포레스트 predict_proba만 측정했습니다.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="스레드 예산별 추론 처리량 비교")
+    parser.add_argument("--settings", default=",".join(SETTINGS), help="default, server, inference, tN(N개 고정), 쉼표로 구분")
+    parser.add_argument("--concurrency", default="1,4,16", help="동시 호출 스레드 수, 쉼표로 구분")
+    parser.add_argument("--duration", type=float, default=5, help="동시 수준별 측정 시간(초)")
+    parser.add_argument("--workers", type=int, default=1, help="같은 머신의 웹 워커 수 (inference 역할의 코어 분배)")
+    parser.add_argument("--model-path", default=None, help="측정할 모델 파일 (없으면 임의 데이터로 학습)")
+    parser.add_argument("--json-out", default=None)
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--out", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    concurrency = [int(c) for c in args.concurrency.split(",")]
+
+    if args.worker:
+        return run_worker(args.worker, args.model_path, args.workers, concurrency, args.duration, args.out)
+
+    settings = args.settings.split(",")
+    for setting in settings:
+        if setting not in SETTINGS and not (setting.startswith("t") and setting[1:].isdigit()):
+            parser.error(f"알 수 없는 설정: {setting}")
+
+    workdir = tempfile.mkdtemp(prefix="bench-threads-")
+    try:
+        model_path = args.model_path
+        if not model_path:
+            print("⏳ 측정용 랜덤 포레스트 학습 중 ...")
+            model_path = os.path.join(workdir, "forest.pkl")
+            build_forest(model_path)
+        results = {}
+        for setting in settings:
+            print(f"⏳ {setting} 측정 중 ...")
+            results[setting] = run_setting(setting, args, os.path.abspath(model_path), workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_results(results)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+        print(f"✅ 결과 저장: {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+벤치마크: 워커 N개 실행 시 프로세스별 메모리 (uvicorn --workers vs python -m src.serve)
+두 방식으로 서버를 띄우고 준비되면 요청을 몇 번 보내(예측/추천 경로 사용) 프로세스 트리의 RSS/PSS/USS를 비교
+preload/fork(src.serve)는 모델 페이지를 공유하므로 PSS 합계가 작아야 함 (Linux 전용, /proc/<pid>/smaps_rollup 사용)
+
+python -m benchmarks.bench_worker_memory --workers 4
+"""
+
+import argparse
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.loadtest import prepare_database
+from src.serve import memory_report, print_memory_report
+
+MODES = {
+    "uvicorn": lambda port, workers: [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+    "preload": lambda port, workers: [sys.executable, "-m", "src.serve", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+}
+WARMUP_REQUESTS = [
+    ("POST", "/recommend/result", {"quest_name": "매일 30분 운동하기", "duration": 14, "difficulty": 3, "category": "exercise"}),
+    ("GET", "/quests/list", None),
+    ("GET", "/plot/user", None),
+]
+
+
+def children(pid: int):
+    """pid의 자식 프로세스들 (/proc/<pid>/task/*/children)"""
+    found = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                found.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return found
+
+def process_tree(pid: int) -> dict:
+    """{pid: 역할}: 실행한 프로세스는 master, 자식 중 워커 외 프로세스(multiprocessing 보조 등)는 이름만 구분"""
+    tree = {pid: "master"}
+    workers = 0
+    for child in sorted(children(pid)):
+        try:
+            with open(f"/proc/{child}/cmdline", "rb") as f:
+                cmdline = f.read().replace(b"\0", b" ").decode(errors="replace")
+        except OSError:
+            continue
+        if "resource_tracker" in cmdline:
+            tree[child] = "helper"
+        else:
+            tree[child] = f"worker-{workers}"
+            workers += 1
+    return tree
+
+def wait_ready(port: int, proc: subprocess.Popen, workers: int, timeout: float = 300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("서버가 종료되었습니다.")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/login", timeout=1).status_code == 200 and \
+                    sum(role.startswith("worker") for role in process_tree(proc.pid).values()) >= workers:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("서버 시작 대기 시간 초과")
+
+def measure_mode(mode: str, db_path: str, workers: int, port: int, warmup: int) -> dict:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", TRAIN_ON_STARTUP="0", AI_COACH_TIER="local")
+    # 종료 때 남는 워커까지 정리할 수 있도록 새 프로세스 그룹으로 실행
+    proc = subprocess.Popen(MODES[mode](port, workers), env=env, stdout=subprocess.DEVNULL, start_new_session=True)
+    try:
+        wait_ready(port, proc, workers)
+        # 워커마다 요청이 고루 가도록 여러 번 (추론 경로를 거치면 공유 페이지 일부가 복사될 수 있음)
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", cookies={"user_id": "1"}, timeout=60) as client:
+            for _ in range(warmup):
+                for method, path, data in WARMUP_REQUESTS:
+                    client.request(method, path, data=data)
+        time.sleep(1)
+        return print_memory_report(memory_report(process_tree(proc.pid)), f"{mode} (워커 {workers}개)")
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            pass
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="워커별 메모리 비교 (uvicorn --workers vs preload/fork)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8798)
+    parser.add_argument("--warmup", type=int, default=5, help="측정 전 요청 반복 횟수")
+    parser.add_argument("--modes", default="uvicorn,preload")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="bench-mem-")
+    totals = {}
+    try:
+        db_path = prepare_database("small", 42, workdir)
+        # 앞 서버의 워커가 포트를 늦게 놓을 수 있으므로 방식마다 다른 포트
+        for offset, mode in enumerate(args.modes.split(",")):
+            totals[mode] = measure_mode(mode, db_path, args.workers, args.port + offset, args.warmup)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if len(totals) == 2 and "uvicorn" in totals and "preload" in totals:
+        before, after = totals["uvicorn"]["pss"], totals["preload"]["pss"]
+        print(f"\n✅ PSS 합계: uvicorn {before / 1024:.1f} MiB → preload {after / 1024:.1f} MiB "
+              f"({(before - after) / 1024:.1f} MiB, {(1 - after / before) * 100 if before else 0:.0f}% 감소)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+벤치마크: 토글/진행률 쓰기 경합
+여러 스레드가 동시에 toggle, progress 쓰기를 반복할 때 DB_PROFILE별 처리량과 'database is locked' 오류 수를 비교
+
+python -m benchmarks.bench_write_contention --threads 8 --ops 200 --profiles legacy,production
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from src import crud
+from src.database import Base, User, Quest, QuestHistory
+from src.migrations import run_migrations
+from src.storage import create_configured_engine, get_pragmas
+
+
+def setup_db(url, profile, users, quests_per_user):
+    engine = create_configured_engine(url, profile=profile)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    for u in range(1, users + 1):
+        db.add(User(id=u, name=f"bench{u}", email=f"bench{u}@bench.local"))
+        for i in range(quests_per_user):
+            db.add(Quest(user_id=u, name=f"퀘스트_{i}", category="study", duration=10, difficulty=3))
+    db.commit()
+    quest_ids = {u: [q.id for q in db.query(Quest.id).filter(Quest.user_id == u)] for u in range(1, users + 1)}
+    db.close()
+    return engine, Session, quest_ids
+
+
+def toggle(db, quest_id):
+    """PATCH /quests/{id}/toggle 와 같은 읽기 → 쓰기 순서"""
+    quest = db.get(Quest, quest_id)
+    quest.completed = not quest.completed
+    quest.completed_at = datetime.now(timezone.utc) if quest.completed else None
+    last_log = (
+        db.query(QuestHistory)
+        .filter(QuestHistory.quest_id == quest.id)
+        .order_by(QuestHistory.timestamp.desc())
+        .first()
+    )
+    action = "completed" if quest.completed else "reopened"
+    if not last_log or last_log.action != action:
+        crud.log_quest_history(db, quest, action, progress=1.0 if quest.completed else 0.0)
+    db.commit()
+
+
+def progress(db, quest_id, rng):
+    """PATCH /quests/{id}/progress 와 같은 읽기 → 쓰기 순서"""
+    quest = db.get(Quest, quest_id)
+    crud.log_quest_history(db, quest, "progress_update", progress=round(rng.uniform(0, 100), 1))
+    db.commit()
+
+
+def run_profile(profile, threads, ops, users, quests_per_user):
+    workdir = tempfile.mkdtemp(prefix="bench_write_")
+    url = f"sqlite:///{os.path.join(workdir, 'bench.sqlite3')}"
+    engine, Session, quest_ids = setup_db(url, profile, users, quests_per_user)
+
+    stats = {"ok": 0, "locked": 0, "latencies": []}
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(n):
+        rng = random.Random(n)
+        user_id = n % users + 1
+        barrier.wait()
+        for i in range(ops):
+            db = Session()
+            started = time.perf_counter()
+            try:
+                quest_id = rng.choice(quest_ids[user_id])
+                if i % 2 == 0:
+                    toggle(db, quest_id)
+                else:
+                    progress(db, quest_id, rng)
+                ok = True
+            except OperationalError as e:
+                db.rollback()
+                ok = False
+                if "locked" not in str(e):
+                    raise
+            finally:
+                db.close()
+            elapsed = time.perf_counter() - started
+            with lock:
+                stats["ok" if ok else "locked"] += 1
+                stats["latencies"].append(elapsed)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    wall = time.perf_counter() - started
+    engine.dispose()
+
+    latencies = sorted(stats["latencies"])
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    return {
+        "profile": profile,
+        "ops_per_sec": stats["ok"] / wall,
+        "locked_errors": stats["locked"],
+        "p95_ms": p95 * 1000,
+        "wall_s": wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite 쓰기 경합 벤치마크 (DB_PROFILE 비교)")
+    parser.add_argument("--profiles", default="legacy,production")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=200, help="스레드당 요청 수 (toggle/progress 교대)")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--quests-per-user", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"threads={args.threads}, ops/thread={args.ops}")
+    print(f"{'profile':<12}{'ops/s':>10}{'locked':>10}{'p95(ms)':>10}{'wall(s)':>10}  pragmas")
+    for profile in args.profiles.split(","):
+        r = run_profile(profile, args.threads, args.ops, args.users, args.quests_per_user)
+        print(f"{r['profile']:<12}{r['ops_per_sec']:>10.1f}{r['locked_errors']:>10}{r['p95_ms']:>10.1f}{r['wall_s']:>10.2f}  {get_pragmas(profile)}")
+
+
+if __name__ == "__main__":
+    main()
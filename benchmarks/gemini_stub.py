@@ -0,0 +1,145 @@
+"""
+Gemini generateContent API를 흉내내는 로컬 스텁 서버 (테스트/벤치마크용)
+GEMINI_BASE_URL=http://127.0.0.1:<port> 로 지정하면 src/ai_recommend.py가 실제 API 대신 이 서버를 호출
+지연 시간, 처음 N번 503 실패(재시도 확인용)를 설정할 수 있고 받은 요청 수를 기록
+streamGenerateContent(SSE)는 응답을 단어 단위 조각으로 chunk_delay 간격마다 전송하고,
+클라이언트가 중간에 연결을 끊으면 aborted_streams를 올림 (취소 전파 확인용)
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class GeminiStub:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0, fail_first: int = 0, chunk_delay: float = 0.05):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.chunk_delay = chunk_delay
+        self.requests = 0
+        self.completed_streams = 0
+        self.aborted_streams = 0
+        self.prompts = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @staticmethod
+    def reply_for(prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        return f"스텁 코치 조언 #{digest}: 작은 목표부터 매일 같은 시간에 기록해보세요. 일주일 뒤 난이도를 한 단계 올려봐도 좋아요."
+
+    @staticmethod
+    def payload(parts, finish_reason, prompt: str = "") -> dict:
+        candidate = {"content": {"role": "model", "parts": [{"text": t} for t in parts]}, "index": 0}
+        if finish_reason:
+            candidate["finishReason"] = finish_reason
+        return {
+            "candidates": [candidate],
+            "usageMetadata": {"promptTokenCount": len(prompt), "candidatesTokenCount": 20, "totalTokenCount": len(prompt) + 20},
+        }
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with stub._lock:
+                    stub.requests += 1
+                    attempt = stub.requests
+                streaming = ":streamGenerateContent" in self.path
+                if not (streaming or self.path.endswith(":generateContent")):
+                    return self._send(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+                if attempt <= stub.fail_first:
+                    return self._send(503, {"error": {"code": 503, "message": "stub overloaded", "status": "UNAVAILABLE"}})
+
+                prompt = "".join(
+                    part.get("text", "")
+                    for content in body.get("contents", [])
+                    for part in content.get("parts", [])
+                )
+                with stub._lock:
+                    stub.prompts.append(prompt)
+                time.sleep(stub.delay)
+                text = stub.reply_for(prompt)
+                if streaming:
+                    return self._send_stream(text.split(" "))
+                self._send(200, stub.payload([text], "STOP", prompt))
+
+            def _send_stream(self, words):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                try:
+                    for i, word in enumerate(words):
+                        last = i == len(words) - 1
+                        chunk = word if last else word + " "
+                        payload = stub.payload([chunk], "STOP" if last else None)
+                        self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\r\n\r\n".encode("utf-8"))
+                        self.wfile.flush()
+                        if not last:
+                            time.sleep(stub.chunk_delay)
+                except (BrokenPipeError, ConnectionResetError):
+                    with stub._lock:
+                        stub.aborted_streams += 1
+                    return
+                with stub._lock:
+                    stub.completed_streams += 1
+
+            def _send(self, status, payload):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # 클라이언트가 제한 시간을 넘겨 먼저 끊은 경우
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "GeminiStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gemini API 스텁 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.8, help="응답 지연(초)")
+    parser.add_argument("--fail-first", type=int, default=0, help="처음 N번 요청은 503으로 실패")
+    args = parser.parse_args()
+
+    stub = GeminiStub(port=args.port, delay=args.delay, fail_first=args.fail_first)
+    print(f"✅ Gemini 스텁 서버 실행: GEMINI_BASE_URL={stub.base_url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+
+# python -m benchmarks.gemini_stub --port 8765 --delay 0.8
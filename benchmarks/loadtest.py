@@ -0,0 +1,343 @@
+"""
+HTTP 부하 테스트: 시드 DB 크기별로 로컬 uvicorn을 띄우고 실제 트래픽 비율(로그인, 퀘스트 생성, 토글, 진행률, 목록, 그래프, 추천)을
+합성하거나 녹화된 트래픽을 재생하여 라우트별 처리량, 지연 시간 백분위, 오류율을 측정
+
+- 시드 DB는 src.seed로 (크기, seed)마다 한 번 만들어 .cache/loadtest에 두고, 실행할 때마다 복사본을 사용 (쓰기 트래픽이 원본을 바꾸지 않도록)
+- --record로 보낸 요청을 JSON Lines로 저장하고 --replay로 같은 순서대로 다시 보냄
+  첫 줄의 meta(크기, seed)로 같은 시드 DB를 만들기 때문에 퀘스트 id가 그대로 맞음
+- 서버는 TRAIN_ON_STARTUP=0, AI_COACH_TIER=local로 실행 (모델 학습/외부 API가 측정에 섞이지 않도록)
+
+python -m benchmarks.loadtest --size small --concurrency 16 --duration 20
+python -m benchmarks.loadtest --size small,medium --mix list=40,toggle=20,progress=20,create=10,plots=5,recommend=5
+python -m benchmarks.loadtest --size small --duration 10 --record benchmarks/traffic/requests.jsonl
+python -m benchmarks.loadtest --replay benchmarks/traffic/requests.jsonl --concurrency 32
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+# 시드 DB 크기 프리셋 (src.seed 옵션)
+SIZES = {
+    "small": {"users": 200, "quests-per-user": 20},
+    "medium": {"users": 5000, "quests-per-user": 30, "quest-dist": "poisson", "events-per-quest": 1},
+    "large": {"users": 50000, "quests-per-user": 40, "quest-dist": "lognormal", "events-per-quest": 2},
+}
+# 라우트별 기본 요청 비율
+DEFAULT_MIX = {
+    "login": 5, "list": 20, "api_quests": 15, "create": 10, "toggle": 15,
+    "progress": 20, "plots": 5, "recommend": 5, "tip": 5,
+}
+PLOT_PATHS = ["/plot/user", "/plot/quest", "/plot/trend", "/plot/focus"]
+CATEGORIES = ["reading", "study", "exercise", "work", "hobby", "health"]
+
+CACHE_DIR = os.path.join(".cache", "loadtest")
+# 녹화 기본 경로 (저장소 루트의 requests.jsonl은 작업 목록 파일이므로 쓰지 않음)
+DEFAULT_RECORD_PATH = os.path.join("benchmarks", "traffic", "requests.jsonl")
+# 퀘스트 id를 미리 알아 둘 사용자 수 (토글/진행률 대상)
+TARGET_USERS = 500
+
+
+# ----------------------------
+# 시드 DB / 서버
+def prepare_database(size: str, seed: int, workdir: str, sizes: Optional[dict] = None) -> str:
+    """(size, seed) 시드 DB를 캐시에서 복사해 이번 실행용 DB 경로를 반환 (없으면 src.seed로 생성)"""
+    options = (sizes or SIZES)[size]
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # 같은 이름이라도 seed 옵션이 다르면 다른 파일 (다른 벤치마크의 크기 프리셋과 섞이지 않도록)
+    digest = hashlib.sha1(json.dumps(options, sort_keys=True).encode()).hexdigest()[:8]
+    cached = os.path.join(CACHE_DIR, f"{size}-s{seed}-{digest}.sqlite3")
+    if not os.path.exists(cached):
+        print(f"⏳ 시드 DB 생성: {size} (seed={seed})")
+        args = [sys.executable, "-m", "src.seed", "--seed", str(seed)]
+        for key, value in options.items():
+            args += [f"--{key}", str(value)]
+        building = cached + ".building"
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{building}", DB_PROFILE="test")
+        subprocess.run(args, env=env, check=True, stdout=subprocess.DEVNULL)
+        os.replace(building, cached)
+
+    path = os.path.join(workdir, f"{size}.sqlite3")
+    # 백업 API로 복사 (WAL 등 부속 파일 상태와 관계없이 일관된 사본)
+    with sqlite3.connect(cached) as src, sqlite3.connect(path) as dst:
+        src.backup(dst)
+    return path
+
+def start_server(db_path: str, port: int, workdir: str, extra_env: Optional[dict] = None) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        DB_PROFILE=os.getenv("DB_PROFILE", "production"),
+        TRAIN_ON_STARTUP="0",
+        AI_COACH_TIER=os.getenv("AI_COACH_TIER", "local"),
+        GEMINI_CACHE_DIR=os.path.join(workdir, "gemini"),
+        **(extra_env or {}),
+    )
+    log = open(os.path.join(workdir, f"server-{port}.log"), "w")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    deadline = time.monotonic() + 180
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"서버가 시작되지 않았습니다. 로그: {log.name}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/login", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError(f"서버 시작 대기 시간 초과. 로그: {log.name}")
+
+def stop_server(proc: subprocess.Popen):
+    proc.terminate()
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+def quest_targets(db_path: str, n_users: int = TARGET_USERS, seed: int = 0) -> Dict[int, List[int]]:
+    """토글/진행률 요청에 쓸 {user_id: [quest_id]} (시드 DB에서 사용자 일부를 골라 조회)"""
+    with sqlite3.connect(db_path) as conn:
+        user_ids = [row[0] for row in conn.execute("SELECT id FROM users ORDER BY id")]
+        chosen = sorted(random.Random(seed).sample(user_ids, min(n_users, len(user_ids))))
+        targets = defaultdict(list)
+        for start in range(0, len(chosen), 500):
+            batch = chosen[start:start + 500]
+            rows = conn.execute(
+                f"SELECT user_id, id FROM quests WHERE user_id IN ({','.join('?' * len(batch))}) ORDER BY id", batch
+            )
+            for user_id, quest_id in rows:
+                targets[user_id].append(quest_id)
+    return {uid: targets.get(uid, []) for uid in chosen}
+
+
+# ----------------------------
+# 트래픽 합성 / 녹화 파일
+def parse_mix(text: Optional[str]) -> Dict[str, float]:
+    """'list=40,toggle=20' → {route: weight} (지정한 라우트만 사용)"""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in text.split(","):
+        route, _, weight = item.partition("=")
+        route = route.strip()
+        if route not in DEFAULT_MIX:
+            raise ValueError(f"알 수 없는 라우트: {route} (가능: {', '.join(DEFAULT_MIX)})")
+        mix[route] = float(weight or 1)
+    return mix
+
+def make_request(route: str, rng: random.Random, targets: Dict[int, List[int]]) -> dict:
+    """라우트 이름 → 보낼 요청 (method, path, user_id, params/json/data)"""
+    user_id = rng.choice(list(targets))
+    quests = targets[user_id]
+    req = {"route": route, "user_id": user_id, "method": "GET"}
+    if route == "login":
+        req.update(method="POST", path="/login", data={"nickname": f"user{user_id}", "email": f"user{user_id}@example.com"})
+    elif route == "list":
+        req.update(path="/quests/list")
+    elif route == "api_quests":
+        req.update(path="/api/quests", params={"limit": 50})
+    elif route == "create":
+        category = rng.choice(CATEGORIES)
+        req.update(method="POST", path="/quests/", json={
+            "user_id": user_id, "name": f"부하 테스트 {category} {rng.randint(1, 999)}", "category": category,
+            "duration": rng.randint(1, 30), "difficulty": rng.randint(1, 5),
+        })
+    elif route == "toggle" and quests:
+        req.update(method="PATCH", path=f"/quests/{rng.choice(quests)}/toggle")
+    elif route == "progress" and quests:
+        req.update(method="PATCH", path=f"/quests/{rng.choice(quests)}/progress", json={"progress": round(rng.uniform(0, 100), 1)})
+    elif route == "plots":
+        req.update(path=rng.choice(PLOT_PATHS))
+    elif route == "recommend":
+        req.update(method="POST", path="/recommend/result", data={
+            "quest_name": f"{rng.choice(CATEGORIES)} 30분", "duration": rng.randint(1, 30),
+            "difficulty": rng.randint(1, 5), "category": rng.choice(CATEGORIES),
+        })
+    elif route == "tip":
+        req.update(path="/recommend/tip/stream", params={
+            "quest_name": f"{rng.choice(CATEGORIES)} 30분", "duration": rng.randint(1, 30), "difficulty": rng.randint(1, 5),
+        })
+    else:
+        # 퀘스트가 없는 사용자는 목록 조회로 대체
+        req.update(route="list", path="/quests/list")
+    return req
+
+def synthesize(mix: Dict[str, float], targets: Dict[int, List[int]], seed: int):
+    """mix 비율대로 요청을 끝없이 생성 (같은 seed면 같은 순서)"""
+    rng = random.Random(seed)
+    routes, weights = list(mix), list(mix.values())
+    while True:
+        yield make_request(rng.choices(routes, weights)[0], rng, targets)
+
+def load_recording(path: str):
+    """녹화 파일 → (meta, 요청 목록)"""
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    meta = lines[0].get("meta", {}) if lines and "meta" in lines[0] else {}
+    return meta, [line for line in lines if "meta" not in line]
+
+def save_recording(path: str, meta: dict, requests: List[dict]):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"meta": meta}, ensure_ascii=False) + "\n")
+        for req in requests:
+            f.write(json.dumps(req, ensure_ascii=False) + "\n")
+
+
+# ----------------------------
+# 실행 / 집계
+async def send(client: httpx.AsyncClient, req: dict):
+    """요청 하나를 보내고 (상태 코드, 지연 초)를 반환. 스트리밍 응답은 본문 끝까지 읽은 시점까지 측정"""
+    started = time.perf_counter()
+    async with client.stream(
+        req["method"], req["path"],
+        params=req.get("params"), json=req.get("json"), data=req.get("data"),
+        headers={"Cookie": f"user_id={req['user_id']}"},
+    ) as res:
+        await res.aread()
+    return res.status_code, time.perf_counter() - started
+
+async def run_load(base_url: str, requests, concurrency: int, duration: Optional[float], timeout: float = 30.0):
+    """concurrency개의 가상 사용자가 requests에서 요청을 꺼내 보냄. duration(초)이 지나거나 요청이 떨어지면 종료"""
+    results = []  # (route, status, latency, 시작 오프셋, 요청)
+    source = iter(requests)
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits, follow_redirects=False) as client:
+        async def virtual_user():
+            while deadline is None or time.perf_counter() < deadline:
+                req = next(source, None)
+                if req is None:
+                    return
+                offset = time.perf_counter() - started
+                try:
+                    status, latency = await send(client, req)
+                except httpx.HTTPError as e:
+                    status, latency = type(e).__name__, time.perf_counter() - started - offset
+                results.append((req["route"], status, latency, offset, req))
+
+        await asyncio.gather(*(virtual_user() for _ in range(concurrency)))
+    return results, time.perf_counter() - started
+
+def is_error(status) -> bool:
+    # 로그인/온보딩 리다이렉트(3xx)는 정상 응답
+    return not isinstance(status, int) or status >= 400
+
+def summarize(results, elapsed: float) -> Dict[str, dict]:
+    """라우트별 요청 수, 처리량(req/s), 오류율, 지연 시간 백분위(ms)"""
+    by_route = defaultdict(list)
+    for route, status, latency, _, _ in results:
+        by_route[route].append((status, latency))
+    by_route["전체"] = [(status, latency) for _, status, latency, _, _ in results]
+
+    report = {}
+    for route, rows in by_route.items():
+        latencies = np.array([latency for _, latency in rows]) * 1000
+        errors = sum(1 for status, _ in rows if is_error(status))
+        statuses = defaultdict(int)
+        for status, _ in rows:
+            statuses[str(status)] += 1
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) if len(rows) else (0, 0, 0)
+        report[route] = {
+            "count": len(rows),
+            "rps": len(rows) / elapsed if elapsed else 0.0,
+            "error_rate": errors / len(rows) if rows else 0.0,
+            "p50_ms": float(p50), "p90_ms": float(p90), "p99_ms": float(p99),
+            "max_ms": float(latencies.max()) if len(rows) else 0.0,
+            "statuses": dict(statuses),
+        }
+    return report
+
+def print_report(title: str, report: Dict[str, dict]):
+    print(f"\n=== {title} ===")
+    print(f"{'route':<12}{'count':>8}{'req/s':>9}{'err%':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  status")
+    for route, r in sorted(report.items(), key=lambda item: (item[0] == "전체", item[0])):
+        statuses = " ".join(f"{k}:{v}" for k, v in sorted(r["statuses"].items()))
+        print(
+            f"{route:<12}{r['count']:>8}{r['rps']:>9.1f}{r['error_rate'] * 100:>6.1f}%"
+            f"{r['p50_ms']:>9.1f}{r['p90_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}  {statuses}"
+        )
+
+
+def run_size(size: str, args, workdir: str, recording: Optional[List[dict]] = None) -> Dict[str, dict]:
+    db_path = prepare_database(size, args.seed, workdir)
+    proc = start_server(db_path, args.port, workdir)
+    try:
+        if recording is not None:
+            requests = recording
+            duration = None
+        else:
+            requests = synthesize(parse_mix(args.mix), quest_targets(db_path, seed=args.seed), args.seed)
+            duration = args.duration
+        # 첫 요청의 지연(임포트, 커넥션 생성 등)이 결과에 섞이지 않도록 몇 번 미리 호출
+        asyncio.run(run_load(f"http://127.0.0.1:{args.port}", [{"route": "warmup", "method": "GET", "path": "/login", "user_id": 0}] * 10, 2, None))
+        results, elapsed = asyncio.run(run_load(f"http://127.0.0.1:{args.port}", requests, args.concurrency, duration))
+    finally:
+        stop_server(proc)
+
+    if args.record and recording is None:
+        # 시작 순서대로 저장 (재생도 같은 순서로 보냄)
+        recorded = [dict(req, t=round(offset, 4)) for _, _, _, offset, req in sorted(results, key=lambda r: r[3])]
+        save_recording(args.record, {"size": size, "seed": args.seed, "mix": parse_mix(args.mix)}, recorded)
+        print(f"✅ 요청 {len(recorded)}개 녹화: {args.record}")
+    return summarize(results, elapsed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP 부하 테스트 (트래픽 합성/녹화/재생)")
+    parser.add_argument("--size", default="small", help=f"시드 DB 크기, 쉼표로 여러 개 ({', '.join(SIZES)})")
+    parser.add_argument("--seed", type=int, default=42, help="시드 DB와 트래픽 합성에 쓰는 난수 시드")
+    parser.add_argument("--mix", default=None, help="라우트별 비율, 예: list=40,toggle=20,progress=20 (기본: 전체 라우트)")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 가상 사용자 수")
+    parser.add_argument("--duration", type=float, default=20, help="측정 시간(초), 재생 시에는 녹화된 요청을 모두 보냄")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--record", nargs="?", const=DEFAULT_RECORD_PATH, default=None, help=f"보낸 요청을 JSON Lines로 저장 (기본 {DEFAULT_RECORD_PATH})")
+    parser.add_argument("--replay", default=None, help="녹화 파일의 요청을 순서대로 재생 (meta의 크기/seed로 같은 DB 사용)")
+    parser.add_argument("--json-out", default=None, help="결과 보고서를 JSON으로 저장")
+    args = parser.parse_args(argv)
+
+    reports = {}
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    try:
+        if args.replay:
+            meta, recording = load_recording(args.replay)
+            size = meta.get("size", args.size)
+            args.seed = meta.get("seed", args.seed)
+            reports[size] = run_size(size, args, workdir, recording)
+            print_report(f"{size} 재생 ({len(recording)}개 요청, 동시 {args.concurrency})", reports[size])
+        else:
+            for size in args.size.split(","):
+                if size not in SIZES:
+                    parser.error(f"알 수 없는 크기: {size}")
+                reports[size] = run_size(size, args, workdir)
+                print_report(f"{size} ({args.duration:.0f}초, 동시 {args.concurrency})", reports[size])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
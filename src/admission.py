@@ -0,0 +1,205 @@
+'''
+무거운 라우트의 동시 실행 수 제한 (admission control)
+추천 결과(트랜스포머 추론 + 랜덤 포레스트), 그래프(matplotlib 렌더링), 퀘스트 생성(성공률 예측)은 CPU를 많이 쓰므로
+트래픽이 몰리면 코어와 스레드풀을 모두 차지해 토글 같은 가벼운 요청의 지연까지 늘어남
+- 라우트를 클래스(recommend/plot/create)로 묶고, 클래스마다 동시 실행 수(limit)와 대기열 길이(queue)를 둠
+- 대기열이 가득 차면 기다리지 않고 바로 503 + Retry-After, 대기열에서 ADMISSION_QUEUE_TIMEOUT을 넘겨도 503
+- 가벼운 쓰기 라우트(토글/진행률/삭제 등)는 제한을 거치지 않고, 무거운 클래스의 limit 합이 스레드풀 크기보다 작게 유지되어
+  sync 라우트가 쓸 스레드가 항상 남음 (가벼운 요청 우선)
+- 대기 시간은 Server-Timing(admission;dur=...)으로 응답하고, 클래스별 통계는 GET /admin/admission에서 확인
+※ 워커 프로세스마다 따로 제한하므로 전체 동시 실행 수는 limit x 워커 수
+'''
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1").lower() not in ("0", "false", "no")
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+
+# 기본값의 limit 합이 anyio 기본 스레드풀(40)보다 작도록 코어 수는 8까지만 반영
+_CPUS = min(os.cpu_count() or 2, 8)
+# 클래스별 (동시 실행 수, 대기열 길이) 기본값, ADMISSION_<클래스>_LIMIT / ADMISSION_<클래스>_QUEUE로 변경
+DEFAULT_LIMITS = {
+    "recommend": (_CPUS, 2 * _CPUS),
+    "plot": (_CPUS, 2 * _CPUS),
+    "create": (2 * _CPUS, 4 * _CPUS),
+}
+# (메서드, 경로) → 클래스, 여기에 없는 라우트는 제한 없음
+HEAVY_ROUTES = {
+    ("POST", "/recommend/result"): "recommend",
+    ("GET", "/plot/user"): "plot",
+    ("GET", "/plot/quest"): "plot",
+    ("GET", "/plot/trend"): "plot",
+    ("GET", "/plot/focus"): "plot",
+    ("POST", "/quests/"): "create",
+}
+BUSY_MESSAGE = "요청이 많아 잠시 처리할 수 없어요. 잠시 후 다시 시도해주세요."
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionClass:
+    """
+    동시 실행 수 limit, 대기열 길이 queue인 세마포어
+    자리가 나면 먼저 기다린 요청부터 들어감 (이벤트 루프 하나 안에서만 사용)
+    """
+
+    def __init__(self, name: str, limit: int, queue: int, timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        self.name = name
+        self.limit = max(limit, 1)
+        self.queue = max(queue, 0)
+        self.timeout = timeout
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        # 통계 (/admin/admission)
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.max_waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.avg_service = 0.0  # 처리 시간 이동 평균(초), Retry-After 추정용
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """지금 줄을 선 요청이 모두 빠지는 데 걸릴 예상 시간(초), 최소 1초"""
+        service = self.avg_service or 1.0
+        return max(1, math.ceil(service * (self.waiting + self.in_flight) / self.limit))
+
+    async def acquire(self) -> float:
+        """자리를 얻을 때까지 기다리고 대기 시간(초)을 반환, 대기열이 가득 찼거나 시간을 넘기면 Rejected"""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return 0.0
+        if len(self._waiters) >= self.queue:
+            self.rejected += 1
+            raise Rejected("queue_full", self.retry_after())
+
+        started = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.max_waiting = max(self.max_waiting, len(self._waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # 자리를 넘겨받은 직후 취소/시간 초과 → 다음 대기자에게 넘김
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.timed_out += 1
+            raise Rejected("timeout", self.retry_after())
+
+        waited = time.perf_counter() - started
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def release(self, service_seconds: Optional[float] = None):
+        if service_seconds is not None:
+            self.avg_service = service_seconds if not self.avg_service else 0.8 * self.avg_service + 0.2 * service_seconds
+        # 자리를 비우지 않고 가장 오래 기다린 요청에 바로 넘김 (새로 온 요청이 새치기하지 않도록)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "queue": self.queue,
+            "queue_timeout": self.timeout,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "max_waiting": self.max_waiting,
+            "avg_wait_ms": round(self.total_wait / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "avg_service_ms": round(self.avg_service * 1000, 2),
+        }
+
+
+def load_classes() -> Dict[str, AdmissionClass]:
+    classes = {}
+    for name, (limit, queue) in DEFAULT_LIMITS.items():
+        classes[name] = AdmissionClass(
+            name,
+            limit=int(os.getenv(f"ADMISSION_{name.upper()}_LIMIT", limit)),
+            queue=int(os.getenv(f"ADMISSION_{name.upper()}_QUEUE", queue)),
+        )
+    return classes
+
+_classes: Dict[str, AdmissionClass] = load_classes()
+
+def metrics() -> dict:
+    return {"enabled": ADMISSION_ENABLED, "classes": {name: c.stats() for name, c in _classes.items()}}
+
+def check_thread_budget(thread_tokens: int, admission_classes: Dict[str, AdmissionClass] = None) -> bool:
+    """무거운 클래스의 limit 합이 스레드풀 크기 이상이면 가벼운 sync 라우트가 스레드를 기다릴 수 있으므로 경고"""
+    total = sum(c.limit for c in (admission_classes or _classes).values())
+    if total >= thread_tokens:
+        print(f"⚠️ 무거운 라우트 동시 실행 수 합({total})이 스레드풀 크기({thread_tokens}) 이상입니다. ADMISSION_*_LIMIT을 줄이세요.")
+        return False
+    return True
+
+
+# ----------------------------
+# ASGI 미들웨어
+class AdmissionMiddleware:
+    def __init__(self, app, routes: Dict[Tuple[str, str], str] = None, admission_classes: Dict[str, AdmissionClass] = None):
+        self.app = app
+        self.routes = HEAVY_ROUTES if routes is None else routes
+        self.classes = _classes if admission_classes is None else admission_classes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        name = self.routes.get((scope["method"], scope["path"]))
+        if name is None or name not in self.classes:
+            return await self.app(scope, receive, send)
+
+        admission = self.classes[name]
+        try:
+            waited = await admission.acquire()
+        except Rejected as e:
+            print(f"⚠️ {scope['method']} {scope['path']}: {name} 클래스 {'대기열 가득 참' if e.reason == 'queue_full' else '대기 시간 초과'}, 503 응답")
+            response = JSONResponse(
+                {"detail": BUSY_MESSAGE, "admission": name, "reason": e.reason},
+                status_code=503,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            return await response(scope, receive, send)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", f'admission;dur={waited * 1000:.1f};desc="{name}"')
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            admission.release(time.perf_counter() - started)
@@ -1,85 +1,151 @@
 from google import genai
-from typing import Optional
+from google.genai import types
+from typing import AsyncIterator, Dict, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
 import os
+import re
+import threading
+import time
+import weakref
+
+from . import local_coach
 
 # 클라이언트 객체를 저장할 전역 변수. 초기화 전에는 None
+# 하나의 클라이언트를 재사용하므로 sync/async 모두 HTTP 연결 풀이 공유됨
 GEMINI_CLIENT: Optional[genai.Client] = None
 
 # 초기화 시도 상태를 기록하여 중복 경고를 방지
 _INITIALIZED_ATTEMPTED = False
 
+# 조언 생성 tier: local(기본, 규칙 기반 로컬 코치) / gemini(Gemini 우선, 실패·지연 시 로컬 코치로 대체)
+AI_COACH_TIER = os.getenv("AI_COACH_TIER", "local").lower()
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+# 테스트/벤치마크에서는 로컬 스텁 서버 주소를 지정 (benchmarks/gemini_stub.py)
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "8"))             # 요청당 제한 시간(초)
+GEMINI_RETRY_ATTEMPTS = int(os.getenv("GEMINI_RETRY_ATTEMPTS", "2"))  # 429/5xx 재시도 포함 총 시도 횟수
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+# 스트리밍에서 첫 조각을 기다리는 최대 시간(초), 넘기면 로컬 코치 조언으로 대체
+GEMINI_FIRST_TOKEN_BUDGET = float(os.getenv("GEMINI_FIRST_TOKEN_BUDGET", "3"))
+
+# 응답 캐시: 메모리(LRU + TTL) → 디스크(JSON 파일) 순으로 조회
+GEMINI_CACHE_TTL = float(os.getenv("GEMINI_CACHE_TTL", str(24 * 3600)))
+GEMINI_CACHE_MAX_ITEMS = int(os.getenv("GEMINI_CACHE_MAX_ITEMS", "1024"))
+GEMINI_CACHE_DIR = os.getenv("GEMINI_CACHE_DIR", ".cache/gemini")  # 빈 문자열이면 디스크 캐시 사용 안 함
+
+# 프롬프트 문구를 바꾸면 올려서 이전 캐시를 무효화
+PROMPT_VERSION = 2
+
 def get_gemini_client() -> Optional[genai.Client]:
     """
     Gemini 클라이언트를 초기화하거나, 이미 초기화된 클라이언트를 반환
     환경 변수 GEMINI_API_KEY가 없거나 초기화에 실패하면 None을 반환
     """
     global GEMINI_CLIENT, _INITIALIZED_ATTEMPTED
-    
+
     # 1. 이미 성공적으로 초기화된 경우
     if GEMINI_CLIENT is not None:
         return GEMINI_CLIENT
-        
+
     # 2. 이미 한 번 시도했으나 실패한 경우
     if _INITIALIZED_ATTEMPTED:
-        return None 
-    
+        return None
+
     _INITIALIZED_ATTEMPTED = True # 초기화 시도 시작 플래그 설정
-    
-    # 3. API 키 환경 변수 확인
-    if "GEMINI_API_KEY" not in os.environ:
-        print("⚠️ 경고: GEMINI_API_KEY 환경 변수가 설정되지 않았습니다. AI 기능을 사용할 수 없습니다.")
+
+    # 3. API 키 환경 변수 확인 (스텁 서버를 쓰는 경우 키 불필요)
+    if "GEMINI_API_KEY" not in os.environ and not GEMINI_BASE_URL:
+        print("⚠️ 경고: GEMINI_API_KEY 환경 변수가 설정되지 않았습니다. 로컬 코치 조언만 사용합니다.")
         return None
 
-    # 4. 클라이언트 초기화 시도
+    # 4. 클라이언트 초기화 시도 (제한 시간, 재시도 정책, 스텁 주소 반영)
     try:
-        GEMINI_CLIENT = genai.Client()
+        http_options = types.HttpOptions(
+            base_url=GEMINI_BASE_URL,
+            timeout=int(GEMINI_TIMEOUT * 1000),
+            retry_options=types.HttpRetryOptions(attempts=GEMINI_RETRY_ATTEMPTS, initial_delay=0.5, max_delay=4),
+        )
+        GEMINI_CLIENT = genai.Client(
+            api_key=os.environ.get("GEMINI_API_KEY", "stub-key"),
+            http_options=http_options,
+        )
         print("✅ Gemini 클라이언트 초기화 성공.")
         return GEMINI_CLIENT
     except Exception as e:
         print(f"❌ 경고: Gemini 클라이언트 초기화 중 오류 발생: {e}")
         return None
 
-# Gemini API 호출하여 퀘스트 성공률에 기반한 맞춤형 조언 생성
-def generate_ai_recommendation(
-    quest_name: str, 
-    duration: int, 
-    difficulty: int, 
-    consistency_score: int,
-    risk_aversion_score: int,
+def reset_gemini_client():
+    """환경 변수를 바꾼 뒤(테스트/벤치마크) 클라이언트와 메모리 캐시를 다시 만들도록 초기화"""
+    global GEMINI_CLIENT, _INITIALIZED_ATTEMPTED, GEMINI_BASE_URL
+    GEMINI_CLIENT = None
+    _INITIALIZED_ATTEMPTED = False
+    GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+    with _memory_lock:
+        _memory_cache.clear()
+
+# ----------------------------
+# 프롬프트 (프로필은 구간으로 묶어 같은 성향이면 같은 프롬프트가 되도록 함)
+def bucket_profile(
     total_quests: int,
     completed_quests: int,
-    preferred_category: str = None
-) -> str:
-    # 중앙 집중화된 get_gemini_client 함수를 통해 클라이언트 객체 가져오기
-    client: Optional[genai.Client] = get_gemini_client() 
-    
-    if client is None:
-        return "AI 추천 기능을 사용할 수 없습니다. API 키 설정이 필요합니다."
-        
-    
+    consistency_score: int,
+    risk_aversion_score: int,
+    preferred_category: Optional[str] = None
+) -> Dict[str, object]:
+    """프롬프트에 들어가는 사용자 프로필을 캐시 키로 쓸 수 있게 구간화합니다."""
+    total = total_quests or 0
+    completed = completed_quests or 0
+    if total == 0:
+        total_bucket = "0개"
+    elif total < 5:
+        total_bucket = "1~4개"
+    elif total < 20:
+        total_bucket = "5~19개"
+    elif total < 50:
+        total_bucket = "20~49개"
+    else:
+        total_bucket = "50개 이상"
+    completion = round(min(completed / total, 1.0) * 5) * 20 if total else 0  # 20% 단위
+    return {
+        "total": total_bucket,
+        "completion": completion,
+        "consistency": consistency_score or 3,
+        "risk": risk_aversion_score or 3,
+        "category": preferred_category or "없음",
+    }
+
+def normalize_quest_name(quest_name: str) -> str:
+    return re.sub(r"\s+", " ", (quest_name or "").strip()).lower()
+
+def build_prompt(quest_name: str, duration: int, difficulty: int, profile: Dict[str, object]) -> str:
     # 퀘스트 정보를 기반으로 구체적인 코치 역할 프롬프트 작성
-    prompt_template = f"""
+    return f"""
     당신은 사용자의 행동 패턴과 성향을 분석하여 퀘스트 성공률을 높이는 AI 코치입니다.
 
     [사용자 프로필]
-    - 전체 퀘스트 수행 수: {total_quests}
-    - 완료한 퀘스트 수: {completed_quests}
-    - 꾸준함 점수(consistency): {consistency_score}/5
-    - 도전적인 성향(risk_aversion): {risk_aversion_score}/5
-    - 선호 카테고리: {preferred_category or "없음"}
+    - 전체 퀘스트 수행 수: {profile["total"]}
+    - 완료율: 약 {profile["completion"]}%
+    - 꾸준함 점수(consistency): {profile["consistency"]}/5
+    - 도전적인 성향(risk_aversion): {profile["risk"]}/5
+    - 선호 카테고리: {profile["category"]}
 
     [현재 퀘스트]
-    - 이름: "{quest_name}"
+    - 이름: "{quest_name.strip()}"
     - 예상 기간: {duration}일
     - 난이도: {difficulty}/5
 
-    당신의 목표는 사용자의 성향과 경험 수준을 바탕으로, 
+    당신의 목표는 사용자의 성향과 경험 수준을 바탕으로,
     이번 퀘스트를 어떻게 접근해야 지속 가능한 성장을 이룰 수 있을지 조언하는 것입니다.
 
     작성 지침:
     1. 조언은 2~3문장으로 구성합니다.
-    2. 전체 퀘스트 대비 완료한 퀘스트가 적다면 “작은 성공의 축적”, “습관의 루틴화”를 강조합니다.
-    3. 전체 퀘스트 대비 완료한 퀘스트가 높다면 “난이도 조절 제안”과 “지속적 성장”을 제안합니다.
+    2. 완료율이 낮다면 “작은 성공의 축적”, “습관의 루틴화”를 강조합니다.
+    3. 완료율이 높다면 “난이도 조절 제안”과 “지속적 성장”을 제안합니다.
     4. 꾸준함 점수가 낮다면 “시간 루틴 만들기”, “기록 습관화” 중심으로,
        위험 회피 점수가 낮다면 “도전의 보상과 리스크 관리”를 중심으로 합니다.
     5. 말투는 따뜻하고 실질적이며, 인사말이나 결론 문구는 생략합니다.
@@ -87,13 +153,271 @@ def generate_ai_recommendation(
     7. 마지막 추천 퀘스트는 사용자가 요청한 퀘스트에 관련된 것만 추천합니다.
     """
 
+def prompt_fingerprint(quest_name: str, duration: int, difficulty: int, profile: Dict[str, object]) -> str:
+    """모델/프롬프트 버전과 정규화된 입력으로 만든 캐시 키"""
+    key = json.dumps(
+        [GEMINI_MODEL, PROMPT_VERSION, normalize_quest_name(quest_name), duration, difficulty, profile],
+        ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+# ----------------------------
+# 응답 캐시 (메모리 → 디스크)
+_memory_lock = threading.Lock()
+_memory_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # key -> (저장 시각, 응답)
+
+def _disk_path(key: str) -> str:
+    return os.path.join(GEMINI_CACHE_DIR, key[:2], f"{key}.json")
+
+def cache_get(key: str) -> Optional[str]:
+    now = time.time()
+    with _memory_lock:
+        hit = _memory_cache.get(key)
+        if hit and now - hit[0] <= GEMINI_CACHE_TTL:
+            _memory_cache.move_to_end(key)
+            return hit[1]
+        _memory_cache.pop(key, None)
+
+    if not GEMINI_CACHE_DIR:
+        return None
+    try:
+        with open(_disk_path(key), encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if now - entry.get("stored_at", 0) > GEMINI_CACHE_TTL:
+        return None
+    _memory_put(key, entry["text"], entry["stored_at"])
+    return entry["text"]
+
+def _memory_put(key: str, text: str, stored_at: float):
+    with _memory_lock:
+        _memory_cache[key] = (stored_at, text)
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > GEMINI_CACHE_MAX_ITEMS:
+            _memory_cache.popitem(last=False)
+
+def cache_put(key: str, text: str):
+    stored_at = time.time()
+    _memory_put(key, text, stored_at)
+    if not GEMINI_CACHE_DIR:
+        return
+    path = _disk_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"stored_at": stored_at, "text": text}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)  # 동시에 쓰는 프로세스가 있어도 깨진 파일이 보이지 않도록
+    except OSError as e:
+        print(f"⚠️ Gemini 디스크 캐시 저장 실패: {e}")
+
+# Gemini API 호출하여 퀘스트 성공률에 기반한 맞춤형 조언 생성
+def generate_ai_recommendation(
+    quest_name: str,
+    duration: int,
+    difficulty: int,
+    consistency_score: int,
+    risk_aversion_score: int,
+    total_quests: int,
+    completed_quests: int,
+    preferred_category: str = None,
+    category: str = None
+) -> str:
+    local = local_coach.local_recommendation(
+        quest_name, duration, difficulty, consistency_score, risk_aversion_score,
+        total_quests, completed_quests, preferred_category, category
+    )
+    if AI_COACH_TIER != "gemini":
+        return local
+
+    profile = bucket_profile(total_quests, completed_quests, consistency_score, risk_aversion_score, preferred_category)
+    key = prompt_fingerprint(quest_name, duration, difficulty, profile)
+    cached = cache_get(key)
+    if cached is not None:
+        return cached
+
+    # 중앙 집중화된 get_gemini_client 함수를 통해 클라이언트 객체 가져오기
+    client: Optional[genai.Client] = get_gemini_client()
+
+    if client is None:
+        return local
+
     try:
         response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt_template,
+            model=GEMINI_MODEL,
+            contents=build_prompt(quest_name, duration, difficulty, profile),
         )
-        return response.text.strip()
+        text = response.text.strip()
     except Exception as e:
         # FastAPI 서버 로그에 오류 출력
         print(f"Gemini API 호출 오류: {e}")
-        return "AI 코치 서비스와의 연결에 문제가 발생했습니다. (API 오류)"
\ No newline at end of file
+        return local
+    cache_put(key, text)
+    return text
+
+# ----------------------------
+# 루프별 상태: 동시 호출 수 제한 + 같은 프롬프트의 진행 중 스트림 공유
+# 세마포어/Task는 이벤트 루프에 묶이므로 루프마다 따로 생성
+_loop_state: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[asyncio.Semaphore, Dict[str, _SharedStream]]]" = weakref.WeakKeyDictionary()
+
+def _state_for_running_loop():
+    loop = asyncio.get_running_loop()
+    state = _loop_state.get(loop)
+    if state is None:
+        state = (asyncio.Semaphore(GEMINI_MAX_CONCURRENCY), {})
+        _loop_state[loop] = state
+    return state
+
+# ----------------------------
+# 스트리밍 경로: 생성되는 조각을 바로 내보냄 (SSE 엔드포인트용)
+async def _next_chunk(stream):
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
+
+async def _open_stream(client: genai.Client, prompt: str):
+    """스트림을 열고 첫 조각까지 받아 (stream, 첫 조각)을 반환 (중간에 취소되면 스트림을 닫음)"""
+    stream = await client.aio.models.generate_content_stream(model=GEMINI_MODEL, contents=prompt)
+    try:
+        return stream, await _next_chunk(stream)
+    except BaseException:
+        await stream.aclose()
+        raise
+
+class _SharedStream:
+    """
+    같은 프롬프트(key)의 업스트림 스트림 하나를 여러 구독자가 나눠 받음
+    처음 요청한 쪽이 만든 Task가 스트림을 열어 조각을 구독자별 큐로 보내고, 나중에 온 구독자는 이미 받은 조각부터 다시 받음
+    마지막 구독자가 떠나면 Task를 취소해 업스트림을 닫음
+    """
+    _DONE = object()
+
+    def __init__(self, key: str, client: genai.Client, prompt: str, semaphore: asyncio.Semaphore, inflight: dict):
+        self.key = key
+        self.inflight = inflight
+        self.parts = []
+        self.queues = []
+        self.failed = False
+        self.task = asyncio.ensure_future(self._produce(client, prompt, semaphore))
+
+    def _publish(self, item):
+        for queue in self.queues:
+            queue.put_nowait(item)
+
+    def _detach(self):
+        # 더 이상 새 구독자가 붙지 않도록 (이미 다른 스트림으로 바뀌었으면 그대로 둠)
+        if self.inflight.get(self.key) is self:
+            del self.inflight[self.key]
+
+    async def _produce(self, client: genai.Client, prompt: str, semaphore: asyncio.Semaphore):
+        stream = None
+        try:
+            # 동시 호출 수는 스트림을 열고 첫 조각을 받을 때까지만 제한
+            # (조각을 보내는 동안에도 잡고 있으면 느리게 읽는 SSE 클라이언트가 다른 요청의 자리를 막음)
+            async with semaphore:
+                # 첫 조각까지만 예산을 적용 (이후 조각 사이 지연은 HTTP 제한 시간이 담당)
+                stream, chunk = await asyncio.wait_for(_open_stream(client, prompt), GEMINI_FIRST_TOKEN_BUDGET)
+            while chunk is not None:
+                if chunk.text:
+                    self.parts.append(chunk.text)
+                    self._publish(chunk.text)
+                chunk = await _next_chunk(stream)
+            text = "".join(self.parts).strip()
+            if text:
+                await asyncio.to_thread(cache_put, self.key, text)
+        except asyncio.CancelledError:
+            self.failed = True
+            raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                print("⚠️ Gemini 첫 응답이 예산을 넘어 로컬 코치 조언으로 대체")
+            else:
+                print(f"Gemini API 스트리밍 오류: {e!r}")
+            self.failed = True
+        finally:
+            self._detach()
+            self._publish(self._DONE)
+            if stream is not None:
+                # 중간에 멈춘 경우 HTTP 응답을 닫아 더 이상 토큰을 받지 않음
+                await stream.aclose()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """조각을 yield, 업스트림이 실패하면 아무것도 보내지 않고 끝남 (failed로 확인)"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for part in self.parts:
+            queue.put_nowait(part)
+        if self.task.done():
+            queue.put_nowait(self._DONE)
+        self.queues.append(queue)
+        try:
+            while True:
+                item = await queue.get()
+                if item is self._DONE:
+                    return
+                yield item
+        finally:
+            self.queues.remove(queue)
+            if not self.queues and not self.task.done():
+                # 마지막 구독자가 떠남 → 업스트림 생성 중단
+                self._detach()
+                self.task.cancel()
+                await asyncio.wait([self.task])
+
+async def stream_ai_recommendation(
+    quest_name: str,
+    duration: int,
+    difficulty: int,
+    consistency_score: int,
+    risk_aversion_score: int,
+    total_quests: int,
+    completed_quests: int,
+    preferred_category: str = None,
+    category: str = None
+) -> AsyncIterator[str]:
+    """
+    조언을 생성되는 대로 조각(str) 단위로 yield 합니다.
+    local tier이거나 Gemini를 쓸 수 없거나 첫 조각이 GEMINI_FIRST_TOKEN_BUDGET 안에 오지 않으면 로컬 코치 조언을 한 번에 내보냅니다.
+    캐시에 있으면 한 번에 내보내고, 끝까지 받은 응답만 캐시에 저장합니다.
+    소비하는 쪽이 중간에 멈추면(취소/aclose) 업스트림 스트림을 닫아 생성을 중단합니다.
+    """
+    def local() -> str:
+        return local_coach.local_recommendation(
+            quest_name, duration, difficulty, consistency_score, risk_aversion_score,
+            total_quests, completed_quests, preferred_category, category
+        )
+
+    if AI_COACH_TIER != "gemini":
+        yield local()
+        return
+
+    profile = bucket_profile(total_quests, completed_quests, consistency_score, risk_aversion_score, preferred_category)
+    key = prompt_fingerprint(quest_name, duration, difficulty, profile)
+    cached = cache_get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    client = get_gemini_client()
+    if client is None:
+        yield local()
+        return
+
+    semaphore, inflight = _state_for_running_loop()
+    shared = inflight.get(key)
+    if shared is None:
+        # 첫 요청만 업스트림 스트림을 열고, 같은 키의 나머지 요청은 같은 조각을 나눠 받음
+        shared = _SharedStream(key, client, build_prompt(quest_name, duration, difficulty, profile), semaphore, inflight)
+        inflight[key] = shared
+
+    received = False
+    tokens = shared.subscribe()
+    try:
+        async for text in tokens:
+            received = True
+            yield text
+    finally:
+        await tokens.aclose()
+    if shared.failed and not received:
+        yield local()
@@ -0,0 +1,149 @@
+"""
+DB 관리 및 데이터 구조 정의 (백본)
+QuestHistory 전체를 읽어 일일 활동 롤업(user_daily_activity), 사용자별 스트릭 상태, 퀘스트별 최신 진행률을 다시 계산
+기존 DB에 롤업 테이블을 처음 채우거나, 롤업이 어긋났을 때 복구용으로 실행
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from typing import Optional
+from sqlalchemy import insert, select, update, func
+from sqlalchemy.orm import Session
+from .database import SessionLocal, User, Quest, QuestHistory, UserDailyActivity, init_db
+from .crud import activity_contributions
+
+# 집계를 insert로 내보내는 사용자 단위 (메모리 사용량 제한)
+USERS_PER_BATCH = 1000
+
+
+def _flush(db: Session, totals: dict):
+    """집계된 {(user_id, date): [completions, progress_events]}를 한 번에 insert (커밋은 마지막에 한 번)"""
+    rows = [
+        {"user_id": user_id, "date": day, "completions": max(c, 0), "progress_events": max(p, 0)}
+        for (user_id, day), (c, p) in totals.items()
+        if c > 0 or p > 0
+    ]
+    if rows:
+        db.execute(insert(UserDailyActivity), rows)
+    totals.clear()
+
+
+def backfill_daily_activity(db: Session, user_id: Optional[int] = None) -> int:
+    """히스토리로부터 롤업을 재구성합니다. user_id를 주면 해당 사용자만 처리합니다."""
+    delete_query = db.query(UserDailyActivity)
+    history_query = db.query(
+        QuestHistory.user_id, QuestHistory.quest_id, QuestHistory.action, QuestHistory.timestamp
+    )
+    if user_id is not None:
+        delete_query = delete_query.filter(UserDailyActivity.user_id == user_id)
+        history_query = history_query.filter(QuestHistory.user_id == user_id)
+    delete_query.delete(synchronize_session=False)
+
+    history_query = history_query.filter(QuestHistory.timestamp.isnot(None)).order_by(
+        QuestHistory.user_id, QuestHistory.quest_id, QuestHistory.timestamp, QuestHistory.id
+    )
+
+    totals = defaultdict(lambda: [0, 0])
+    processed_users = 0
+    current_user, current_quest, events = None, None, []
+
+    def close_quest():
+        for day, (c, p) in activity_contributions(events).items():
+            totals[(current_user, day)][0] += c
+            totals[(current_user, day)][1] += p
+
+    for row_user, row_quest, action, ts in history_query.yield_per(5000):
+        if (row_user, row_quest) != (current_user, current_quest):
+            if events:
+                close_quest()
+            if row_user != current_user:
+                processed_users += 1
+                if processed_users % USERS_PER_BATCH == 0:
+                    _flush(db, totals)
+            current_user, current_quest, events = row_user, row_quest, []
+        events.append((action, ts))
+
+    if events:
+        close_quest()
+    _flush(db, totals)
+    db.commit()
+    return processed_users
+
+
+def backfill_streak_state(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    롤업으로부터 사용자별 스트릭 상태(streak_days, last_active_date, longest_streak)를 재계산합니다.
+    crud.recompute_streak_state와 같은 결과를 사용자별 조회 없이 완료일 전체를 한 번 훑어서 계산하고,
+    사용자 USERS_PER_BATCH명씩 기본키 기준 bulk UPDATE로 씁니다.
+    """
+    reset = update(User).values(streak_days=0, last_active_date=None, longest_streak=0)
+    days_query = (
+        select(UserDailyActivity.user_id, UserDailyActivity.date)
+        .where(UserDailyActivity.completions > 0)
+        .order_by(UserDailyActivity.user_id, UserDailyActivity.date)
+    )
+    if user_id is not None:
+        reset = reset.where(User.id == user_id)
+        days_query = days_query.where(UserDailyActivity.user_id == user_id)
+    # 완료일이 없는 사용자는 초기값으로 남음
+    result = db.execute(reset.execution_options(synchronize_session=False))
+
+    rows = []
+    current, run, longest, prev = None, 0, 0, None
+
+    def close_user():
+        # 마지막 연속 구간이 곧 last_active_date로 끝나는 스트릭
+        rows.append({"id": current, "streak_days": run, "last_active_date": prev, "longest_streak": longest})
+        if len(rows) >= USERS_PER_BATCH:
+            db.execute(update(User), rows)
+            rows.clear()
+
+    for uid, day in db.execute(days_query.execution_options(yield_per=5000)):
+        if uid != current:
+            if current is not None:
+                close_user()
+            current, run, longest, prev = uid, 0, 0, None
+        run = run + 1 if prev is not None and day == prev + timedelta(days=1) else 1
+        longest = max(longest, run)
+        prev = day
+    if current is not None:
+        close_user()
+    if rows:
+        db.execute(update(User), rows)
+    db.commit()
+    return result.rowcount
+
+
+def backfill_quest_progress(db: Session, user_id: Optional[int] = None) -> int:
+    """각 퀘스트의 마지막 히스토리 progress를 quests.progress로 한 번의 UPDATE로 복사합니다."""
+    latest_progress = (
+        select(QuestHistory.progress)
+        .where(QuestHistory.quest_id == Quest.id)
+        .order_by(QuestHistory.timestamp.desc(), QuestHistory.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    stmt = update(Quest).values(progress=func.coalesce(latest_progress, 0.0))
+    if user_id is not None:
+        stmt = stmt.where(Quest.user_id == user_id)
+    result = db.execute(stmt.execution_options(synchronize_session=False))
+    db.commit()
+    return result.rowcount
+
+
+def run_backfill():
+    init_db()
+    db = SessionLocal()
+    try:
+        users = backfill_daily_activity(db)
+        backfill_streak_state(db)
+        backfill_quest_progress(db)
+    finally:
+        db.close()
+    print(f"✅ 일일 활동 롤업, 스트릭, 퀘스트 진행률 재계산 완료 (사용자 {users}명)")
+
+
+if __name__ == "__main__":
+    run_backfill()
+
+# python -m src.backfill
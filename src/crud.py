@@ -3,14 +3,19 @@ DB 관리 및 데이터 구조 정의 (백본)
 database.py의 모델과 schemas.py의 형식을 사용하여 실제 DB와의 상호작용(생성, 읽기, 업데이트, 삭제)을 위한 함수
 '''
 from sqlalchemy.orm import Session
-from .database import User, Quest, QuestHistory, SessionLocal
+from sqlalchemy import func, select, insert, update, and_, or_, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from .database import User, Quest, QuestHistory, UserDailyActivity, SessionLocal
 from .schemas import UserCreate, QuestCreate, UserUpdateScores
 from . import model
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone, timedelta, date
+from collections import defaultdict
 from sklearn.metrics.pairwise import cosine_similarity
 from .model import EMBEDDER, load_ml_model
 from typing import Optional, List
 import logging
+import base64
+import json
 from sentence_transformers import SentenceTransformer
 import torch
 
@@ -20,6 +25,15 @@ def get_user(db: Session, user_id: int):
     """ID로 사용자 정보를 조회합니다."""
     return db.query(User).filter(User.id == user_id).first()
 
+def get_view_version(db: Session, user_id: int) -> Optional[int]:
+    """퀘스트 목록 캐시 버전 (PK 조회 한 번, 사용자가 없으면 None)"""
+    row = db.execute(select(User.view_version).where(User.id == user_id)).first()
+    return None if row is None else (row[0] or 0)
+
+def bump_view_version(db: Session, user_id: int):
+    """퀘스트 데이터를 바꾼 트랜잭션 안에서 호출 (커밋되면 모든 워커의 목록 캐시가 무효화됨)"""
+    db.execute(update(User).where(User.id == user_id).values(view_version=func.coalesce(User.view_version, 0) + 1))
+
 def get_users(db: Session, skip: int = 0, limit: int = 100):
     """사용자 목록을 조회합니다."""
     return db.query(User).offset(skip).limit(limit).all()
@@ -35,30 +49,228 @@ def create_user(db: Session, user: UserCreate):
     db.refresh(db_user) # ID와 같은 자동 생성된 값을 로드
     return db_user
 
-# 사용자의 연속 퀘스트 수행 일수를 계산
-def calculate_streak_days(db: Session, user_id: int) -> int:
-    completions = db.query(QuestHistory.timestamp).filter(
-        QuestHistory.user_id == user_id,
-        QuestHistory.action == "completed"
-    ).order_by(QuestHistory.timestamp.asc()).all()
-
-    if not completions:
-        return 0
+# ----------------------------
+# 일일 활동 롤업 (user_daily_activity)
+# 진행률 기록으로 집계되는 액션
+PROGRESS_ACTIONS = ("progress_update", "progress", "check-in")
+# 이만큼 이상 바뀐 진행률만 progress_update로 기록 (0.1 단위로 반올림한 값의 부동소수점 오차 허용)
+PROGRESS_STEP = 0.1
+
+def progress_changed(current: Optional[float], progress: float) -> bool:
+    """quests.progress(마지막 히스토리의 progress)와 비교해 새 기록을 남길 만큼 바뀌었는지"""
+    return abs((current or 0.0) - progress) >= PROGRESS_STEP - 1e-9
+
+def activity_date(ts: datetime) -> date:
+    """히스토리 timestamp가 집계될 날짜 (func.date(timestamp)와 동일한 기준)"""
+    return ts.date()
+
+def record_daily_activity(db: Session, user_id: int, day: date, completions: int = 0, progress_events: int = 0) -> Optional[int]:
+    """(user_id, day) 롤업 행에 증감분을 upsert하고 갱신 후 완료 수를 반환합니다. 커밋은 호출자가 합니다."""
+    if not completions and not progress_events:
+        return None
+    stmt = sqlite_insert(UserDailyActivity).values(
+        user_id=user_id,
+        date=day,
+        completions=max(completions, 0),
+        progress_events=max(progress_events, 0),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserDailyActivity.user_id, UserDailyActivity.date],
+        set_={
+            "completions": func.max(UserDailyActivity.completions + completions, 0),
+            "progress_events": func.max(UserDailyActivity.progress_events + progress_events, 0),
+        },
+    ).returning(UserDailyActivity.completions)
+    return db.execute(stmt).scalar()
+
+def activity_contributions(events) -> dict:
+    """
+    한 퀘스트의 (action, timestamp) 이벤트(시간순)가 롤업에 기여하는 값을 계산합니다.
+    'reopened'는 직전에 남아있는 'completed'를 취소합니다. 반환값: {date: [completions, progress_events]}
+    """
+    totals = defaultdict(lambda: [0, 0])
+    pending_completion = None
+    for action, ts in events:
+        if action == "completed":
+            pending_completion = activity_date(ts)
+            totals[pending_completion][0] += 1
+        elif action == "reopened":
+            if pending_completion is not None:
+                totals[pending_completion][0] -= 1
+                pending_completion = None
+        elif action in PROGRESS_ACTIONS:
+            totals[activity_date(ts)][1] += 1
+    return totals
+
+def log_quest_history(db: Session, quest: Quest, action: str, progress: float = 0.0, timestamp: Optional[datetime] = None, **fields) -> QuestHistory:
+    """QuestHistory를 추가하고 일일 활동 롤업을 같은 트랜잭션에서 갱신합니다."""
+    timestamp = timestamp or datetime.now(timezone.utc)
+
+    if action == "completed":
+        day = activity_date(timestamp)
+        # 그날의 첫 완료일 때만 스트릭 상태가 바뀜
+        if record_daily_activity(db, quest.user_id, day, completions=1) == 1:
+            update_streak_on_completion(db, quest.user_id, day)
+    elif action == "reopened":
+        # 아직 취소되지 않은 마지막 완료 기록이 있다면 그 날짜의 완료 수를 되돌림
+        last_state = (
+            db.query(QuestHistory.action, QuestHistory.timestamp)
+            .filter(
+                QuestHistory.quest_id == quest.id,
+                QuestHistory.action.in_(["completed", "reopened"])
+            )
+            .order_by(QuestHistory.timestamp.desc(), QuestHistory.id.desc())
+            .first()
+        )
+        if last_state and last_state.action == "completed":
+            day = activity_date(last_state.timestamp)
+            # 그날의 마지막 완료가 취소된 경우에만 스트릭을 다시 계산
+            if record_daily_activity(db, quest.user_id, day, completions=-1) == 0:
+                recompute_streak_state(db, quest.user_id)
+    elif action in PROGRESS_ACTIONS:
+        record_daily_activity(db, quest.user_id, activity_date(timestamp), progress_events=1)
 
-    dates = [c[0].date() for c in completions]
-    streak = 1
-    max_streak = 1
+    history_entry = QuestHistory(
+        quest_id=quest.id,
+        user_id=quest.user_id,
+        action=action,
+        progress=progress,
+        timestamp=timestamp,
+        **fields
+    )
+    db.add(history_entry)
+    # 세션이 autoflush=False라 같은 트랜잭션의 다음 호출('reopened'의 마지막 완료 조회)이 이 행을 보도록 바로 flush
+    db.flush()
+    # 비정규화된 최신 진행률 (quests.progress) 동기화
+    quest.progress = progress
+    return history_entry
+
+def remove_quest_activity(db: Session, quest: Quest):
+    """퀘스트 삭제 전, 해당 퀘스트 히스토리가 롤업에 기여한 값을 제거합니다."""
+    events = (
+        db.query(QuestHistory.action, QuestHistory.timestamp)
+        .filter(QuestHistory.quest_id == quest.id)
+        .order_by(QuestHistory.timestamp.asc(), QuestHistory.id.asc())
+        .all()
+    )
+    emptied_day = False
+    for day, (completions, progress_events) in activity_contributions(events).items():
+        remaining = record_daily_activity(db, quest.user_id, day, completions=-completions, progress_events=-progress_events)
+        if completions > 0 and remaining == 0:
+            emptied_day = True
+
+    if emptied_day:
+        recompute_streak_state(db, quest.user_id)
+
+def get_daily_activity(db: Session, user_id: int, start: date, end: date, completed_only: bool = False):
+    """[start, end] 범위의 롤업 행을 날짜순으로 조회합니다."""
+    query = db.query(UserDailyActivity).filter(
+        UserDailyActivity.user_id == user_id,
+        UserDailyActivity.date >= start,
+        UserDailyActivity.date <= end
+    )
+    if completed_only:
+        query = query.filter(UserDailyActivity.completions > 0)
+    return query.order_by(UserDailyActivity.date.asc()).all()
+
+def iter_completed_days_desc(db: Session, user_id: int, until: Optional[date] = None, chunk_size: int = 120):
+    """완료 기록이 있는 날짜를 최근 순으로, 필요한 만큼만 chunk 단위로 읽어옵니다."""
+    upper = until
+    while True:
+        query = db.query(UserDailyActivity.date).filter(
+            UserDailyActivity.user_id == user_id,
+            UserDailyActivity.completions > 0
+        )
+        if upper is not None:
+            query = query.filter(UserDailyActivity.date <= upper)
+        days = [row[0] for row in query.order_by(UserDailyActivity.date.desc()).limit(chunk_size).all()]
+        yield from days
+        if len(days) < chunk_size:
+            return
+        upper = days[-1] - timedelta(days=1)
 
-    for i in range(1, len(dates)):
-        if (dates[i] - dates[i - 1]) == timedelta(days=1):
+# ----------------------------
+# 스트릭 상태 (users.streak_days / last_active_date / longest_streak)
+def update_streak_on_completion(db: Session, user_id: int, day: date):
+    """완료 기록이 없던 날에 첫 완료가 생겼을 때 스트릭 상태를 O(1)로 갱신합니다."""
+    user = db.get(User, user_id)
+    if not user:
+        return
+    last_day = user.last_active_date
+
+    if last_day is not None and day < last_day:
+        # 과거 날짜에 완료가 끼어든 경우 (시드/일괄 입력) 연속 구간이 합쳐질 수 있으므로 재계산
+        recompute_streak_state(db, user_id)
+        return
+
+    if last_day is not None and day == last_day + timedelta(days=1):
+        user.streak_days = (user.streak_days or 0) + 1
+    elif last_day != day:
+        user.streak_days = 1
+    user.last_active_date = day
+    user.longest_streak = max(user.longest_streak or 0, user.streak_days)
+
+def recompute_streak_state(db: Session, user_id: int):
+    """롤업의 완료일로부터 스트릭 상태를 다시 계산합니다. (어떤 날의 마지막 완료가 취소됐을 때의 폴백)"""
+    user = db.get(User, user_id)
+    if not user:
+        return
+
+    days = iter_completed_days_desc(db, user_id)
+    last_day = next(days, None)
+    streak = 0
+    if last_day is not None:
+        streak = 1
+        expected = last_day - timedelta(days=1)
+        for day in days:
+            if day != expected:
+                break
             streak += 1
-        elif dates[i] != dates[i - 1]:
-            streak = 1
-        max_streak = max(max_streak, streak)
+            expected -= timedelta(days=1)
+
+    # 최장 스트릭은 완료일 전체(하루 한 행)를 한 번 훑어서 계산
+    longest, run, prev = 0, 0, None
+    for (day,) in (
+        db.query(UserDailyActivity.date)
+        .filter(UserDailyActivity.user_id == user_id, UserDailyActivity.completions > 0)
+        .order_by(UserDailyActivity.date.asc())
+    ):
+        run = run + 1 if prev is not None and day == prev + timedelta(days=1) else 1
+        longest = max(longest, run)
+        prev = day
+
+    user.streak_days = streak
+    user.last_active_date = last_day
+    user.longest_streak = longest
+
+def current_streak(user: User, today: Optional[date] = None) -> int:
+    """저장된 스트릭 상태로 현재 스트릭을 계산합니다. (마지막 완료일이 어제 이전이면 0)"""
+    if not user or user.last_active_date is None:
+        return 0
+    today = today or datetime.now().date()
+    if user.last_active_date < today - timedelta(days=1):
+        return 0
+    return user.streak_days or 0
+
+# 사용자의 연속 퀘스트 수행 일수를 계산
+def calculate_streak_days(db: Session, user_id: int) -> int:
+    """마지막 완료일로 끝나는 연속 완료 일수 (마지막 완료일이 어제 이전이면 0)"""
+    days = iter_completed_days_desc(db, user_id)
+    last_day = next(days, None)
+    if last_day is None:
+        return 0
 
     # 최근 완료일이 어제거나 오늘이면 유지, 아니면 0으로 리셋
-    if dates[-1] < datetime.now().date() - timedelta(days=1):
+    if last_day < datetime.now().date() - timedelta(days=1):
         return 0
+
+    streak = 1
+    expected = last_day - timedelta(days=1)
+    for day in days:
+        if day != expected:
+            break
+        streak += 1
+        expected -= timedelta(days=1)
     return streak
 
 # ----------------------------
@@ -75,23 +287,7 @@ def create_user_quest(db: Session, quest: QuestCreate):
     quest_data = quest.model_dump()
     quest_data['success_rate'] = predicted_rate
 
-    db_quest = Quest(**quest_data)
-    db.add(db_quest)
-    db.commit()
-    db.refresh(db_quest)
-    
-    history_entry = QuestHistory(
-        quest_id=db_quest.id,
-        user_id=db_quest.user_id,
-        action="created",
-        progress=0.0,
-        started_at=db_quest.created_at,
-        timestamp=datetime.now(timezone.utc)
-    )
-    db.add(history_entry)
-    db.commit()
-
-    return db_quest
+    return create_quest(db, quest_data)
 
 # 퀘스트 목록 조회
 def get_quests(db: Session, skip: int = 0, limit: int = 100):
@@ -104,20 +300,125 @@ def get_quest_by_user(db: Session, quest_id: int, user_id: int):
         Quest.user_id == user_id
     ).first()
 
-# 특정 유저의 모든 퀘스트 목록 (대시보드/목록용)
-def get_quests_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+# 특정 유저의 모든 퀘스트 목록 (개수 제한 없음, 페이지 단위 조회는 get_quests_page 사용)
+def get_quests_by_user(db: Session, user_id: int):
     return (
         db.query(Quest)
         .filter(Quest.user_id == user_id)
-        .offset(skip)
-        .limit(limit)
+        .order_by(Quest.created_at.desc(), Quest.id.desc())
         .all()
     )
 
+# 사용자의 전체/완료 퀘스트 수 (목록 페이지 통계용, 한 번의 집계 쿼리)
+def count_quests_by_user(db: Session, user_id: int):
+    total, completed = db.query(
+        func.count(Quest.id),
+        func.coalesce(func.sum(case((Quest.completed == True, 1), else_=0)), 0)
+    ).filter(Quest.user_id == user_id).one()
+    return total, completed
+
 # ID로 퀘스트 조회
 def get_quest(db: Session, quest_id: int):
     return db.query(Quest).filter(Quest.id == quest_id).first()
 
+# ----------------------------
+# 키셋(커서) 페이지네이션
+# OFFSET 대신 마지막 행의 (정렬 키, id) 다음부터 읽으므로 깊은 페이지도 첫 페이지와 비용이 같음
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(*values) -> str:
+    """정렬 키 값들을 클라이언트에 노출할 불투명 커서 문자열로 변환합니다."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> list:
+    """encode_cursor로 만든 커서를 값 목록으로 되돌립니다. 형식이 잘못되면 ValueError."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception as e:
+        raise ValueError(f"잘못된 커서: {cursor}") from e
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError(f"잘못된 커서: {cursor}")
+    return values
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    return max(1, min(limit or PAGE_SIZE, MAX_PAGE_SIZE))
+
+def _keyset_query(query, sort_col, id_col, cursor: Optional[str], descending: bool = True):
+    """커서 다음 행만 남기는 조건과 (sort_col, id) 정렬을 쿼리에 붙입니다."""
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        try:
+            if sort_col.type.python_type is datetime:
+                sort_value = datetime.fromisoformat(sort_value)
+            row_id = int(row_id)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"잘못된 커서: {cursor}") from e
+        if descending:
+            query = query.filter(or_(sort_col < sort_value, and_(sort_col == sort_value, id_col < row_id)))
+        else:
+            query = query.filter(or_(sort_col > sort_value, and_(sort_col == sort_value, id_col > row_id)))
+
+    order = (sort_col.desc(), id_col.desc()) if descending else (sort_col.asc(), id_col.asc())
+    return query.order_by(*order)
+
+def _keyset_page(query, sort_col, id_col, cursor: Optional[str], limit: Optional[int], descending: bool = True):
+    """(sort_col, id) 순서로 커서 다음 페이지를 읽고 (행 목록, 다음 커서)를 반환합니다."""
+    limit = clamp_page_size(limit)
+    # 한 건 더 읽어 다음 페이지 존재 여부 확인
+    rows = _keyset_query(query, sort_col, id_col, cursor, descending).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_col.key), getattr(last, id_col.key))
+
+class KeysetStream:
+    """
+    _keyset_page와 같은 페이지를 리스트로 모으지 않고 yield_per 커서로 한 행씩 내보냅니다.
+    템플릿 스트리밍용이며, 끝까지 순회한 뒤 next_cursor가 채워집니다.
+    """
+    def __init__(self, query, sort_col, id_col, cursor: Optional[str] = None, limit: Optional[int] = PAGE_SIZE, descending: bool = True, batch_size: int = 100):
+        self.limit = clamp_page_size(limit)
+        self.sort_col, self.id_col = sort_col, id_col
+        self.query = _keyset_query(query, sort_col, id_col, cursor, descending).limit(self.limit + 1)
+        self.batch_size = batch_size
+        self.next_cursor = None
+
+    def __iter__(self):
+        last = None
+        for i, row in enumerate(self.query.yield_per(self.batch_size)):
+            if i == self.limit:
+                self.next_cursor = encode_cursor(getattr(last, self.sort_col.key), getattr(last, self.id_col.key))
+                break
+            last = row
+            yield row
+
+def stream_quests_page(db: Session, user_id: int, completed: Optional[bool] = None, cursor: Optional[str] = None, limit: Optional[int] = PAGE_SIZE) -> KeysetStream:
+    """get_quests_page의 스트리밍 버전 (목록 페이지 렌더링용)"""
+    query = db.query(Quest).filter(Quest.user_id == user_id)
+    if completed is not None:
+        query = query.filter(Quest.completed == completed)
+    return KeysetStream(query, Quest.created_at, Quest.id, cursor, limit)
+
+def get_users_page(db: Session, cursor: Optional[str] = None, limit: Optional[int] = PAGE_SIZE):
+    """사용자를 id 순으로 한 페이지 조회합니다."""
+    return _keyset_page(db.query(User), User.id, User.id, cursor, limit, descending=False)
+
+def get_quests_page(db: Session, user_id: int, completed: Optional[bool] = None, cursor: Optional[str] = None, limit: Optional[int] = PAGE_SIZE):
+    """사용자 퀘스트를 (created_at, id) 최신순으로 한 페이지 조회합니다."""
+    query = db.query(Quest).filter(Quest.user_id == user_id)
+    if completed is not None:
+        query = query.filter(Quest.completed == completed)
+    return _keyset_page(query, Quest.created_at, Quest.id, cursor, limit)
+
+def get_quest_history_page(db: Session, quest_id: int, cursor: Optional[str] = None, limit: Optional[int] = PAGE_SIZE):
+    """퀘스트 히스토리를 (timestamp, id) 최신순으로 한 페이지 조회합니다."""
+    query = db.query(QuestHistory).filter(QuestHistory.quest_id == quest_id)
+    return _keyset_page(query, QuestHistory.timestamp, QuestHistory.id, cursor, limit)
+
 # 퀘스트 완료로 변경 
 def mark_quest_complete(db: Session, quest_id: int):
     db_quest = db.query(Quest).filter(Quest.id == quest_id).first()
@@ -129,25 +430,187 @@ def mark_quest_complete(db: Session, quest_id: int):
     return None
 
 # 새로운 퀘스트 생성 및 DB 저장
-def create_quest(db: Session, quest_data: dict):
-
+# 퀘스트와 "created" 히스토리를 한 트랜잭션으로 기록 (flush로 id를 받고 커밋은 한 번)
+def create_quest(db: Session, quest_data: dict, commit: bool = True):
     db_quest = Quest(**quest_data)
     db.add(db_quest)
-    db.commit()
-    db.refresh(db_quest)
-    
-    history_entry = QuestHistory(
-        quest_id=db_quest.id,
-        user_id=db_quest.user_id,
-        action="created",
-        progress=0.0,
-        started_at=datetime.now(timezone.utc),
-        timestamp=datetime.now(timezone.utc)
+    db.flush()
+
+    log_quest_history(db, db_quest, "created", progress=0.0, started_at=datetime.now(timezone.utc))
+    if commit:
+        db.commit()
+    return db_quest
+
+# 예측 전에 임시로 저장할 성공률 (사용자 평균 성공률, 없으면 0.5)
+DEFAULT_PROVISIONAL_RATE = 0.5
+
+def provisional_success_rate(db: Session, user_id: int) -> float:
+    average = db.query(User.average_success_rate).filter(User.id == user_id).scalar()
+    return average if average else DEFAULT_PROVISIONAL_RATE
+
+# 나중에 계산된 예측 성공률 반영 (퀘스트가 그 사이 삭제됐으면 False)
+def update_quest_success_rate(db: Session, quest_id: int, success_rate: float) -> bool:
+    updated = db.query(Quest).filter(Quest.id == quest_id).update(
+        {Quest.success_rate: success_rate}, synchronize_session=False
     )
-    db.add(history_entry)
+    if updated:
+        bump_view_version(db, db.query(Quest.user_id).filter(Quest.id == quest_id).scalar())
     db.commit()
+    return updated > 0
 
-    return db_quest
+# ----------------------------
+# 일괄 변경 (토글/삭제/진행률)
+# 여러 퀘스트를 한 트랜잭션에서 처리: 히스토리는 한 번의 bulk insert, 롤업은 날짜별 한 번,
+# 스트릭과 사용자 카운터는 배치당 한 번만 갱신. 커밋은 호출자가 합니다.
+MAX_BULK_ITEMS = 500
+
+def get_quests_by_ids(db: Session, user_id: int, quest_ids) -> dict:
+    """사용자 소유 퀘스트를 {id: Quest}로 한 번에 조회합니다."""
+    quests = db.query(Quest).filter(Quest.user_id == user_id, Quest.id.in_(quest_ids)).all()
+    return {q.id: q for q in quests}
+
+def latest_history_by_quest(db: Session, quest_ids, actions=None) -> dict:
+    """퀘스트별 가장 최근 히스토리(action, timestamp)를 윈도 함수 한 번으로 조회합니다."""
+    rank = func.row_number().over(
+        partition_by=QuestHistory.quest_id,
+        order_by=(QuestHistory.timestamp.desc(), QuestHistory.id.desc())
+    ).label("rank")
+    stmt = select(QuestHistory.quest_id, QuestHistory.action, QuestHistory.timestamp, rank).where(
+        QuestHistory.quest_id.in_(quest_ids)
+    )
+    if actions:
+        stmt = stmt.where(QuestHistory.action.in_(actions))
+    ranked = stmt.subquery()
+    rows = db.execute(
+        select(ranked.c.quest_id, ranked.c.action, ranked.c.timestamp).where(ranked.c.rank == 1)
+    ).all()
+    return {row.quest_id: row for row in rows}
+
+def _apply_activity_deltas(db: Session, user_id: int, completions_by_day: dict, progress_by_day: Optional[dict] = None):
+    """날짜별 증감분을 롤업에 반영하고, 필요할 때만 스트릭을 한 번 갱신합니다."""
+    progress_by_day = progress_by_day or {}
+    new_days, emptied = [], False
+    for day in sorted(set(completions_by_day) | set(progress_by_day)):
+        delta = completions_by_day.get(day, 0)
+        remaining = record_daily_activity(db, user_id, day, completions=delta, progress_events=progress_by_day.get(day, 0))
+        if delta > 0 and remaining == delta:
+            new_days.append(day)
+        elif delta < 0 and remaining == 0:
+            emptied = True
+
+    if emptied or len(new_days) > 1:
+        recompute_streak_state(db, user_id)
+    elif new_days:
+        update_streak_on_completion(db, user_id, new_days[0])
+
+def refresh_user_counters(db: Session, user_id: int):
+    """users.total_quests / completed_quests를 집계 쿼리 한 번으로 맞춥니다."""
+    user = db.get(User, user_id)
+    if user:
+        db.flush()  # 세션의 완료 상태 변경이 집계에 반영되도록
+        user.total_quests, user.completed_quests = count_quests_by_user(db, user_id)
+
+def bulk_toggle_quests(db: Session, user_id: int, quest_ids) -> list:
+    """퀘스트들의 완료 상태를 각각 반전합니다. 하나라도 없으면 KeyError(없는 id 목록)."""
+    quest_ids = list(dict.fromkeys(quest_ids))
+    quests = get_quests_by_ids(db, user_id, quest_ids)
+    missing = [qid for qid in quest_ids if qid not in quests]
+    if missing:
+        raise KeyError(missing)
+
+    last_logs = latest_history_by_quest(db, quest_ids)
+    last_states = latest_history_by_quest(db, quest_ids, actions=["completed", "reopened"])
+    now = datetime.now(timezone.utc)
+    history_rows, completions_by_day = [], defaultdict(int)
+
+    for qid in quest_ids:
+        quest = quests[qid]
+        quest.completed = not quest.completed
+        last_log = last_logs.get(qid)
+
+        if quest.completed:
+            quest.completed_at = now
+            created_at = quest.created_at if quest.created_at.tzinfo else quest.created_at.replace(tzinfo=timezone.utc)
+            # 기존 completed 로그가 있으면 새로 추가하지 않음
+            if not last_log or last_log.action != "completed":
+                completions_by_day[activity_date(now)] += 1
+                history_rows.append({
+                    "quest_id": qid, "user_id": user_id, "action": "completed", "progress": 1.0,
+                    "timestamp": now, "completed_at": now,
+                    "duration_days": max((now - created_at).days, 1),
+                })
+                quest.progress = 1.0
+        else:
+            quest.completed_at = None
+            # 최근 로그가 이미 reopened이면 중복 추가 안 함
+            if not last_log or last_log.action != "reopened":
+                last_state = last_states.get(qid)
+                if last_state and last_state.action == "completed":
+                    completions_by_day[activity_date(last_state.timestamp)] -= 1
+                history_rows.append({
+                    "quest_id": qid, "user_id": user_id, "action": "reopened", "progress": 0.0, "timestamp": now,
+                })
+                quest.progress = 0.0
+
+    if history_rows:
+        db.execute(insert(QuestHistory), history_rows)
+    _apply_activity_deltas(db, user_id, {d: c for d, c in completions_by_day.items() if c})
+    refresh_user_counters(db, user_id)
+    return [quests[qid] for qid in quest_ids]
+
+def bulk_delete_quests(db: Session, user_id: int, quest_ids) -> int:
+    """퀘스트와 히스토리를 삭제하고 롤업 기여분을 한 번에 되돌립니다. 하나라도 없으면 KeyError."""
+    quest_ids = list(dict.fromkeys(quest_ids))
+    quests = get_quests_by_ids(db, user_id, quest_ids)
+    missing = [qid for qid in quest_ids if qid not in quests]
+    if missing:
+        raise KeyError(missing)
+
+    events_by_quest = defaultdict(list)
+    rows = (
+        db.query(QuestHistory.quest_id, QuestHistory.action, QuestHistory.timestamp)
+        .filter(QuestHistory.quest_id.in_(quest_ids))
+        .order_by(QuestHistory.quest_id, QuestHistory.timestamp.asc(), QuestHistory.id.asc())
+    )
+    for qid, action, ts in rows:
+        events_by_quest[qid].append((action, ts))
+
+    completions_by_day, progress_by_day = defaultdict(int), defaultdict(int)
+    for events in events_by_quest.values():
+        for day, (completions, progress_events) in activity_contributions(events).items():
+            completions_by_day[day] -= completions
+            progress_by_day[day] -= progress_events
+
+    _apply_activity_deltas(db, user_id, completions_by_day, progress_by_day)
+    db.query(QuestHistory).filter(QuestHistory.quest_id.in_(quest_ids)).delete(synchronize_session=False)
+    deleted = db.query(Quest).filter(Quest.user_id == user_id, Quest.id.in_(quest_ids)).delete(synchronize_session=False)
+    refresh_user_counters(db, user_id)
+    return deleted
+
+def bulk_update_progress(db: Session, user_id: int, updates: dict) -> list:
+    """{quest_id: progress}를 반영하고, 0.1 이상 바뀐 퀘스트만 progress_update 기록을 남깁니다."""
+    quests = get_quests_by_ids(db, user_id, list(updates))
+    missing = [qid for qid in updates if qid not in quests]
+    if missing:
+        raise KeyError(missing)
+
+    now = datetime.now(timezone.utc)
+    history_rows = []
+    for qid, progress in updates.items():
+        quest = quests[qid]
+        progress = round(progress, 1)
+        # 기록을 남길 때만 quests.progress를 옮겨, 작은 변화가 쌓여도 히스토리와 어긋나지 않도록 함
+        if progress_changed(quest.progress, progress):
+            history_rows.append({
+                "quest_id": qid, "user_id": user_id, "action": "progress_update",
+                "progress": progress, "timestamp": now,
+            })
+            quest.progress = progress
+
+    if history_rows:
+        db.execute(insert(QuestHistory), history_rows)
+        record_daily_activity(db, user_id, activity_date(now), progress_events=len(history_rows))
+    return [quests[qid] for qid in updates]
 
 # 간단한 로그인 기능
 def get_user_by_name(db: Session, name: str):
@@ -227,18 +690,12 @@ def get_user_profile_for_ai(user_id: int):
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
-def get_similar_quests(
-    db: Session,
-    user_id: int,
-    new_quest_name: str,
-    new_category: Optional[str] = None,
-    top_n: int = 3,
-    similarity_threshold: float = 0.7  # 유사도 임계값 (조정 가능)
-) -> List[tuple]:
-    # EMBEDDER 확인 및 로드/초기화
+def _ensure_embedder():
+    """EMBEDDER 확인 및 로드/초기화"""
     global EMBEDDER
     if EMBEDDER is None:
         load_ml_model()
+        EMBEDDER = model.EMBEDDER
         if EMBEDDER is None:
             logger.warning("EMBEDDER 로드 실패. 기본 모델 수동 초기화.")
             try:
@@ -247,18 +704,28 @@ def get_similar_quests(
                 logger.info("기본 EMBEDDER 초기화 성공.")
             except Exception as e:
                 logger.error(f"EMBEDDER 초기화 실패: {e}")
-                return []
+    return EMBEDDER
 
-    # 사용자 과거 퀘스트 쿼리
-    past_quests = db.query(Quest).filter(Quest.user_id == user_id).all()
-    if not past_quests:
-        logger.info(f"User {user_id} has no past quests.")
+def similar_quest_candidates_query(user_id: int):
+    """유사 퀘스트 후보 (사용자 과거 퀘스트) 조회 쿼리"""
+    return select(Quest.id, Quest.name, Quest.category, Quest.success_rate).where(Quest.user_id == user_id)
+
+def rank_similar_quests(
+    past_quests,
+    new_quest_name: str,
+    new_category: Optional[str] = None,
+    top_n: int = 3,
+    similarity_threshold: float = 0.7
+) -> List[tuple]:
+    """(id, name, category, success_rate) 후보를 임베딩 유사도로 정렬합니다. DB 세션 없이 동작 (스레드풀 실행용)"""
+    embedder = _ensure_embedder()
+    if embedder is None or not past_quests:
         return []
 
     try:
         # 새 퀘스트 텍스트 생성
         new_text = new_quest_name + (f" {new_category}" if new_category else "")
-        new_emb = EMBEDDER.encode([new_text])[0].reshape(1, -1)
+        new_emb = embedder.encode([new_text])[0].reshape(1, -1)
 
         # 과거 퀘스트 텍스트 리스트 생성 (배치 처리)
         past_texts = [
@@ -267,7 +734,7 @@ def get_similar_quests(
         ]
 
         # 배치 임베딩 생성
-        past_embs = EMBEDDER.encode(past_texts)
+        past_embs = embedder.encode(past_texts)
 
         # 유사도 계산 및 필터링
         similarities = []
@@ -283,4 +750,20 @@ def get_similar_quests(
 
     except Exception as e:
         logger.error(f"Similarity calculation error: {e}")
-        return []
\ No newline at end of file
+        return []
+
+def get_similar_quests(
+    db: Session,
+    user_id: int,
+    new_quest_name: str,
+    new_category: Optional[str] = None,
+    top_n: int = 3,
+    similarity_threshold: float = 0.7  # 유사도 임계값 (조정 가능)
+) -> List[tuple]:
+    # 사용자 과거 퀘스트 쿼리
+    past_quests = db.execute(similar_quest_candidates_query(user_id)).all()
+    if not past_quests:
+        logger.info(f"User {user_id} has no past quests.")
+        return []
+
+    return rank_similar_quests(past_quests, new_quest_name, new_category, top_n, similarity_threshold)
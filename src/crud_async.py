@@ -0,0 +1,104 @@
+'''
+DB 관리 및 데이터 구조 정의 (백본)
+async 라우트에서 사용하는 crud.py 함수들의 AsyncSession 버전
+쿼리 대기 중에도 이벤트 루프가 다른 요청을 처리할 수 있도록 aiosqlite 엔진을 사용
+'''
+from datetime import date, timedelta
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import User, Quest, QuestHistory, UserDailyActivity
+from .schemas import UserCreate
+from . import crud
+from .fanout import in_thread
+
+# ----------------------------
+# User
+async def get_user(db: AsyncSession, user_id: int):
+    return await db.get(User, user_id)
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    return (await db.execute(select(User).where(User.email == email))).scalars().first()
+
+async def get_user_by_name(db: AsyncSession, name: str):
+    return (await db.execute(select(User).where(User.name == name))).scalars().first()
+
+async def create_user(db: AsyncSession, user: UserCreate):
+    db_user = User(name=user.name, email=user.email)
+    db.add(db_user)
+    await db.commit()
+    return db_user
+
+async def get_user_profile_for_ai(db: AsyncSession, user_id: int) -> dict:
+    """crud.get_user_profile_for_ai와 동일한 값을 요청 세션으로 조회합니다."""
+    user = await db.get(User, user_id)
+    if not user:
+        return {
+            "consistency_score": 3,
+            "risk_aversion_score": 3,
+            "total_quests": 10,
+            "completed_quests": 5,
+            "preferred_category": None
+        }
+    return {
+        "consistency_score": user.consistency_score,
+        "risk_aversion_score": user.risk_aversion_score,
+        "total_quests": user.total_quests,
+        "completed_quests": user.completed_quests,
+        "preferred_category": user.preferred_category
+    }
+
+# ----------------------------
+# Quest / QuestHistory
+async def get_quest(db: AsyncSession, quest_id: int):
+    return await db.get(Quest, quest_id)
+
+async def get_latest_history(db: AsyncSession, quest_id: int):
+    return (await db.execute(
+        select(QuestHistory)
+        .where(QuestHistory.quest_id == quest_id)
+        .order_by(QuestHistory.timestamp.desc())
+        .limit(1)
+    )).scalars().first()
+
+async def get_similar_quests(db: AsyncSession, user_id: int, new_quest_name: str, new_category: Optional[str] = None, **kwargs):
+    """후보 조회는 async 세션으로, 임베딩 계산은 스레드에서 수행합니다. (시간 초과 시 바로 취소 가능)"""
+    past_quests = (await db.execute(crud.similar_quest_candidates_query(user_id))).all()
+    if not past_quests:
+        return []
+    return await in_thread(crud.rank_similar_quests, past_quests, new_quest_name, new_category, **kwargs)
+
+async def bump_view_version(db: AsyncSession, user_id: int):
+    await db.run_sync(lambda session: crud.bump_view_version(session, user_id))
+
+async def log_quest_history(db: AsyncSession, quest: Quest, action: str, **kwargs):
+    """crud.log_quest_history (롤업/스트릭 갱신 포함)를 async 세션 위에서 실행합니다."""
+    return await db.run_sync(lambda session: crud.log_quest_history(session, quest, action, **kwargs))
+
+# ----------------------------
+# 일일 활동 롤업
+async def get_daily_activity(db: AsyncSession, user_id: int, start: date, end: date, completed_only: bool = False):
+    stmt = select(UserDailyActivity).where(
+        UserDailyActivity.user_id == user_id,
+        UserDailyActivity.date >= start,
+        UserDailyActivity.date <= end
+    )
+    if completed_only:
+        stmt = stmt.where(UserDailyActivity.completions > 0)
+    return (await db.execute(stmt.order_by(UserDailyActivity.date.asc()))).scalars().all()
+
+async def iter_completed_days_desc(db: AsyncSession, user_id: int, until: Optional[date] = None, chunk_size: int = 120):
+    upper = until
+    while True:
+        stmt = select(UserDailyActivity.date).where(
+            UserDailyActivity.user_id == user_id,
+            UserDailyActivity.completions > 0
+        )
+        if upper is not None:
+            stmt = stmt.where(UserDailyActivity.date <= upper)
+        days = (await db.execute(stmt.order_by(UserDailyActivity.date.desc()).limit(chunk_size))).scalars().all()
+        for day in days:
+            yield day
+        if len(days) < chunk_size:
+            return
+        upper = days[-1] - timedelta(days=1)
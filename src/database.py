@@ -1,18 +1,22 @@
 '''
 DB 관리 및 데이터 구조 정의 (백본)
-SQLAlchemy를 사용하여 SQLite 파일(db.sqlite3)과 연결하는 엔진과 세션을 생성
+SQLAlchemy를 사용하여 SQLite 파일(db.sqlite3)과 연결하는 엔진과 세션을 생성 (엔진 설정은 storage.py)
 DB의 정확한 구조를 정의
 '''
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, ForeignKey, Float, DateTime, Text
+from sqlalchemy import Index, Column, Integer, String, Boolean, ForeignKey, Float, DateTime, Date, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime, timezone
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from .storage import DATABASE_URL, create_configured_engine, create_configured_async_engine
 
-# 기본 설정
-DATABASE_URL = "sqlite:///./db.sqlite3"
-
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# 기본 설정 (DATABASE_URL, DB_PROFILE 환경 변수로 변경 가능, PRAGMA는 storage.py 참고)
+engine = create_configured_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# async 라우트용 엔진/세션 (같은 DB 파일을 aiosqlite로 접근, 이벤트 루프를 막지 않음)
+async_engine = create_configured_async_engine(DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 # User 테이블
@@ -30,7 +34,10 @@ class User(Base):
     # 활동/성장 추적용
     total_quests = Column(Integer, default=0)
     completed_quests = Column(Integer, default=0)
-    streak_days = Column(Integer, default=0)
+    streak_days = Column(Integer, default=0)  # last_active_date로 끝나는 연속 완료 일수
+    last_active_date = Column(Date, nullable=True)  # 완료 기록이 남아있는 마지막 날짜
+    longest_streak = Column(Integer, default=0)
+    view_version = Column(Integer, default=0)  # 퀘스트 목록 렌더링 캐시 버전 (퀘스트 변경과 같은 트랜잭션에서 +1, 워커 간 공유)
     last_active_at = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -56,7 +63,8 @@ class Quest(Base):
     completed = Column(Boolean, default=False)
     ai_recommended = Column(Boolean, default=False)
     success_rate = Column(Float, default=0.5)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    progress = Column(Float, default=0.0)  # 마지막 히스토리의 progress (목록 페이지에서 히스토리 조회 없이 사용)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))  # 모듈 로드 시각이 아닌 생성 시각
     completed_at = Column(DateTime, nullable=True)
 
     # 관계 설정
@@ -64,6 +72,14 @@ class Quest(Base):
 
     history = relationship("QuestHistory", back_populates="quest", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_quests_user_completed", "user_id", "completed"),
+        Index("ix_quests_user_category", "user_id", "category"),
+        # 키셋 페이지네이션: (created_at, id) 최신순 정렬을 인덱스 순서로 처리
+        Index("ix_quests_user_completed_created", "user_id", "completed", "created_at", "id"),
+        Index("ix_quests_user_created", "user_id", "created_at", "id"),
+    )
+
 class QuestHistory(Base):
     __tablename__ = "quest_history"
 
@@ -82,6 +98,26 @@ class QuestHistory(Base):
     quest = relationship("Quest", back_populates="history")
     user = relationship("User", back_populates="quest_histories")
 
+    __table_args__ = (
+        Index("ix_quest_history_quest_ts", "quest_id", "timestamp"),
+        Index("ix_quest_history_user_action_ts", "user_id", "action", "timestamp"),
+    )
+
+# 사용자별 일일 활동 집계 (달력/스트릭/성장 추세용 롤업)
+# QuestHistory 기록 시 crud.record_daily_activity로 증분 갱신, backfill.py로 재구성
+class UserDailyActivity(Base):
+    __tablename__ = "user_daily_activity"
+
+    # (user_id, date) 복합 PK가 곧 범위 조회용 인덱스
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+
+    completions = Column(Integer, default=0, nullable=False)  # 해당 날짜에 완료 상태로 남아있는 퀘스트 수
+    progress_events = Column(Integer, default=0, nullable=False)  # 진행률 기록 횟수
+
 # DB 생성
 def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    # 새 DB는 create_all로 전체 스키마 생성, 기존 DB의 변경분은 마이그레이션으로 적용
+    from .migrations import run_migrations
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
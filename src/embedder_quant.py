@@ -0,0 +1,86 @@
+'''
+CPU 서빙용 임베더 (선택 기능, EMBEDDER_MODE=int8)
+paraphrase-multilingual-MiniLM-L12-v2를 fp32 그대로 쓰면 예측 시간과 메모리의 대부분을 임베더가 차지하므로
+- nn.Linear 층을 동적 int8 양자화(가중치는 int8로 저장, 활성값은 실행 시 양자화)
+- max_seq_length를 짧은 퀘스트 이름/동기에 맞게 EMBEDDER_MAX_SEQ_LENGTH 토큰으로 제한
+- 양자화한 임베더를 QUANTIZED_EMBEDDER_PATH에 저장해 다음 시작부터는 양자화 없이 바로 로드 (model.pkl이 더 새로우면 다시 만듦)
+학습(train.py)은 fp32 임베딩으로 하므로 int8을 켜기 전에 benchmarks.bench_embedder_quant로 예측값 차이를 확인
+
+python -m src.embedder_quant   # model.pkl의 임베더로 양자화 파일 생성
+'''
+import os
+from typing import Optional
+
+import torch
+
+EMBEDDER_MODE = os.getenv("EMBEDDER_MODE", "fp32").lower()
+EMBEDDER_MAX_SEQ_LENGTH = int(os.getenv("EMBEDDER_MAX_SEQ_LENGTH", "32"))
+QUANTIZED_EMBEDDER_PATH = os.getenv("QUANTIZED_EMBEDDER_PATH", os.path.join("model", "embedder_int8.pt"))
+MODES = ("fp32", "int8")
+
+
+def quantize_embedder(embedder, max_seq_length: Optional[int] = EMBEDDER_MAX_SEQ_LENGTH):
+    """임베더 복사본의 Linear 층을 동적 int8로 양자화 (원본은 그대로)"""
+    from torch.ao.quantization import quantize_dynamic
+
+    quantized = quantize_dynamic(embedder.to(torch.device("cpu")).eval(), {torch.nn.Linear}, dtype=torch.qint8)
+    if max_seq_length and hasattr(quantized, "max_seq_length"):
+        quantized.max_seq_length = max_seq_length
+    return quantized
+
+def save_quantized(embedder, path: str = QUANTIZED_EMBEDDER_PATH):
+    # 양자화된 층은 state_dict만으로 다시 만들 수 없으므로 모듈 전체를 저장 (쓰는 도중 읽히지 않도록 임시 파일 후 교체)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    torch.save(embedder, tmp)
+    os.replace(tmp, path)
+
+def load_quantized(path: str = QUANTIZED_EMBEDDER_PATH, source_path: Optional[str] = None):
+    """저장된 양자화 임베더 (없거나 source_path(model.pkl)보다 오래되었으면 None)"""
+    if not os.path.exists(path):
+        return None
+    if source_path and os.path.exists(source_path) and os.path.getmtime(source_path) > os.path.getmtime(path):
+        return None
+    # 직접 만든 파일만 읽음 (모듈 전체를 pickle로 저장했으므로 weights_only로는 읽을 수 없음)
+    return torch.load(path, map_location="cpu", weights_only=False)
+
+def serving_embedder(embedder, source_path: str, mode: Optional[str] = None, path: Optional[str] = None):
+    """
+    load_ml_model이 불러온 fp32 임베더를 EMBEDDER_MODE에 맞게 바꿔 반환
+    int8이면 저장된 양자화 파일을 쓰고, 없으면 양자화해서 저장 (저장 실패해도 양자화한 임베더는 사용)
+    """
+    mode = (mode or EMBEDDER_MODE).lower()
+    path = path or QUANTIZED_EMBEDDER_PATH
+    if embedder is None or mode == "fp32":
+        return embedder
+    if mode not in MODES:
+        print(f"⚠️ 알 수 없는 EMBEDDER_MODE: {mode} (가능: {', '.join(MODES)}), fp32 사용")
+        return embedder
+
+    try:
+        cached = load_quantized(path, source_path)
+    except Exception as e:
+        print(f"⚠️ 양자화 임베더 로드 실패, 다시 만듭니다: {e}")
+        cached = None
+    if cached is not None:
+        print(f"✅ int8 임베더 로드: {path}")
+        return cached
+
+    quantized = quantize_embedder(embedder)
+    try:
+        save_quantized(quantized, path)
+        print(f"✅ int8 임베더 생성 및 저장: {path}")
+    except OSError as e:
+        print(f"⚠️ int8 임베더 저장 실패 (이번 실행에서만 사용): {e}")
+    return quantized
+
+
+if __name__ == "__main__":
+    import joblib
+    from src.model import MODEL_PATH
+
+    loaded = joblib.load(MODEL_PATH)
+    if not (isinstance(loaded, tuple) and len(loaded) >= 2):
+        raise SystemExit(f"{MODEL_PATH}에 임베더가 없습니다. python -m src.train을 먼저 실행하세요.")
+    save_quantized(quantize_embedder(loaded[1]))
+    print(f"✅ int8 임베더 저장: {QUANTIZED_EMBEDDER_PATH} (max_seq_length {EMBEDDER_MAX_SEQ_LENGTH})")
@@ -0,0 +1,66 @@
+'''
+여러 비동기 단계(모델 추론, AI 코치 호출, 유사 퀘스트 검색 등)를 동시에 실행하고
+단계별 제한 시간과 요청 전체 예산 안에 끝난 결과만 모으는 도구
+제한 시간을 넘기거나 실패한 단계는 지정한 대체값(placeholder)으로 채워 페이지는 항상 응답됨
+'''
+import asyncio
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import anyio
+
+
+async def in_thread(func: Callable, *args, **kwargs):
+    """
+    블로킹 함수를 스레드에서 실행합니다.
+    run_in_threadpool과 달리 취소(시간 초과) 시 스레드 종료를 기다리지 않고 바로 반환
+    (스레드의 작업은 백그라운드에서 끝까지 실행되고 결과는 버려짐)
+    """
+    return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs), abandon_on_cancel=True)
+
+
+async def gather_with_budget(
+    stages: Dict[str, Callable[[], Awaitable[Any]]],
+    budget: float,
+    timeouts: Optional[Dict[str, float]] = None,
+    fallbacks: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], List[str], Dict[str, float]]:
+    """
+    stages의 코루틴 팩토리들을 동시에 실행합니다.
+    각 단계는 min(단계 제한 시간, 남은 전체 예산) 안에 끝나야 하며, 넘기거나 예외가 나면 fallbacks 값을 사용합니다.
+    반환값: (단계별 결과, 대체값을 쓴 단계 목록, 단계별 소요 시간(초))
+    """
+    timeouts = timeouts or {}
+    fallbacks = fallbacks or {}
+    started = time.perf_counter()
+    deadline = started + budget
+    elapsed: Dict[str, float] = {}
+
+    async def run(name: str, factory: Callable[[], Awaitable[Any]]):
+        timeout = max(min(timeouts.get(name, budget), deadline - time.perf_counter()), 0)
+        try:
+            return await asyncio.wait_for(factory(), timeout)
+        finally:
+            elapsed[name] = time.perf_counter() - started
+
+    tasks = {name: asyncio.create_task(run(name, factory)) for name, factory in stages.items()}
+    try:
+        await asyncio.wait(tasks.values())
+    finally:
+        # 요청 자체가 취소된 경우 남은 단계 정리 (이미 끝난 태스크에는 영향 없음)
+        for task in tasks.values():
+            task.cancel()
+
+    results: Dict[str, Any] = {}
+    degraded: List[str] = []
+    for name, task in tasks.items():
+        error = task.exception()
+        if error is None:
+            results[name] = task.result()
+            continue
+        if not isinstance(error, asyncio.TimeoutError):
+            print(f"⚠️ {name} 단계 실패: {error}")
+        results[name] = fallbacks.get(name)
+        degraded.append(name)
+    return results, degraded, elapsed
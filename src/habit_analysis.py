@@ -5,13 +5,15 @@ API 서버와 별개로 데이터를 로드하고 분석 결과를 터미널에
 
 import io
 import base64
+import threading
 import matplotlib
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from .database import Quest, QuestHistory
+from sqlalchemy import func, select, case
+from datetime import date, timedelta
+from .database import Quest, UserDailyActivity
 
 # GUI 없는 백엔드
 matplotlib.use('Agg')
@@ -39,18 +41,31 @@ plt.rcParams.update({
     'legend.edgecolor': '#e2e8f0',
 })
 
-# 1. 내 퀘스트 현황 
-def plot_user_progress(db: Session, user_id: int):
-    quests = db.query(Quest).filter(Quest.user_id == user_id).all()
-    if not quests:
-           return None
+# ----------------------------
+# 각 그래프는 (조회 쿼리 생성 함수, 렌더링 함수) 쌍으로 구성
+# sync 세션은 fetch_plot_data, async 세션은 fetch_plot_data_async로 같은 쿼리를 실행하고
+# matplotlib 렌더링(CPU 작업)은 DB 세션 없이 결과 행만 받아 수행
 
-    completed = sum(1 for q in quests if q.completed)
-    total = len(quests)
-    pending = total - completed
+def fetch_plot_data(db: Session, statements: dict) -> dict:
+    return {name: db.execute(stmt).all() for name, stmt in statements.items()}
+
+async def fetch_plot_data_async(db, statements: dict) -> dict:
+    return {name: (await db.execute(stmt)).all() for name, stmt in statements.items()}
 
-    if total == 0:
+# 1. 내 퀘스트 현황 
+def user_progress_statements(user_id: int) -> dict:
+    return {
+        "counts": select(
+            func.count(Quest.id),
+            func.coalesce(func.sum(case((Quest.completed == True, 1), else_=0)), 0)
+        ).where(Quest.user_id == user_id)
+    }
+
+def render_user_progress(data: dict):
+    total, completed = data["counts"][0]
+    if not total:
         return None
+    pending = total - completed
 
     # 데이터
     sizes = [completed, pending]
@@ -103,19 +118,21 @@ def plot_user_progress(db: Session, user_id: int):
     return img_base64
 
 # 2. 카테고리별 성공률
-def plot_success_rate_by_category(db: Session, user_id: int):
-    quests = db.query(Quest).filter(Quest.user_id == user_id).all()
-    if not quests:
+def success_rate_by_category_statements(user_id: int) -> dict:
+    category = func.coalesce(Quest.category, "기타")
+    return {
+        "rates": select(
+            category, func.avg(func.coalesce(Quest.success_rate, 0))
+        ).where(Quest.user_id == user_id).group_by(category)
+    }
+
+def render_success_rate_by_category(data: dict):
+    if not data["rates"]:
         return None
 
-    df = pd.DataFrame([
-        {"category": q.category or "기타", "rate": q.success_rate or 0}
-        for q in quests
-    ])
-    if df.empty:
-        return None
-
-    avg_rates = df.groupby('category')['rate'].mean().sort_values(ascending=False)
+    avg_rates = pd.Series(
+        [rate for _, rate in data["rates"]], index=[c for c, _ in data["rates"]]
+    ).sort_values(ascending=False)
 
     fig, ax = plt.subplots(figsize=(10, 6))
     bars = ax.bar(range(len(avg_rates)), avg_rates.values, 
@@ -147,21 +164,38 @@ def plot_success_rate_by_category(db: Session, user_id: int):
 
 # 3. 성장 추세 
 
-def plot_growth_trend(db: Session, user_id: int):
-    data = db.query(
-        func.date(QuestHistory.timestamp).label('date'),
-        func.count(QuestHistory.id).label('count')
-    ).filter(
-        QuestHistory.user_id == user_id,
-        QuestHistory.action == "completed"
-    ).group_by('date').order_by('date').all()
-
-    if not data or len(data) < 2:
+# 추세 그래프에 표시할 기간 (그 이전 완료 수는 누적 시작값으로 합산)
+TREND_WINDOW_DAYS = 365
+
+def growth_trend_statements(user_id: int) -> dict:
+    # 일일 활동 롤업에서 최근 기간만 범위 조회
+    window_start = date.today() - timedelta(days=TREND_WINDOW_DAYS)
+    return {
+        "daily": select(
+            UserDailyActivity.date,
+            UserDailyActivity.completions
+        ).where(
+            UserDailyActivity.user_id == user_id,
+            UserDailyActivity.date >= window_start,
+            UserDailyActivity.completions > 0
+        ).order_by(UserDailyActivity.date),
+        "baseline": select(
+            func.coalesce(func.sum(UserDailyActivity.completions), 0)
+        ).where(
+            UserDailyActivity.user_id == user_id,
+            UserDailyActivity.date < window_start
+        ),
+    }
+
+def render_growth_trend(data: dict):
+    rows = data["daily"]
+    if not rows or len(rows) < 2:
         return None
 
-    df = pd.DataFrame(data, columns=['date', 'count'])
+    baseline = data["baseline"][0][0]
+    df = pd.DataFrame(rows, columns=['date', 'count'])
     df['date'] = pd.to_datetime(df['date'])
-    df['cumulative'] = df['count'].cumsum()
+    df['cumulative'] = df['count'].cumsum() + baseline
 
     fig, ax = plt.subplots(figsize=(11, 6.5))
 
@@ -176,9 +210,9 @@ def plot_growth_trend(db: Session, user_id: int):
     ax.grid(True, alpha=0.4)
 
     # 포인트 라벨
-    for i, (date, cum) in enumerate(zip(df['date'], df['cumulative'])):
+    for i, (day, cum) in enumerate(zip(df['date'], df['cumulative'])):
         if i == 0 or i == len(df)-1 or i % 3 == 0:
-            ax.text(date, cum + 0.8, str(cum), ha='center', fontweight='bold',
+            ax.text(day, cum + 0.8, str(cum), ha='center', fontweight='bold',
                     bbox=dict(boxstyle="round,pad=0.4", facecolor='white', edgecolor='#667eea', alpha=0.9))
 
     plt.xticks(rotation=30)
@@ -192,11 +226,15 @@ def plot_growth_trend(db: Session, user_id: int):
 
 
 # 4. 집중 분야 
-def plot_focus_area(db: Session, user_id: int):
-    counts = db.query(
-        Quest.category, func.count(Quest.id).label('cnt')
-    ).filter(Quest.user_id == user_id).group_by(Quest.category).all()
-
+def focus_area_statements(user_id: int) -> dict:
+    return {
+        "counts": select(
+            Quest.category, func.count(Quest.id).label('cnt')
+        ).where(Quest.user_id == user_id).group_by(Quest.category)
+    }
+
+def render_focus_area(data: dict):
+    counts = data["counts"]
     if not counts:
         return None
 
@@ -230,4 +268,35 @@ def plot_focus_area(db: Session, user_id: int):
     buffer.seek(0)
     img_base64 = base64.b64encode(buffer.read()).decode('utf-8')
     plt.close(fig)
-    return img_base64
\ No newline at end of file
+    return img_base64
+
+
+# ----------------------------
+# 라우트에서 이름으로 찾는 그래프 목록: 이름 -> (쿼리 생성 함수, 렌더링 함수)
+PLOTS = {
+    "plot_user_progress": (user_progress_statements, render_user_progress),
+    "plot_success_rate_by_category": (success_rate_by_category_statements, render_success_rate_by_category),
+    "plot_growth_trend": (growth_trend_statements, render_growth_trend),
+    "plot_focus_area": (focus_area_statements, render_focus_area),
+}
+
+# pyplot은 전역 상태를 쓰므로 스레드풀에서 렌더링할 때 한 번에 하나씩만 그림
+_RENDER_LOCK = threading.Lock()
+
+def render_plot(name: str, data: dict):
+    _, render = PLOTS[name]
+    with _RENDER_LOCK:
+        return render(data)
+
+# sync 세션용 기존 인터페이스 (db, user_id) -> base64 이미지
+def plot_user_progress(db: Session, user_id: int):
+    return render_plot("plot_user_progress", fetch_plot_data(db, user_progress_statements(user_id)))
+
+def plot_success_rate_by_category(db: Session, user_id: int):
+    return render_plot("plot_success_rate_by_category", fetch_plot_data(db, success_rate_by_category_statements(user_id)))
+
+def plot_growth_trend(db: Session, user_id: int):
+    return render_plot("plot_growth_trend", fetch_plot_data(db, growth_trend_statements(user_id)))
+
+def plot_focus_area(db: Session, user_id: int):
+    return render_plot("plot_focus_area", fetch_plot_data(db, focus_area_statements(user_id)))
@@ -0,0 +1,183 @@
+'''
+Gemini 없이 동작하는 로컬 규칙 기반 AI 코치 (기본 tier)
+ai_recommend의 프롬프트 작성 지침과 같은 입력(완료율, 꾸준함, 위험 회피 성향, 선호 카테고리, 난이도, 기간)으로
+템플릿 조언을 만들고, 전체 퀘스트 이름으로 만든 최근접 이웃 인덱스에서 관련 퀘스트를 추천
+조언 생성은 DB/네트워크/모델 없이 메모리 연산만 하므로 수십 마이크로초 안에 끝남
+※ 인덱스 벡터는 문장 임베딩(SentenceTransformer) 대신 문자 n-gram 해싱 벡터를 사용
+   (임베딩은 퀘스트마다 저장돼 있지 않고, 질의 한 번 인코딩에도 수십 ms가 걸리기 때문)
+'''
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+
+from .database import SessionLocal, Quest
+
+# 인덱스 벡터 차원, 갱신 주기(초), 최대 항목 수
+# 다른 사용자의 퀘스트 이름이 노출되지 않도록 LOCAL_INDEX_MIN_USERS명 이상이 만든 이름만 추천 후보로 사용
+LOCAL_INDEX_DIM = 512
+LOCAL_INDEX_TTL = float(os.getenv("LOCAL_INDEX_TTL", "300"))
+LOCAL_INDEX_MAX_ITEMS = int(os.getenv("LOCAL_INDEX_MAX_ITEMS", "20000"))
+LOCAL_INDEX_MIN_USERS = int(os.getenv("LOCAL_INDEX_MIN_USERS", "2"))
+
+# 인덱스가 비어 있거나 관련 퀘스트가 없을 때 쓰는 카테고리별 기본 추천
+CATEGORY_SUGGESTIONS: Dict[str, List[str]] = {
+    "health": ["물 2L 마시기", "밤 12시 전에 잠들기"],
+    "exercise": ["스트레칭 10분", "하루 30분 걷기"],
+    "study": ["25분 집중 공부 2회", "오늘 배운 내용 3줄 요약"],
+    "reading": ["하루 10쪽 읽기", "읽은 문장 하나 기록하기"],
+    "work": ["아침에 할 일 3개 정하기", "퇴근 전 10분 정리"],
+    "hobby": ["주 2회 30분 연습하기", "완성한 결과물 사진 남기기"],
+}
+DEFAULT_SUGGESTIONS = ["하루 5분 기록하기", "매일 같은 시간에 시작하기"]
+
+# ----------------------------
+# 문자 n-gram 해싱 벡터
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").strip()).lower()
+
+def vectorize(text: str) -> np.ndarray:
+    """공백을 뺀 문자 2~3-gram을 crc32로 해싱한 L2 정규화 벡터 (프로세스가 달라도 같은 값)"""
+    compact = normalize(text).replace(" ", "")
+    vec = np.zeros(LOCAL_INDEX_DIM, dtype=np.float32)
+    grams = [compact[i:i + n] for n in (2, 3) for i in range(len(compact) - n + 1)] or [compact]
+    for gram in grams:
+        vec[zlib.crc32(gram.encode("utf-8")) % LOCAL_INDEX_DIM] += 1.0
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+# ----------------------------
+# 최근접 이웃 인덱스 (프로세스 전역, 읽기는 잠금 없이 교체된 튜플을 참조)
+_index_lock = threading.Lock()
+_index: Tuple[np.ndarray, List[tuple], float] = (np.zeros((0, LOCAL_INDEX_DIM), dtype=np.float32), [], 0.0)
+
+def build_index(rows) -> Tuple[np.ndarray, List[tuple]]:
+    """(name, category, 평균 성공률) 행들로 (벡터 행렬, 메타데이터)를 만듭니다."""
+    meta = [(name, category, rate) for name, category, rate in rows if name]
+    if not meta:
+        return np.zeros((0, LOCAL_INDEX_DIM), dtype=np.float32), []
+    return np.stack([vectorize(name) for name, _, _ in meta]), meta
+
+def set_index(rows):
+    global _index
+    matrix, meta = build_index(rows)
+    _index = (matrix, meta, time.monotonic())
+
+def index_candidates_query():
+    """여러 사용자가 만든 퀘스트 이름을 많이 쓰인 순으로 조회"""
+    return (
+        select(Quest.name, Quest.category, func.avg(Quest.success_rate))
+        .group_by(Quest.name, Quest.category)
+        .having(func.count(func.distinct(Quest.user_id)) >= LOCAL_INDEX_MIN_USERS)
+        .order_by(func.count().desc())
+        .limit(LOCAL_INDEX_MAX_ITEMS)
+    )
+
+def ensure_index(force: bool = False):
+    """인덱스가 없거나 LOCAL_INDEX_TTL이 지났으면 DB에서 다시 만듭니다. (블로킹, async 라우트에서는 스레드로 호출)"""
+    if not force and _index[2] and time.monotonic() - _index[2] < LOCAL_INDEX_TTL:
+        return
+    with _index_lock:
+        if not force and _index[2] and time.monotonic() - _index[2] < LOCAL_INDEX_TTL:
+            return
+        db = SessionLocal()
+        try:
+            set_index(db.execute(index_candidates_query()).all())
+        except Exception as e:
+            print(f"⚠️ 로컬 코치 인덱스 갱신 실패: {e}")
+        finally:
+            db.close()
+
+def nearest_quests(quest_name: str, category: Optional[str] = None, top_n: int = 2, min_score: float = 0.2) -> List[tuple]:
+    """현재 퀘스트와 이름이 비슷한 다른 퀘스트 (name, category, 평균 성공률, 점수)를 점수 순으로 반환"""
+    matrix, meta, _ = _index
+    if not meta:
+        return []
+    scores = matrix @ vectorize(quest_name)
+    if category:
+        scores = scores + 0.1 * np.fromiter((c == category for _, c, _ in meta), dtype=np.float32, count=len(meta))
+    own = normalize(quest_name)
+    results = []
+    # 같은 이름은 건너뛰므로 여유 있게 뽑아서 정렬
+    k = min(len(meta), top_n * 4)
+    top = np.argpartition(-scores, k - 1)[:k]
+    for idx in top[np.argsort(-scores[top])].tolist():
+        name, cat, rate = meta[idx]
+        if scores[idx] < min_score or normalize(name) == own:
+            continue
+        results.append((name, cat, rate, float(scores[idx])))
+        if len(results) == top_n:
+            break
+    return results
+
+# ----------------------------
+# 템플릿 조언
+def suggest_quests(quest_name: str, category: Optional[str], preferred_category: Optional[str], top_n: int = 2) -> List[str]:
+    names = [name for name, _, _, _ in nearest_quests(quest_name, category or preferred_category, top_n)]
+    for fallback in CATEGORY_SUGGESTIONS.get(category or preferred_category or "", DEFAULT_SUGGESTIONS):
+        if len(names) >= top_n:
+            break
+        if fallback not in names:
+            names.append(fallback)
+    return names[:top_n]
+
+def local_recommendation(
+    quest_name: str,
+    duration: int,
+    difficulty: int,
+    consistency_score: int,
+    risk_aversion_score: int,
+    total_quests: int,
+    completed_quests: int,
+    preferred_category: str = None,
+    category: str = None
+) -> str:
+    """ai_recommend.build_prompt의 작성 지침을 규칙으로 옮긴 2~3문장 조언 + 관련 퀘스트 추천"""
+    name = (quest_name or "").strip() or "이번 퀘스트"
+    duration = max(int(duration or 1), 1)
+    difficulty = int(difficulty or 3)
+    consistency = consistency_score or 3
+    risk = risk_aversion_score or 3
+    completion = min((completed_quests or 0) / total_quests, 1.0) if total_quests else None
+
+    sentences = []
+    # 1. 완료율: 낮으면 작은 성공의 축적, 높으면 난이도 조절과 지속적 성장
+    if completion is None:
+        sentences.append(f"첫 퀘스트라면 '{name}'의 분량을 평소 생각보다 조금 작게 잡고, 끝까지 해내는 경험부터 만들어보세요.")
+    elif completion < 0.5:
+        warmup = max(duration // 3, 1)
+        sentences.append(
+            f"완료율이 약 {round(completion * 100)}%로 아직 습관을 쌓아가는 단계예요. "
+            f"처음 {warmup}일은 '{name}'를 절반 분량으로 시작해 작은 성공을 먼저 쌓아보세요."
+        )
+    elif completion >= 0.75:
+        sentences.append(
+            f"완료율이 약 {round(completion * 100)}%로 꾸준히 해내고 있어요. "
+            f"난이도 {difficulty}이 익숙해지면 중반부터 한 단계 올려 성장 폭을 넓혀보세요."
+        )
+    else:
+        sentences.append(
+            f"완료율 {round(completion * 100)}%면 충분히 해낼 수 있는 흐름이에요. "
+            f"{duration}일 중 중간 점검일을 하나 정해 진행률을 확인해보세요."
+        )
+
+    # 2. 꾸준함이 낮으면 시간 루틴/기록, 위험 회피 점수가 낮으면 보상과 리스크 관리
+    if consistency <= 2:
+        sentences.append("매일 같은 시간에 시작하도록 알림을 정하고, 끝나면 한 줄로 기록하는 습관을 붙여보세요.")
+    elif risk <= 2:
+        sentences.append("목표를 이뤘을 때의 보상을 미리 정해두고, 못 한 날에도 이어갈 수 있는 최소 분량을 정해 리스크를 관리하세요.")
+    elif difficulty >= 4 and duration >= 14:
+        sentences.append("기간이 길고 난이도가 높으니 1주 단위로 목표를 나눠 점검하면 끝까지 가기 쉬워요.")
+    else:
+        sentences.append("진행률을 자주 기록할수록 흐름이 끊기지 않으니, 하루를 마무리할 때 진행률을 업데이트해보세요.")
+
+    # 3. 관련 퀘스트 추천
+    suggestions = suggest_quests(name, category, preferred_category)
+    if suggestions:
+        sentences.append("함께 해볼 만한 퀘스트: " + ", ".join(f"'{s}'" for s in suggestions))
+    return " ".join(sentences)
@@ -3,26 +3,35 @@ FastAPI 인스턴스를 생성하고, /, /plot/user, /users/ 등 모든 API 엔
 get_db() 함수를 통해 DB 세션을 각 요청에 주입하고, /users/ 라우트에서는 crud.py 함수를 호출하여 DB 작업을 수행
 '''
 # fast api 백엔드를 위한 import
-from fastapi import FastAPI, Depends, HTTPException, Request, Form, Query, Body
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import FastAPI, Depends, HTTPException, Request, Form, Query, Body, BackgroundTasks
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, StreamingResponse, PlainTextResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from src import crud, schemas, database
 from . import crud, schemas, model
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from fastapi.templating import Jinja2Templates
 import os
 # Db를 위한 import
-from .database import SessionLocal, init_db, QuestHistory, Quest
-from . import crud, schemas
+from .database import SessionLocal, AsyncSessionLocal, init_db
+from . import crud, crud_async, schemas, view_cache, local_coach
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.concurrency import run_in_threadpool
+from .fanout import gather_with_budget, in_thread
+from .query_counter import QueryCountMiddleware
+from . import admission, profiler, thread_budget
 # 시각화를 위한 import
-from .habit_analysis import plot_user_progress, plot_success_rate_by_category, plot_growth_trend, plot_focus_area
+from .habit_analysis import PLOTS, fetch_plot_data_async, render_plot
 #  시간 관리를 위한 임포트 추가
-from datetime import datetime, timezone, timedelta, date
+from datetime import datetime, timedelta, date
 from collections import defaultdict
 # ai_recoomend를 위한 import
 from typing import Optional
-from .ai_recommend import generate_ai_recommendation
+from .ai_recommend import stream_ai_recommendation
+import asyncio
+import json
+import secrets
+import anyio
+from urllib.parse import urlencode
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -31,19 +40,35 @@ from contextlib import asynccontextmanager
 import subprocess
 import threading
 
+# 부하 테스트처럼 학습이 측정에 끼어들면 안 되는 경우 TRAIN_ON_STARTUP=0으로 끔
+TRAIN_ON_STARTUP = os.getenv("TRAIN_ON_STARTUP", "1").lower() not in ("0", "false", "no")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     def run_training():
-        subprocess.run(["python","-m", "src.train"], check=False)
+        # 학습 프로세스는 이 서버의 워커 몫 코어를 남기고 사용 (thread_budget의 trainer 역할)
+        env = dict(os.environ, THREADS_RESERVED=str(thread_budget.web_workers()))
+        subprocess.run(["python","-m", "src.train"], check=False, env=env)
 
     # 서버 시작 시
-    threading.Thread(target=run_training, daemon=True).start()
-    print("✅ 서버 시작: 모델 학습 시작")
+    if admission.ADMISSION_ENABLED:
+        admission.check_thread_budget(anyio.to_thread.current_default_thread_limiter().total_tokens)
+    if TRAIN_ON_STARTUP:
+        threading.Thread(target=run_training, daemon=True).start()
+        print("✅ 서버 시작: 모델 학습 시작")
 
     yield
 
 
 app = FastAPI(title="AI Quest Tracker API", lifespan=lifespan)
+# 요청별 SQL 쿼리 수/DB 시간을 Server-Timing 헤더로 응답하고 예산 초과(QUERY_BUDGET)·N+1 의심 요청을 경고
+app.add_middleware(QueryCountMiddleware)
+# 무거운 라우트(추천 결과, 그래프, 퀘스트 생성)의 클래스별 동시 실행 수 제한, 가득 차면 503 + Retry-After
+if admission.ADMISSION_ENABLED:
+    app.add_middleware(admission.AdmissionMiddleware)
+# 샘플링 프로파일러 (PROFILE_ENABLED=1일 때만, 나중에 등록한 미들웨어가 바깥이라 쿼리 수 헤더를 함께 기록)
+if profiler.PROFILE_ENABLED:
+    app.add_middleware(profiler.ProfilingMiddleware)
 MODEL_PATH = "model/model.pkl"
 # templates로 html 코드 분리
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -51,6 +76,8 @@ templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 # 앱  생성 직후 호출하여 서버 시작 전에 테이블 생성 (버그 방지)
 init_db() 
 
+# 요청마다 torch/BLAS/랜덤 포레스트가 모든 코어에 스레드를 띄우지 않도록 웹 워커용 스레드 예산 적용 (모델 로드 전에)
+thread_budget.apply_policy("server")
 # 모델을 전역적으로 로드(서버 시작시 한번만)
 model.load_ml_model()
 
@@ -62,6 +89,11 @@ def get_db():
     finally:
         db.close()
 
+# async 라우트용 DB 연결 의존성 (이벤트 루프를 막지 않는 aiosqlite 세션)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # 유저 ID를 가져오는 의존성 함수
 def get_current_user_id(request: Request):
     user_id = request.cookies.get("user_id")
@@ -105,7 +137,7 @@ def login_page():
 
 # 로그인/회원가입 처리
 @app.post("/login")
-async def login_user(request: Request, db: Session = Depends(get_db)):
+async def login_user(request: Request, db: AsyncSession = Depends(get_async_db)):
     form = await request.form()
     nickname = form.get("nickname")
     email = form.get("email")
@@ -115,16 +147,16 @@ async def login_user(request: Request, db: Session = Depends(get_db)):
         return HTMLResponse("<h3>닉네임과 이메일을 모두 입력해주세요.</h3>", status_code=400)
 
     # 이메일로 먼저 사용자 검색
-    user = crud.get_user_by_email(db, email=email)
+    user = await crud_async.get_user_by_email(db, email=email)
     if not user:
         # 닉네임으로 중복 체크 (같은 닉네임이 이미 있으면 에러)
-        name_conflict = crud.get_user_by_name(db, name=nickname)
+        name_conflict = await crud_async.get_user_by_name(db, name=nickname)
         if name_conflict:
             return HTMLResponse("<h3>이미 존재하는 닉네임입니다. 다른 닉네임을 사용해주세요.</h3>", status_code=400)
 
         # 새로운 사용자 생성
         new_user = schemas.UserCreate(name=nickname, email=email)
-        user = crud.create_user(db=db, user=new_user)
+        user = await crud_async.create_user(db=db, user=new_user)
         redirect_url = "/onboarding"
     else:
         # 기존 사용자인 경우 온보딩 여부 확인
@@ -238,11 +270,6 @@ def root(request: Request, db: Session = Depends(get_db)):
     if user.consistency_score == 3 and user.risk_aversion_score == 3:
         return RedirectResponse(url="/onboarding", status_code=303)
 
-    # 3. 데이터 로드 (원래 사용자 코드 유지)
-    user_name = user.name
-    # db 객체를 사용하여 crud 함수 호출
-    quests = crud.get_quests_by_user(db, user_id=user_id_int)
-
     # 로그인 및 온보딩 완료 시, 기존 메인 화면 렌더링 
     return templates.TemplateResponse(
         "home.html",
@@ -335,22 +362,25 @@ for route in PLOT_ROUTES:
     @app.get(route["path"], response_class=HTMLResponse)
     async def create_plot_route(
         request: Request,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         r=route  # 클로저 캡처 방지
     ):
         user_id = get_user_id(request)
         if not user_id:
             return RedirectResponse("/login")
 
-        # 동적 함수 호출
-        plot_func = globals().get(r["func"])
-        if not plot_func:
-            return render_no_data("시각화 기능을 찾을 수 없습니다.")
+        # 이름으로 그래프 찾기
+        plot = PLOTS.get(r["func"])
+        if not plot:
+            return render_no_data(request, "시각화 기능을 찾을 수 없습니다.")
 
-        img_base64 = plot_func(db, user_id)
+        # 데이터 조회는 async 세션으로, matplotlib 렌더링은 스레드풀에서 수행
+        statements, _ = plot
+        data = await fetch_plot_data_async(db, statements(user_id))
+        img_base64 = await run_in_threadpool(render_plot, r["func"], data)
         
         if not img_base64:
-            return render_no_data(r["no_data_msg"])
+            return render_no_data(request, r["no_data_msg"])
 
         return render_plot_page(
             request=request,
@@ -369,26 +399,51 @@ def create_user_endpoint(user: schemas.UserCreate, db: Session = Depends(get_db)
     return crud.create_user(db=db, user=user)
 
 # 2. 사용자 목록 조회 
+# 다음 페이지 커서는 X-Next-Cursor 헤더로 전달 (응답 본문은 기존처럼 목록)
 @app.get("/users/", response_model=list[schemas.User])
-def get_users_endpoint(db: Session = Depends(get_db)):
-    return crud.get_users(db=db, skip=0, limit=100) # limit 추가
+def get_users_endpoint(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    try:
+        users, next_cursor = crud.get_users_page(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return users
 
 # -----퀘스트 관련----- 
 # 퀘스트 생성 추가
+# 성공률 예측을 응답 후 백그라운드로 미룰지 기본값 (요청의 defer_prediction으로 덮어쓰기 가능)
+DEFER_PREDICTION = os.getenv("QUEST_DEFER_PREDICTION", "false").lower() in ("1", "true", "yes")
+
 @app.post("/quests/", response_model=schemas.Quest)
-def create_quest(quest: schemas.QuestCreate, db: Session = Depends(get_db)):
+def create_quest(
+    quest: schemas.QuestCreate,
+    background_tasks: BackgroundTasks,
+    defer_prediction: Optional[bool] = None,
+    db: Session = Depends(get_db)
+):
     """
     새로운 퀘스트 추가 (AI 성공률 자동 계산)
+    defer_prediction이면 임시 성공률로 바로 저장하고, 예측값은 응답 후 채움
     """
+    defer = DEFER_PREDICTION if defer_prediction is None else defer_prediction
     try:
-        predicted_rate = model.predict_success_rate(
-            quest.user_id,
-            quest.name,
-            quest.duration or 1,
-            quest.difficulty or 3
-        )
+        if defer:
+            success_rate = crud.provisional_success_rate(db, quest.user_id)
+        else:
+            success_rate = model.predict_success_rate(
+                quest.user_id,
+                quest.name,
+                quest.duration or 1,
+                quest.difficulty or 3
+            )
 
-        # DB에 저장
+        # 퀘스트 + created 히스토리를 한 트랜잭션으로 저장
         db_quest = crud.create_quest(
             db=db,
             quest_data={
@@ -398,15 +453,45 @@ def create_quest(quest: schemas.QuestCreate, db: Session = Depends(get_db)):
                 "duration": quest.duration,
                 "difficulty": quest.difficulty,
                 "motivation": quest.motivation,
-                "success_rate": predicted_rate,
-            }
+                "success_rate": success_rate,
+            },
+            commit=False
         )
-        return db_quest
+        # 커밋 후 만료된 속성을 다시 읽지 않도록 응답은 커밋 전에 구성
+        response = schemas.Quest.model_validate(db_quest).model_copy(update={"prediction_pending": defer})
+        crud.bump_view_version(db, quest.user_id)
+        db.commit()
 
     except Exception as e:
+        db.rollback()
         print(f"[ERROR] 퀘스트 생성 실패: {e}")
         raise HTTPException(status_code=400, detail="퀘스트 생성 중 오류가 발생했습니다.")
 
+    view_cache.invalidate_user(quest.user_id)
+    if defer:
+        background_tasks.add_task(fill_predicted_success_rate, response.id, quest)
+    return response
+
+def fill_predicted_success_rate(quest_id: int, quest: schemas.QuestCreate):
+    """임시 성공률로 저장된 퀘스트의 예측값을 응답 전송 후 계산해 반영"""
+    try:
+        predicted_rate = model.predict_success_rate(
+            quest.user_id,
+            quest.name,
+            quest.duration or 1,
+            quest.difficulty or 3
+        )
+    except Exception as e:
+        print(f"[ERROR] 성공률 예측 실패 (quest {quest_id}): {e}")
+        return
+
+    db = SessionLocal()
+    try:
+        if crud.update_quest_success_rate(db, quest_id, predicted_rate):
+            view_cache.invalidate_user(quest.user_id)
+    finally:
+        db.close()
+
 
 # 특정 사용자 퀘스트 조회
 @app.get("/quests/list", response_class=HTMLResponse)
@@ -416,19 +501,28 @@ def quests_list(request: Request, db: Session = Depends(get_db)):
         return RedirectResponse(url="/login", status_code=303)
 
     user_id_int = int(user_id)
+
+    # 캐시 버전(users.view_version)은 모든 워커가 공유하므로 PK 조회 한 번으로 다른 워커의 변경도 확인
+    version = crud.get_view_version(db, user_id_int)
+    if version is None:
+        return RedirectResponse(url="/logout", status_code=303)
+    etag = view_cache.make_etag(user_id_int, version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    # 마지막 렌더링 이후 변경이 없으면 목록을 다시 조회하지 않고 304 또는 캐시 본문으로 응답
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    cached = view_cache.get(user_id_int, version)
+    if cached:
+        return HTMLResponse(cached["body"], headers=headers)
+
     user = crud.get_user(db, user_id_int)
     if not user:
         return RedirectResponse(url="/logout", status_code=303)
 
-    quests = crud.get_quests_by_user(db, user_id=user_id_int)
-    active_quests = [q for q in quests if not q.completed]
-    completed_quests = [q for q in quests if q.completed]
-
-    total = len(quests)
-    completed = len(completed_quests)
+    total, completed = crud.count_quests_by_user(db, user_id_int)
     completion_rate = (completed / total * 100) if total > 0 else 0
 
-    streak = user.streak_days or 0
+    streak = crud.current_streak(user)
 
     if total == 0:
         ai_message = "🚀 새로운 퀘스트로 첫 도전을 시작해보세요!"
@@ -451,160 +545,119 @@ def quests_list(request: Request, db: Session = Depends(get_db)):
     else:
         ai_message += " 🚀 오늘은 하나만이라도 도전해볼까요?"
 
-    # QuestHistory에서 최신 progress 가져오기
-    def get_latest_progress(q):
-        last = (
-            db.query(QuestHistory)
-            .filter(QuestHistory.quest_id == q.id)
-            .order_by(QuestHistory.timestamp.desc())
-            .first()
-        )
-        if last:
-            return round(last.progress , 1)
-        return 0.0
-
-    def render_quest_card(q):
-        progress = get_latest_progress(q)
-        rate = f"{q.success_rate * 100:.1f}%" if q.success_rate else "-"
-        ai_tag = "🤖 AI 추천" if q.ai_recommended else "직접 등록"
-        duration = q.duration or 1
-        diff = q.difficulty or "-"
-        motivation = q.motivation or "동기 없음"
-        category_emoji = {
-            "health": "💪", "study": "📚", "reading": "📖",
-            "work": "💼", "hobby": "🎨", "exercise": "🏋️‍♂️"
-        }.get(q.category, "🎯")
-
-        if q.completed:
-            days = (q.completed_at - q.created_at).days if q.completed_at else "-"
-            status = f"<span class='status completed'>✅ 완료 ({days}일)</span>"
-            card_class = "completed"
-        else:
-            status = f"<span class='status active'>🕓 진행 중 ({progress:.0f}%)</span>"
-            card_class = "active"
-
-        return f"""
-        <div class="quest-card {card_class}" data-quest-id="{q.id}" data-duration="{duration}" data-progress="{progress}">
-            <div class="emoji">{category_emoji}</div>
-            <div class="info">
-                <h3>{q.name}</h3>
-                <p>{ai_tag} | 성공률: {rate} | 난이도: {diff} | 목표: {duration}일</p>
-                <p class="motivation">"{motivation}"</p>
-                <div class="progress-bar">
-                    <div class="progress-fill" style="width: {progress}%;"></div>
-                </div>
-            </div>
-            <div class="actions">
-                {status}
-                <button class="toggle-btn" data-item-id="{q.id}">
-                    {'🔁 미완료로 변경' if q.completed else '✅ 완료로 변경'}
-                </button>
-                <button class="delete-btn" data-item-id="{q.id}">🗑 삭제</button>
-            </div>
-        </div>
-        """
+    context = {
+        "request": request,
+        "user": user,
+        "total": total,
+        "completed": completed,
+        "completion_rate": completion_rate,
+        "streak": streak,
+        "ai_message": ai_message,
+    }
+    body = view_cache.cache_stream(
+        user_id_int, version, stream_quests_page(user_id_int, context),
+        total=total, completed=completed, streak=streak
+    )
+    return StreamingResponse(
+        body,
+        media_type="text/html; charset=utf-8",
+        headers=headers,
+    )
 
-    active_html = "".join(render_quest_card(q) for q in active_quests) or "<p class='no-quest'>현재 진행 중인 퀘스트가 없습니다.</p>"
-    completed_html = "".join(render_quest_card(q) for q in completed_quests) or "<p class='no-quest'>완료된 퀘스트가 없습니다.</p>"
+def stream_quests_page(user_id: int, context: dict):
+    """
+    첫 페이지 카드를 yield_per 커서에서 한 행씩 읽어 템플릿 조각 단위로 전송
+    요청 의존성 세션은 응답 전송 전에 닫힐 수 있으므로 스트리밍 동안 쓸 세션을 직접 염
+    """
+    db = SessionLocal()
+    try:
+        # 첫 페이지만 렌더링하고 나머지는 /quests/list/cards 커서로 무한 스크롤
+        context = dict(
+            context,
+            active_quests=crud.stream_quests_page(db, user_id, completed=False),
+            completed_quests=crud.stream_quests_page(db, user_id, completed=True),
+        )
+        for chunk in templates.get_template("quests_list.html").generate(context):
+            yield chunk
+    finally:
+        db.close()
 
-    return templates.TemplateResponse(
-        "quests_list.html",
-        {
-            "request": request,
-            "user": user,
-            "total": total,
-            "completed": completed,
-            "completion_rate": completion_rate,
-            "streak": streak,
-            "ai_message": ai_message,
-            "active_html": active_html,
-            "completed_html": completed_html, 
-        },
-    )
+# 무한 스크롤용 카드 HTML 조각 (quests_list.html과 같은 quest_card 매크로로 렌더링)
+@app.get("/quests/list/cards", response_class=HTMLResponse)
+def quest_cards_fragment(
+    request: Request,
+    completed: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    user_id = request.cookies.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다")
+    try:
+        quests, next_cursor = crud.get_quests_page(db, int(user_id), completed=completed, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    quest_card = templates.get_template("_quest_card.html").module.quest_card
+    html = "".join(str(quest_card(q)) for q in quests)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return HTMLResponse(html, headers=headers)
+
+# 퀘스트 목록 JSON API (키셋 페이지네이션, 무한 스크롤용)
+@app.get("/api/quests", response_model=schemas.QuestPage)
+def quests_page_api(
+    request: Request,
+    completed: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    user_id = request.cookies.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다")
+    try:
+        items, next_cursor = crud.get_quests_page(db, int(user_id), completed=completed, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+# 퀘스트 히스토리 JSON API (timestamp, id 최신순)
+@app.get("/api/quests/{quest_id}/history", response_model=schemas.QuestHistoryPage)
+def quest_history_page_api(
+    quest_id: int,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    user_id = request.cookies.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다")
+    if not crud.get_quest_by_user(db, quest_id, int(user_id)):
+        raise HTTPException(status_code=404, detail="Quest not found or not yours")
+    try:
+        items, next_cursor = crud.get_quest_history_page(db, quest_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
 
-# 퀘스트 완료 토글 (PATCH)
+# 퀘스트 완료 토글 (PATCH) - 일괄 토글과 같은 경로로 처리
 @app.patch("/quests/{quest_id}/toggle")
 def toggle_quest(quest_id: int, request: Request, db: Session = Depends(get_db)):
     user_id = request.cookies.get("user_id")
     if not user_id:
         raise HTTPException(status_code=401, detail="로그인이 필요합니다")
 
-    quest = crud.get_quest_by_user(db, quest_id, int(user_id))
-    if not quest:
+    try:
+        quest, = crud.bulk_toggle_quests(db, int(user_id), [quest_id])
+    except KeyError:
         raise HTTPException(status_code=404, detail="Quest not found or not yours")
 
-    # 현재 상태 반전
-    previous_state = quest.completed
-    quest.completed = not quest.completed
-
-    # UTC 일관성 유지
-    if quest.created_at.tzinfo is None:
-        quest.created_at = quest.created_at.replace(tzinfo=timezone.utc)
-
-    # 완료로 변경된 경우
-    if quest.completed:
-        quest.completed_at = datetime.now(timezone.utc)
-        duration_days = max((quest.completed_at - quest.created_at).days, 1)
-
-        # 기존 completed 로그가 있으면 새로 추가하지 않음
-        last_log = (
-            db.query(QuestHistory)
-            .filter(QuestHistory.quest_id == quest.id)
-            .order_by(QuestHistory.timestamp.desc())
-            .first()
-        )
-
-        if not last_log or last_log.action != "completed":
-            history_entry = QuestHistory(
-                quest_id=quest.id,
-                user_id=quest.user_id,
-                action="completed",
-                progress=1.0,
-                completed_at=quest.completed_at,
-                duration_days=duration_days,
-                timestamp=datetime.now(timezone.utc),
-            )
-            db.add(history_entry)
-
-        # streak day 로직 추가
-        streak = crud.calculate_streak_days(db, int(user_id))
-        user = crud.get_user(db, int(user_id))
-        if user:
-            user.streak_days = streak
-            db.commit()
-
-    # 미완료로 되돌린 경우
-    else:
-        quest.completed_at = None
-
-        # 최근 로그가 이미 reopened이면 중복 추가 안 함
-        last_log = (
-            db.query(QuestHistory)
-            .filter(QuestHistory.quest_id == quest.id)
-            .order_by(QuestHistory.timestamp.desc())
-            .first()
-        )
-
-        if not last_log or last_log.action != "reopened":
-            history_entry = QuestHistory(
-                quest_id=quest.id,
-                user_id=quest.user_id,
-                action="reopened",
-                progress=0.0,
-                timestamp=datetime.now(timezone.utc),
-            )
-            db.add(history_entry)
-
-        # 미완료로 바뀐 경우 streak 다시 계산
-        streak = crud.calculate_streak_days(db, int(user_id))
-        user = crud.get_user(db, int(user_id))
-        if user:
-            user.streak_days = streak
-            db.commit()
-
-
+    # 롤업/스트릭/사용자 카운터는 bulk_toggle_quests에서 같은 트랜잭션으로 갱신됨
+    crud.bump_view_version(db, int(user_id))
     db.commit()
-    db.refresh(quest)
+    view_cache.invalidate_user(int(user_id))
 
     return {
         "id": quest.id,
@@ -619,14 +672,67 @@ def delete_quest(quest_id: int, request: Request, db: Session = Depends(get_db))
     if not user_id:
         raise HTTPException(status_code=401, detail="로그인이 필요합니다")
 
-    quest = crud.get_quest_by_user(db, quest_id, int(user_id))
-    if not quest:
+    try:
+        crud.bulk_delete_quests(db, int(user_id), [quest_id])
+    except KeyError:
         raise HTTPException(status_code=404, detail="Quest not found or not yours")
-
-    db.delete(quest)
+    crud.bump_view_version(db, int(user_id))
     db.commit()
+    view_cache.invalidate_user(int(user_id))
     return {"detail": "Deleted"}
 
+# -----일괄 변경 (한 요청 = 한 트랜잭션)-----
+class BulkQuestIds(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=crud.MAX_BULK_ITEMS)
+
+class BulkProgressItem(BaseModel):
+    id: int
+    progress: float
+
+class BulkProgressUpdate(BaseModel):
+    items: list[BulkProgressItem] = Field(..., min_length=1, max_length=crud.MAX_BULK_ITEMS)
+
+def require_user_id(request: Request) -> int:
+    user_id = request.cookies.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다")
+    return int(user_id)
+
+@app.patch("/quests/toggle")
+def bulk_toggle(body: BulkQuestIds, user_id: int = Depends(require_user_id), db: Session = Depends(get_db)):
+    try:
+        quests = crud.bulk_toggle_quests(db, user_id, body.ids)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Quest not found or not yours: {e.args[0]}")
+    crud.bump_view_version(db, user_id)
+    db.commit()
+    view_cache.invalidate_user(user_id)
+    return {"items": [{"id": q.id, "completed": q.completed, "completed_at": q.completed_at} for q in quests]}
+
+@app.delete("/quests")
+def bulk_delete(body: BulkQuestIds, user_id: int = Depends(require_user_id), db: Session = Depends(get_db)):
+    try:
+        deleted = crud.bulk_delete_quests(db, user_id, body.ids)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Quest not found or not yours: {e.args[0]}")
+    crud.bump_view_version(db, user_id)
+    db.commit()
+    view_cache.invalidate_user(user_id)
+    return {"detail": "Deleted", "deleted": deleted}
+
+@app.patch("/quests/progress")
+def bulk_progress(body: BulkProgressUpdate, user_id: int = Depends(require_user_id), db: Session = Depends(get_db)):
+    # 같은 퀘스트가 여러 번 오면 마지막 값 사용
+    updates = {item.id: item.progress for item in body.items}
+    try:
+        quests = crud.bulk_update_progress(db, user_id, updates)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Quest not found or not yours: {e.args[0]}")
+    crud.bump_view_version(db, user_id)
+    db.commit()
+    view_cache.invalidate_user(user_id)
+    return {"items": [{"id": q.id, "progress": q.progress} for q in quests]}
+
 # 진행률 표시
 class ProgressUpdate(BaseModel):
     progress: float
@@ -635,36 +741,20 @@ class ProgressUpdate(BaseModel):
 async def update_progress(
     quest_id: int,
     body: ProgressUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     progress = round(body.progress, 1)
 
-    quest = db.query(Quest).filter(Quest.id == quest_id).first()
+    quest = await crud_async.get_quest(db, quest_id)
     if not quest:
         raise HTTPException(status_code=404, detail="Quest not found")
 
-    quest.progress = progress
-    db.commit()
-    db.refresh(quest)
-
-    # 기록 남기기
-    last = (
-        db.query(QuestHistory)
-        .filter(QuestHistory.quest_id == quest_id)
-        .order_by(QuestHistory.timestamp.desc())
-        .first()
-    )
-    if not last or abs(last.progress - quest.progress) >= 0.1:
-        db.add(
-            QuestHistory(
-                quest_id=quest.id,
-                user_id=quest.user_id,
-                action="progress_update",
-                progress=quest.progress,
-                timestamp=datetime.now(timezone.utc),
-            )
-        )
-        db.commit()
+    # 기록 남기기 (quests.progress가 마지막 히스토리의 progress이므로 추가 조회 불필요, 기록할 때만 함께 갱신)
+    if crud.progress_changed(quest.progress, progress):
+        await crud_async.log_quest_history(db, quest, "progress_update", progress=progress)
+        await crud_async.bump_view_version(db, quest.user_id)
+    await db.commit()
+    view_cache.invalidate_user(quest.user_id)
 
     return {"id": quest.id, "progress": quest.progress}
 
@@ -675,13 +765,27 @@ async def update_progress(
 async def recommend_page(request: Request):
     return templates.TemplateResponse("recommend.html", {"request": request})
 
+# 추천 결과 단계별 제한 시간(초)과 요청 전체 예산, 시간 내에 못 끝난 단계의 대체값
+# AI 코치 조언은 페이지를 막지 않도록 /recommend/tip/stream(SSE)으로 따로 받아옴
+RECOMMEND_BUDGET = float(os.getenv("RECOMMEND_BUDGET", "10"))
+RECOMMEND_STAGE_TIMEOUTS = {
+    "predict": float(os.getenv("RECOMMEND_PREDICT_TIMEOUT", "3")),
+    "similar": float(os.getenv("RECOMMEND_SIMILAR_TIMEOUT", "3")),
+}
+RECOMMEND_FALLBACKS = {
+    "predict": None,
+    "similar": [],
+}
+# 조언 스트림 전체 제한 시간(초)과 시간 초과/실패 시 보여줄 문구
+RECOMMEND_TIP_TIMEOUT = float(os.getenv("RECOMMEND_TIP_TIMEOUT", "30"))
+TIP_FALLBACK = "AI 코치의 조언이 늦어지고 있어요. 잠시 후 다시 시도해주세요. 그동안 작은 목표부터 시작해보는 건 어떨까요?"
+
 @app.post("/recommend/result", response_class=HTMLResponse)
 async def recommend_result(
     request: Request,
     quest_name: str = Form(...),
     duration: int = Form(...),
     difficulty: int = Form(...),
-    db: Session = Depends(get_db),
     category: Optional[str] = Form(None)
 ):
     user_id_str = request.cookies.get("user_id")
@@ -692,78 +796,120 @@ async def recommend_result(
     except:
         return RedirectResponse("/login")
 
-    # AI 예측
-    success_rate = model.predict_success_rate(user_id, quest_name, duration, difficulty)
-    percent = round(success_rate * 100, 1)
+    # 각 단계는 서로 독립이므로 동시에 실행 (AsyncSession은 동시 사용 불가라 단계별로 세션을 엶)
+    async def predict():
+        return await in_thread(model.predict_success_rate, user_id, quest_name, duration, difficulty)
 
-    user_profile = crud.get_user_profile_for_ai(user_id)
-    ai_tip = generate_ai_recommendation(
-        quest_name=quest_name,
-        duration=duration,
-        difficulty=difficulty,
-        **user_profile
-    )
+    async def similar():
+        async with AsyncSessionLocal() as db:
+            return await crud_async.get_similar_quests(db, user_id=user_id, new_quest_name=quest_name, new_category=category)
 
-    # 비슷한 퀘스트 추천
-    similar_quests = crud.get_similar_quests(db=db, user_id=user_id, new_quest_name=quest_name, new_category=category)
+    results, degraded, elapsed = await gather_with_budget(
+        {"predict": predict, "similar": similar},
+        budget=RECOMMEND_BUDGET,
+        timeouts=RECOMMEND_STAGE_TIMEOUTS,
+        fallbacks=RECOMMEND_FALLBACKS,
+    )
+    success_rate = results["predict"]
+    similar_quests = results["similar"]
 
     # 색상 및 메시지
-    if percent >= 70:
-        color = "#28a745"
-        message = "도전해볼 만한 목표예요!"
-    elif percent >= 50:
-        color = "#ffc107"
-        message = "충분히 가능성이 있습니다!"
+    if success_rate is None:
+        percent = round(crud.DEFAULT_PROVISIONAL_RATE * 100, 1)
+        color = "#adb5bd"
+        message = "예측이 지연되어 기본 성공률로 표시했어요."
     else:
-        color = "#dc3545"
-        message = "조금 어렵지만 해볼 수 있어요!"
+        percent = round(success_rate * 100, 1)
+        if percent >= 70:
+            color = "#28a745"
+            message = "도전해볼 만한 목표예요!"
+        elif percent >= 50:
+            color = "#ffc107"
+            message = "충분히 가능성이 있습니다!"
+        else:
+            color = "#dc3545"
+            message = "조금 어렵지만 해볼 수 있어요!"
 
-    return templates.TemplateResponse("recommend_result.html", {
+    response = templates.TemplateResponse("recommend_result.html", {
         "request": request,
         "quest_name": quest_name,
         "percent": percent,
         "color": color,
         "message": message,
-        "ai_tip": ai_tip,
-        "similar_quests": similar_quests
+        "tip_stream_url": "/recommend/tip/stream?" + urlencode(
+            {"quest_name": quest_name, "duration": duration, "difficulty": difficulty, "category": category or ""}
+        ),
+        "similar_quests": similar_quests,
+        "degraded": degraded,
     })
+    # 단계별 소요 시간 (브라우저 개발자 도구에서 확인용)
+    response.headers["Server-Timing"] = ", ".join(
+        f"{name};dur={seconds * 1000:.1f}" for name, seconds in elapsed.items()
+    )
+    return response
+
+def sse_event(event: str, data: dict) -> str:
+    # 조각에 줄바꿈이 있어도 한 줄 data로 보내도록 JSON으로 인코딩
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.get("/recommend/tip/stream")
+async def recommend_tip_stream(
+    request: Request,
+    quest_name: str = Query(...),
+    duration: int = Query(...),
+    difficulty: int = Query(...),
+    category: Optional[str] = Query(None),
+    user_id: int = Depends(require_user_id),
+):
+    """
+    AI 코치 조언을 Server-Sent Events로 조각 단위 전송 (event: token → event: done)
+    클라이언트가 연결을 끊으면 Starlette가 이 제너레이터를 취소하고,
+    stream_ai_recommendation이 Gemini 스트림을 닫아 남은 생성 비용을 쓰지 않음
+    """
+    async with AsyncSessionLocal() as db:
+        user_profile = await crud_async.get_user_profile_for_ai(db, user_id)
+    # 로컬 코치의 관련 퀘스트 인덱스 (LOCAL_INDEX_TTL이 지났을 때만 다시 만듦)
+    await in_thread(local_coach.ensure_index)
+
+    async def events():
+        tokens = stream_ai_recommendation(
+            quest_name=quest_name, duration=duration, difficulty=difficulty,
+            category=category or None, **user_profile
+        )
+        sent = False
+        deadline = asyncio.get_running_loop().time() + RECOMMEND_TIP_TIMEOUT
+        try:
+            while True:
+                try:
+                    remaining = max(deadline - asyncio.get_running_loop().time(), 0)
+                    text = await asyncio.wait_for(tokens.__anext__(), remaining)
+                except StopAsyncIteration:
+                    break
+                if await request.is_disconnected():
+                    print("⚠️ 클라이언트 연결 종료: AI 조언 생성 중단")
+                    return
+                sent = True
+                yield sse_event("token", {"text": text})
+        except asyncio.TimeoutError:
+            yield sse_event("token", {"text": ("\n" if sent else "") + TIP_FALLBACK})
+        finally:
+            await tokens.aclose()
+        yield sse_event("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # 프록시가 버퍼링하지 않도록
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 ##-----calender 페이지-----
 @app.get("/calendar", response_class=HTMLResponse)
-async def habit_calendar(request: Request, db: Session = Depends(get_db)):
+async def habit_calendar(request: Request, db: AsyncSession = Depends(get_async_db)):
     user_id = get_user_id(request) or 1  
 
-    completed_dates = db.query(
-        func.date(QuestHistory.timestamp)
-    ).filter(
-        QuestHistory.user_id == user_id,
-        QuestHistory.action == "completed"
-    ).all()
-
-    # 문자열이든 date 객체든 무조건 처리
-    completed_set = set()
-    for d in completed_dates:
-        date_obj = d[0]
-        if isinstance(date_obj, str):
-            completed_set.add(date_obj)
-        else:
-            completed_set.add(date_obj.strftime("%Y-%m-%d"))
-
-    # 스트릭 계산
-    today = date.today()
-    streak = 0
-    check_date = today
-    while True:
-        date_str = check_date.strftime("%Y-%m-%d")
-        if date_str in completed_set:
-            streak += 1
-            check_date -= timedelta(days=1)
-        else:
-            break
-        if streak > 100:
-            break
-
     # 이번 달 캘린더
+    today = date.today()
     now = datetime.now()
     year, month = now.year, now.month
     first_day = datetime(year, month, 1)
@@ -774,6 +920,23 @@ async def habit_calendar(request: Request, db: Session = Depends(get_db)):
     last_day = (next_month - timedelta(days=1)).day
     start_weekday = first_day.weekday()
 
+    # 롤업 테이블에서 이번 달 완료일만 범위 조회
+    month_activity = await crud_async.get_daily_activity(
+        db, user_id, first_day.date(), (next_month - timedelta(days=1)).date(), completed_only=True
+    )
+    completed_set = {row.date.strftime("%Y-%m-%d") for row in month_activity}
+
+    # 스트릭 계산 (오늘부터 거꾸로 연속된 완료일, 최대 101일까지만 읽음)
+    streak = 0
+    check_date = today
+    async for day in crud_async.iter_completed_days_desc(db, user_id, until=today, chunk_size=101):
+        if day != check_date:
+            break
+        streak += 1
+        check_date -= timedelta(days=1)
+        if streak > 100:
+            break
+
     days = []
     for _ in range(start_weekday):
         days.append(None)
@@ -796,4 +959,35 @@ async def habit_calendar(request: Request, db: Session = Depends(get_db)):
         "today_str": today_str
     })
 
+# -----관리자: 프로파일 조회-----
+# X-Admin-Token 헤더가 PROFILE_ADMIN_TOKEN과 일치해야 함
+# 토큰을 설정하지 않으면 모두 거부 (같은 호스트의 리버스 프록시를 거친 요청도 클라이언트 주소가 로컬로 보이므로 주소로는 판단하지 않음)
+def require_admin(request: Request):
+    token = os.getenv("PROFILE_ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=403, detail="PROFILE_ADMIN_TOKEN이 설정되지 않아 관리자 기능을 쓸 수 없습니다")
+    if not secrets.compare_digest(request.headers.get("x-admin-token", ""), token):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 필요합니다")
+
+# 가장 느린 요청 순으로 프로파일 요약 (소요 시간, 쿼리 수, DB 시간, 추천 단계별 시간, 상위 스택)
+@app.get("/admin/profiles", dependencies=[Depends(require_admin)])
+def admin_profiles(limit: int = Query(20, ge=1, le=200), route: Optional[str] = None):
+    profiles = profiler.list_profiles(limit=limit, route=route)
+    for meta in profiles:
+        meta["profile_url"] = f"/admin/profiles/{meta['id']}"
+    return {"enabled": profiler.PROFILE_ENABLED, "profiles": profiles}
+
+# 무거운 라우트 클래스별 동시 실행/대기/거절 수와 대기 시간
+@app.get("/admin/admission", dependencies=[Depends(require_admin)])
+def admin_admission():
+    return admission.metrics()
+
+# folded 스택 원본 (flamegraph.pl, speedscope 등에 그대로 입력)
+@app.get("/admin/profiles/{profile_id}", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+def admin_profile_detail(profile_id: str):
+    folded = profiler.read_profile(profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(folded)
+
 # uvicorn src.main:app --reload
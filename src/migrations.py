@@ -0,0 +1,139 @@
+"""
+DB 관리 및 데이터 구조 정의 (백본)
+create_all 이후 기존 DB 스키마를 버전 단위로 변경하는 간단한 마이그레이션 도구
+적용된 버전은 schema_migrations 테이블에 기록되어 한 번씩만 실행됨
+"""
+
+from datetime import datetime
+from typing import Callable, List, Tuple
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+# 핫 쿼리용 복합 인덱스 (database.py 모델의 __table_args__와 동일한 이름/컬럼)
+HOT_QUERY_INDEXES = [
+    # toggle_quest / update_progress / quests_list: quest_id로 필터 후 timestamp 역순
+    ("ix_quest_history_quest_ts", "quest_history", ["quest_id", "timestamp"]),
+    # 스트릭 / 캘린더 / 추세: user_id + action 필터 후 timestamp 범위
+    ("ix_quest_history_user_action_ts", "quest_history", ["user_id", "action", "timestamp"]),
+    ("ix_quests_user_completed", "quests", ["user_id", "completed"]),
+    ("ix_quests_user_category", "quests", ["user_id", "category"]),
+]
+
+# 키셋 페이지네이션용 인덱스 (user_id [+ completed]로 필터 후 created_at, id 역순)
+KEYSET_INDEXES = [
+    ("ix_quests_user_completed_created", "quests", ["user_id", "completed", "created_at", "id"]),
+    ("ix_quests_user_created", "quests", ["user_id", "created_at", "id"]),
+]
+
+
+def add_column_if_missing(conn: Connection, table: str, column: str, col_type: str):
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column not in existing:
+        conn.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN "{column}" {col_type}')
+
+
+def create_index_if_missing(conn: Connection, name: str, table: str, columns: List[str]):
+    cols = ", ".join(f'"{c}"' for c in columns)
+    conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({cols})")
+
+
+# ----------------------------
+# 마이그레이션 목록 (버전 순서대로 추가만 하고, 적용된 항목은 수정하지 않음)
+def _0001_daily_activity_and_streak(conn: Connection):
+    """user_daily_activity 롤업과 users 스트릭 컬럼을 히스토리로부터 채움"""
+    from .backfill import backfill_daily_activity, backfill_streak_state
+
+    add_column_if_missing(conn, "users", "last_active_date", "DATE")
+    add_column_if_missing(conn, "users", "longest_streak", "INTEGER")
+    db = Session(bind=conn)
+    try:
+        backfill_daily_activity(db)
+        backfill_streak_state(db)
+    finally:
+        db.close()
+
+
+def _0002_hot_query_indexes(conn: Connection):
+    """QuestHistory / Quest 핫 쿼리용 복합 인덱스 추가"""
+    for name, table, columns in HOT_QUERY_INDEXES:
+        create_index_if_missing(conn, name, table, columns)
+    conn.exec_driver_sql("ANALYZE")
+
+
+def _0003_quest_progress(conn: Connection):
+    """quests.progress 컬럼 추가 후 퀘스트별 마지막 히스토리 progress로 채움"""
+    from .backfill import backfill_quest_progress
+
+    add_column_if_missing(conn, "quests", "progress", "FLOAT")
+    db = Session(bind=conn)
+    try:
+        backfill_quest_progress(db)
+    finally:
+        db.close()
+
+
+def _0004_keyset_indexes(conn: Connection):
+    """퀘스트 목록 키셋 페이지네이션용 인덱스 추가"""
+    for name, table, columns in KEYSET_INDEXES:
+        create_index_if_missing(conn, name, table, columns)
+    conn.exec_driver_sql("ANALYZE")
+
+
+def _0005_user_view_version(conn: Connection):
+    """퀘스트 목록 캐시 버전 컬럼 추가 (워커 간 캐시 무효화용)"""
+    add_column_if_missing(conn, "users", "view_version", "INTEGER DEFAULT 0")
+
+
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("0001_daily_activity_and_streak", _0001_daily_activity_and_streak),
+    ("0002_hot_query_indexes", _0002_hot_query_indexes),
+    ("0003_quest_progress", _0003_quest_progress),
+    ("0004_keyset_indexes", _0004_keyset_indexes),
+    ("0005_user_view_version", _0005_user_view_version),
+]
+
+
+def _ensure_version_table(conn: Connection):
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version VARCHAR PRIMARY KEY, applied_at DATETIME NOT NULL)"
+    )
+
+
+def applied_versions(engine: Engine) -> set:
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """아직 적용되지 않은 마이그레이션을 순서대로 각각 하나의 트랜잭션으로 적용합니다."""
+    done = applied_versions(engine)
+    applied = []
+    for version, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, applied_at) VALUES (:v, :t)"),
+                {"v": version, "t": datetime.utcnow()},
+            )
+        applied.append(version)
+        print(f"✅ 마이그레이션 적용: {version}")
+    return applied
+
+
+if __name__ == "__main__":
+    import sys
+    from .database import engine, init_db
+
+    if "--status" in sys.argv:
+        done = applied_versions(engine)
+        for version, _ in MIGRATIONS:
+            print(f"[{'x' if version in done else ' '}] {version}")
+    else:
+        init_db()
+
+# python -m src.migrations [--status]
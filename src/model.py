@@ -13,6 +13,7 @@ from sentence_transformers import SentenceTransformer # 임베딩 객체 사용
 import torch
 import io
 import pickle
+from src import embedder_quant, thread_budget
 
 KNOWN_CATEGORIES = ['reading', 'study', 'exercise', 'work', 'hobby', 'health', 'general', 'none']
 
@@ -22,6 +23,13 @@ MODEL_PATH = "model/model.pkl"
 # 서버 시작 시 모델을 메모리에 로드하여 저장할 전역 변수
 ML_MODEL = None 
 EMBEDDER = None 
+PROJECTOR = None  # 학습 때 맞춘 임베딩 차원 축소 변환 (없으면 384차원 그대로)
+
+def project_embeddings(projector, embeddings: np.ndarray) -> np.ndarray:
+    """학습(train.py)과 예측에서 같은 방식으로 임베딩 차원 축소 (projector가 None이면 그대로)"""
+    if projector is None:
+        return embeddings
+    return projector.transform(embeddings).astype(np.float32)
 
 def get_user_success_rate(user_id: int):
     db = SessionLocal()
@@ -61,8 +69,8 @@ def get_user_stats_for_prediction(user_id: int) -> Dict[str, Any]:
     }
 
 def load_ml_model():
-    """joblib 파일을 로드하여 전역 변수 ML_MODEL과 EMBEDDER에 저장합니다."""
-    global ML_MODEL, EMBEDDER
+    """joblib 파일을 로드하여 전역 변수 ML_MODEL, EMBEDDER, PROJECTOR에 저장합니다."""
+    global ML_MODEL, EMBEDDER, PROJECTOR
 
     # CPU-safe 로딩을 위한 커스텀 Unpickler 정의
     class CPU_Unpickler(pickle.Unpickler):
@@ -101,10 +109,13 @@ def load_ml_model():
                     # 파일의 첫 번째 요소(ML_MODEL)만 로드하는 것은 불가능합니다.
                     
                     # 가장 안전한 방식: train.py에서 사용한 임베더를 수동으로 로드
-                    ML_MODEL = joblib.load(MODEL_PATH)[0] # 튜플의 첫 번째 요소만 로드 시도
+                    loaded_tuple = joblib.load(MODEL_PATH)
+                    ML_MODEL = loaded_tuple[0] # 튜플의 첫 번째 요소만 로드 시도
+                    PROJECTOR = loaded_tuple[2] if len(loaded_tuple) > 2 else None
                     
                     # train.py에서 사용한 임베딩 모델을 수동으로 로드하고 CPU로 이동
                     EMBEDDER = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2').to(torch.device('cpu'))
+                    EMBEDDER = embedder_quant.serving_embedder(EMBEDDER, MODEL_PATH)
                     
                     print("✅ ML 모델(Scikit-learn)과 임베딩 객체가 분리되어 성공적으로 로드(재구성)되었습니다.")
                     return ML_MODEL
@@ -123,19 +134,30 @@ def load_ml_model():
 
     # 로드 성공 또는 CPU-safe 로드 성공 시 객체 처리
     if loaded_objects is not None:
-        if isinstance(loaded_objects, tuple) and len(loaded_objects) == 2:
-            ML_MODEL, EMBEDDER = loaded_objects
+        # (모델, 임베더) 또는 차원 축소를 쓴 경우 (모델, 임베더, 변환)
+        if isinstance(loaded_objects, tuple) and len(loaded_objects) in (2, 3):
+            ML_MODEL, EMBEDDER = loaded_objects[:2]
+            PROJECTOR = loaded_objects[2] if len(loaded_objects) == 3 else None
+            # 학습 때 저장된 n_jobs=-1 대신 현재 프로세스의 스레드 예산 사용
+            if thread_budget.current():
+                thread_budget.limit_estimator_jobs(ML_MODEL)
             # 임베딩 객체가 PyTorch 모델이므로, 로드 후 CPU로 명시적 이동 (안정성 추가)
             try:
                 EMBEDDER.to(torch.device('cpu')) 
             except:
                 pass 
+            # EMBEDDER_MODE=int8이면 CPU 서빙용 양자화 임베더로 교체
+            EMBEDDER = embedder_quant.serving_embedder(EMBEDDER, MODEL_PATH)
             print("✅ ML 모델과 임베딩 객체가 성공적으로 로드되었습니다.")
             return ML_MODEL
         else:
             ML_MODEL = loaded_objects
+            PROJECTOR = None
+            if thread_budget.current():
+                thread_budget.limit_estimator_jobs(ML_MODEL)
             # train.py에서 사용된 임베더를 가정하고 수동 로드 후 CPU로 이동
             EMBEDDER = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2').to(torch.device('cpu')) 
+            EMBEDDER = embedder_quant.serving_embedder(EMBEDDER, MODEL_PATH)
             print("경고: 모델 파일에 임베딩 객체가 포함되지 않았습니다. 임베딩 객체를 수동 로드합니다.")
             return ML_MODEL
     
@@ -179,6 +201,8 @@ def predict_success_rate(
     # 3. 임베딩 생성 (train.py와 동일한 방식으로 text_features 구성)
     text_features = quest_features['name'] + " " + quest_features['motivation']
     emb = EMBEDDER.encode(text_features)
+    # 학습과 같은 변환으로 차원 축소 (emb_0..emb_{k-1})
+    emb = project_embeddings(PROJECTOR, emb.reshape(1, -1))[0]
     
     # 4. 입력 DataFrame 구성
     input_row = {**user_stats, **quest_features}
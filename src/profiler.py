@@ -0,0 +1,260 @@
+'''
+요청 단위 샘플링 프로파일러 (선택 기능, PROFILE_ENABLED=1일 때 main.py에서 미들웨어 등록)
+PROFILE_SAMPLE_RATE 비율의 요청 또는 X-Profile: 1 헤더가 붙은 요청을 처리하는 동안
+샘플링 스레드가 PROFILE_INTERVAL마다 sys._current_frames()로 스택을 모아 folded 형식(flamegraph.pl, speedscope에서 열림)으로 저장
+- 라우트별 디렉터리(PROFILE_DIR/<METHOD_route>/)에 <id>.folded(스택)와 <id>.json(소요 시간, 상태 코드, 쿼리 수, Server-Timing 단계)을 저장
+- 샘플링 스레드는 프로파일 중인 요청이 있을 때만 돌고, 대기 중인 스레드(이벤트 루프 select, 스레드풀 대기)는 건너뜀
+※ 스레드별로 요청을 구분하지 않으므로 동시에 처리 중인 다른 요청의 스택이 섞일 수 있음 (프로세스 전체 샘플링과 같은 한계)
+'''
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "0").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.01"))
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(".cache", "profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+
+# 이 함수에서 멈춰 있는 스레드는 일을 하지 않는 것으로 보고 샘플에서 제외
+IDLE_FRAMES = {
+    ("selectors.py", "select"), ("threading.py", "wait"), ("queue.py", "get"),
+    ("_thread_pool.py", "run"), ("socket.py", "accept"), ("socketserver.py", "serve_forever"),
+}
+
+
+class Recorder:
+    """요청 하나의 샘플 (folded 스택 → 횟수)"""
+
+    def __init__(self):
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def add(self, stacks: List[str]):
+        self.samples += 1
+        self.stacks.update(stacks)
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES
+
+def collect_stacks(skip_ident: int) -> List[str]:
+    """샘플링 스레드를 뺀 실행 중인 스레드들의 스택 (루트 → 현재 함수, 스레드 이름이 맨 앞)"""
+    names = {t.ident: t.name for t in threading.enumerate()}
+    stacks = []
+    for ident, frame in sys._current_frames().items():
+        if ident == skip_ident or is_idle(frame):
+            continue
+        labels = []
+        while frame is not None:
+            labels.append(frame_label(frame))
+            frame = frame.f_back
+        labels.append(names.get(ident, f"thread-{ident}"))
+        stacks.append(";".join(reversed(labels)))
+    return stacks
+
+
+class Sampler:
+    """프로파일 중인 요청이 있는 동안만 도는 프로세스 전역 샘플링 스레드"""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self._active = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, recorder: Recorder):
+        with self._lock:
+            self._active.add(recorder)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+                self._thread.start()
+
+    def remove(self, recorder: Recorder):
+        with self._lock:
+            self._active.discard(recorder)
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                recorders = list(self._active)
+                if not recorders:
+                    self._thread = None
+                    return
+            stacks = collect_stacks(me)
+            for recorder in recorders:
+                recorder.add(stacks)
+            time.sleep(self.interval)
+
+_sampler = Sampler()
+
+# ----------------------------
+# 저장 / 조회
+def parse_server_timing(values: List[str]) -> Dict[str, dict]:
+    """'predict;dur=12.3, db;dur=0.4;desc="3 queries"' → {"predict": {"dur": 12.3}, "db": {"dur": 0.4, "desc": "3 queries"}}"""
+    metrics = {}
+    for value in values:
+        for entry in value.split(","):
+            name, *params = [part.strip() for part in entry.split(";")]
+            if not name:
+                continue
+            metric = {}
+            for param in params:
+                key, _, raw = param.partition("=")
+                raw = raw.strip('"')
+                try:
+                    metric[key] = float(raw) if key == "dur" else raw
+                except ValueError:
+                    metric[key] = raw
+            metrics[name] = metric
+    return metrics
+
+def query_count(desc: Optional[str]) -> Optional[int]:
+    """query_counter의 db 항목 설명('12 queries')에서 쿼리 수"""
+    match = re.match(r"(\d+) queries", desc or "")
+    return int(match.group(1)) if match else None
+
+def route_slug(method: str, route: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", f"{method} {route}").strip("_") or "root"
+
+def save_profile(meta: dict, recorder: Recorder, directory: Optional[str] = None) -> str:
+    directory = directory or PROFILE_DIR
+    route_dir = os.path.join(directory, route_slug(meta["method"], meta["route"]))
+    os.makedirs(route_dir, exist_ok=True)
+    with open(os.path.join(route_dir, f"{meta['id']}.folded"), "w", encoding="utf-8") as f:
+        f.write(recorder.folded())
+    with open(os.path.join(route_dir, f"{meta['id']}.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    prune(directory)
+    return meta["id"]
+
+def _meta_paths(directory: str) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
+    return [
+        os.path.join(directory, route, name)
+        for route in os.listdir(directory) if os.path.isdir(os.path.join(directory, route))
+        for name in os.listdir(os.path.join(directory, route)) if name.endswith(".json")
+    ]
+
+def prune(directory: str, keep: int = None):
+    """가장 최근 keep개만 남김 (id가 밀리초 시각으로 시작하므로 이름순 = 시간순)"""
+    keep = PROFILE_KEEP if keep is None else keep
+    paths = sorted(_meta_paths(directory), key=os.path.basename)
+    for path in paths[:max(len(paths) - keep, 0)]:
+        for ext in (".json", ".folded"):
+            try:
+                os.remove(path[:-len(".json")] + ext)
+            except FileNotFoundError:
+                pass
+
+def list_profiles(limit: int = 20, route: Optional[str] = None, directory: Optional[str] = None, top: int = 5) -> List[dict]:
+    """저장된 프로파일을 소요 시간이 긴 순으로 (가장 많이 잡힌 스택 top개 포함)"""
+    profiles = []
+    for path in _meta_paths(directory or PROFILE_DIR):
+        try:
+            with open(path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue  # 쓰는 중이거나 지워진 파일
+        if route and meta.get("route") != route:
+            continue
+        meta["_path"] = path
+        profiles.append(meta)
+    profiles.sort(key=lambda m: m.get("duration_ms", 0), reverse=True)
+
+    results = []
+    for meta in profiles[:limit]:
+        folded = meta.pop("_path")[:-len(".json")] + ".folded"
+        try:
+            with open(folded, encoding="utf-8") as f:
+                meta["top_stacks"] = [line.rstrip("\n") for _, line in zip(range(top), f)]
+        except OSError:
+            meta["top_stacks"] = []
+        results.append(meta)
+    return results
+
+def read_profile(profile_id: str, directory: Optional[str] = None) -> Optional[str]:
+    """folded 스택 전체 (없으면 None)"""
+    if not re.fullmatch(r"[0-9a-f-]+", profile_id):
+        return None
+    for path in _meta_paths(directory or PROFILE_DIR):
+        if os.path.basename(path) == f"{profile_id}.json":
+            with open(path[:-len(".json")] + ".folded", encoding="utf-8") as f:
+                return f.read()
+    return None
+
+# ----------------------------
+# ASGI 미들웨어 (QueryCountMiddleware보다 바깥에 등록해야 db Server-Timing 항목을 볼 수 있음)
+class ProfilingMiddleware:
+    def __init__(self, app, sample_rate: float = None, header: str = None, directory: str = None):
+        self.app = app
+        self.sample_rate = PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.header = (header or PROFILE_HEADER).lower().encode()
+        self.directory = directory
+
+    def should_profile(self, scope) -> bool:
+        if scope["path"].startswith("/admin/"):
+            return False
+        if any(name == self.header and value == b"1" for name, value in scope["headers"]):
+            return True
+        return random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.should_profile(scope):
+            return await self.app(scope, receive, send)
+
+        recorder = Recorder()
+        response = {"status": None, "timing": []}
+
+        async def send_and_capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["timing"] = [v.decode() for k, v in message.get("headers", []) if k.lower() == b"server-timing"]
+            await send(message)
+
+        started_at = datetime.now()
+        started = time.perf_counter()
+        _sampler.add(recorder)
+        try:
+            await self.app(scope, receive, send_and_capture)
+        finally:
+            _sampler.remove(recorder)
+            duration = time.perf_counter() - started
+            route = scope.get("route")
+            timing = parse_server_timing(response["timing"])
+            db = timing.pop("db", {})
+            meta = {
+                "id": f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:6]}",
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", scope["path"]),
+                "status": response["status"],
+                "started_at": started_at.isoformat(timespec="milliseconds"),
+                "duration_ms": round(duration * 1000, 2),
+                "samples": recorder.samples,
+                "queries": query_count(db.get("desc")),
+                "db_ms": db.get("dur"),
+                "stages_ms": {name: metric.get("dur") for name, metric in timing.items()},
+            }
+            try:
+                save_profile(meta, recorder, self.directory)
+            except OSError as e:
+                print(f"⚠️ 프로파일 저장 실패: {e}")
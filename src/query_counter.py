@@ -0,0 +1,143 @@
+'''
+요청별 SQL 쿼리 수/DB 시간 측정과 N+1 탐지
+모든 Engine(테스트용 엔진, async 엔진의 내부 sync 엔진 포함)의 커서 실행 이벤트에서 현재 측정 범위(contextvar)에 기록
+측정 범위가 없으면 이벤트는 바로 반환하므로 평소 비용은 거의 없음
+- QueryCountMiddleware: 요청마다 측정해 Server-Timing 헤더(db;dur=...;desc="N queries")로 응답하고,
+  QUERY_BUDGET을 넘거나 같은 SQL이 N_PLUS_ONE_THRESHOLD번 이상 반복되면 경고 출력
+- assert_max_queries(n): 테스트에서 블록 안의 쿼리 수가 n을 넘으면 실패
+※ 스트리밍 응답은 헤더를 보낸 시점까지의 쿼리만 헤더에 들어가고, 경고는 본문 전송이 끝난 뒤 전체 기준으로 판단
+'''
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+# 요청당 쿼리 수 예산, N+1로 볼 같은 SQL 반복 횟수
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "20"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+
+class QueryStats:
+    """한 측정 범위의 쿼리 수, DB 시간(초), SQL별 실행 횟수"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+        # 한 요청 안에서 여러 스레드(in_thread 단계)가 동시에 기록할 수 있음
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        """threshold번 이상 실행된 같은 SQL (반복문 안의 쿼리 = N+1 의심)"""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'
+
+    def describe(self, limit: int = 5) -> str:
+        lines = [f"{n}× {shorten(sql)}" for sql, n in self.statements.most_common(limit)]
+        return f"{self.count}개 쿼리, {self.seconds * 1000:.1f}ms\n  " + "\n  ".join(lines)
+
+
+def shorten(sql: str, width: int = 160) -> str:
+    sql = re.sub(r"\s+", " ", sql).strip()
+    return sql if len(sql) <= width else sql[:width] + "..."
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# ----------------------------
+# SQLAlchemy 이벤트 (Engine 클래스에 등록 → 모든 엔진에 적용)
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.get("query_started")
+    if stats is not None and started:
+        stats.record(statement, time.perf_counter() - started.pop())
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # 실패한 실행은 after 이벤트가 없으므로 시작 시각만 버림
+    conn = exception_context.connection
+    started = conn.info.get("query_started") if conn is not None else None
+    if started:
+        started.pop()
+
+
+@contextmanager
+def track_queries():
+    """블록 안에서 실행된 쿼리를 QueryStats로 모음 (바깥 측정 범위에도 합산)"""
+    parent = _current.get()
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        if parent is not None:
+            with parent._lock:
+                parent.count += stats.count
+                parent.seconds += stats.seconds
+                parent.statements.update(stats.statements)
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+@contextmanager
+def assert_max_queries(n: int):
+    """
+    테스트 헬퍼: 블록 안의 쿼리가 n개를 넘으면 AssertionError (실행된 SQL 요약 포함)
+    with assert_max_queries(3):
+        client.get("/api/quests")
+    """
+    with track_queries() as stats:
+        yield stats
+    assert stats.count <= n, f"쿼리 {stats.count}개 실행 (최대 {n}개)\n  " + stats.describe(10)
+
+
+# ----------------------------
+# ASGI 미들웨어
+def report(method: str, path: str, stats: QueryStats, budget: int = None):
+    """예산 초과 또는 N+1 의심 요청을 경고로 출력"""
+    budget = QUERY_BUDGET if budget is None else budget
+    repeated = stats.repeated()
+    if stats.count > budget or repeated:
+        reason = f"예산 {budget}개 초과" if stats.count > budget else "같은 쿼리 반복(N+1 의심)"
+        print(f"⚠️ {method} {path}: {reason}, {stats.describe()}")
+
+class QueryCountMiddleware:
+    def __init__(self, app, budget: int = None):
+        self.app = app
+        self.budget = budget
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with track_queries() as stats:
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+        report(scope["method"], scope["path"], stats, self.budget)
@@ -4,7 +4,7 @@ FastAPI와 Pydantic을 사용하여 API로 들어오고 나가는 데이터의 
 DB 객체를 API 형식으로 변환할 때 사용
 '''
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 # ---------- User ----------
@@ -51,8 +51,32 @@ class Quest(QuestBase):
     completed: bool
     ai_recommended: bool
     success_rate: float
+    progress: Optional[float] = 0.0
     created_at: datetime
     completed_at: Optional[datetime]
+    # 임시 성공률로 저장되어 예측값이 아직 계산 중인지 여부
+    prediction_pending: bool = False
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# ---------- QuestHistory ----------
+class QuestHistoryEntry(BaseModel):
+    id: int
+    quest_id: int
+    action: str
+    progress: Optional[float] = 0.0
+    timestamp: datetime
+
+    class Config:
+        from_attributes = True
+
+# ---------- 키셋 페이지네이션 ----------
+# next_cursor가 None이면 마지막 페이지
+class QuestPage(BaseModel):
+    items: List[Quest]
+    next_cursor: Optional[str] = None
+
+class QuestHistoryPage(BaseModel):
+    items: List[QuestHistoryEntry]
+    next_cursor: Optional[str] = None
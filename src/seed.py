@@ -1,13 +1,26 @@
 """
 DB 관리 및 데이터 구조 정의 (백본)
 현실적 분포 기반의 더미데이터 생성 + ML 학습 품질 개선
+벤치마크용 대용량 DB(수백만 사용자/퀘스트/히스토리)도 만들 수 있도록
+- 사용자 구간(청크) 단위로 생성하고 청크마다 (seed, 청크 번호)로 만든 RNG를 사용 → 프로세스 수와 관계없이 같은 결과
+- 사용자 과거 성공률은 DB 조회 대신 메모리에서 누적 계산
+- 청크 하나를 한 트랜잭션에서 batch_size 단위 executemany, 롤업/스트릭/진행률은 마지막에 한 번 재계산
+- --workers를 주면 생성은 여러 프로세스에서, insert는 메인 프로세스에서 순서대로 수행 (SQLite는 쓰기 1개만 가능)
 """
 
-import random
-from datetime import datetime, timedelta, timezone
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
 import numpy as np
-from .database import SessionLocal, User, Quest, QuestHistory,init_db
-from .model import get_user_success_rate
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from .database import Base, engine, User, Quest, QuestHistory, init_db
+from .backfill import backfill_daily_activity, backfill_streak_state, backfill_quest_progress
 
 
 # 카테고리별 현실적 성공률 평균
@@ -21,7 +34,7 @@ CATEGORY_BASE = {
     "health":  0.65,    # 건강 관련: 비교적 높음
 }
 
-# 난이도별 분포 
+# 난이도별 분포
 DIFFICULTY_DIST = {
     1: (0.90, 0.10),
     2: (0.75, 0.12),
@@ -34,146 +47,339 @@ DIFFICULTY_DIST = {
 NUM_USERS = 20
 QUESTS_PER_USER = 30
 
-
-def seed_users(db, num_users=NUM_USERS):
-    """랜덤한 편향값을 가진 유저 더미 생성"""
-    users = []
-    user_bias_map = {}
-
-    for i in range(1, num_users + 1):
-        bias = np.random.normal(loc=0.0, scale=0.15)
-        user = User(
-            name=f"user{i}",
-            email=f"user{i}@example.com",
-            consistency_score=random.randint(1, 5),
-            risk_aversion_score=random.randint(1, 5),
+# 대용량 생성 기본값
+USERS_PER_CHUNK = 1000
+BATCH_SIZE = 10000
+QUEST_COUNT_DISTS = ("fixed", "poisson", "lognormal")
+
+# 생성 결과 행(tuple)의 컬럼 순서 (ORM/파라미터 변환 없이 드라이버 executemany로 바로 insert)
+USER_COLUMNS = (
+    "id", "name", "email", "is_active", "consistency_score", "risk_aversion_score", "total_quests",
+    "completed_quests", "streak_days", "longest_streak", "preferred_category", "average_success_rate",
+    "created_at", "last_active_at",
+)
+QUEST_COLUMNS = (
+    "id", "user_id", "name", "category", "duration", "difficulty", "motivation", "completed",
+    "ai_recommended", "success_rate", "progress", "created_at", "completed_at",
+)
+HISTORY_COLUMNS = ("quest_id", "user_id", "action", "progress", "timestamp", "started_at", "completed_at", "duration_days")
+HISTORY_ACTIONS = ("created", "progress_update", "completed")
+
+
+# ----------------------------
+# 분포
+def parse_category_weights(text: Optional[str]) -> Dict[str, float]:
+    """'reading=2,study=1' → 정규화된 카테고리 확률 (없으면 균등)"""
+    weights = {category: 1.0 for category in CATEGORY_BASE}
+    if text:
+        weights = {category: 0.0 for category in CATEGORY_BASE}
+        for item in text.split(","):
+            category, _, value = item.partition("=")
+            if category.strip() not in CATEGORY_BASE:
+                raise ValueError(f"알 수 없는 카테고리: {category}")
+            weights[category.strip()] = float(value or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("카테고리 가중치 합이 0입니다")
+    return {category: w / total for category, w in weights.items()}
+
+def draw_quest_counts(rng: np.random.Generator, n: int, mean: float, dist: str) -> np.ndarray:
+    """사용자별 퀘스트 수"""
+    if dist == "fixed":
+        return np.full(n, int(round(mean)), dtype=np.int64)
+    if dist == "poisson":
+        return rng.poisson(mean, n)
+    if dist == "lognormal":
+        # 평균이 mean이 되도록 mu를 맞춘 긴 꼬리 분포 (소수 사용자가 퀘스트 대부분을 만듦)
+        sigma = 1.0
+        return np.rint(rng.lognormal(np.log(max(mean, 1e-9)) - sigma ** 2 / 2, sigma, n)).astype(np.int64)
+    raise ValueError(f"알 수 없는 분포: {dist}")
+
+def success_rate_base(rng, durations, difficulties, categories, user_bias):
+    """
+    성공률에서 사용자 과거 성공률 항을 뺀 나머지 (category + difficulty + duration + 개인차)를 한 번에 계산
+    카테고리 영향 40%, 난이도 영향 60%, 기간이 길수록 패널티(최대 -0.36), 개인 편향 12%
+    """
+    dist_mean = np.array([DIFFICULTY_DIST[d][0] for d in range(1, 6)])[difficulties - 1]
+    dist_sd = np.array([DIFFICULTY_DIST[d][1] for d in range(1, 6)])[difficulties - 1]
+    cat_base = np.array([CATEGORY_BASE[c] for c in CATEGORY_BASE])[categories]
+
+    raw_mean = 0.6 * dist_mean + 0.4 * cat_base - 0.006 * np.minimum(durations, 60)
+    sampled = rng.normal(raw_mean, dist_sd)
+    return 0.7 * sampled + 0.12 * user_bias + 0.03 * rng.uniform(-0.05, 0.05, len(durations))
+
+
+# ----------------------------
+# 청크 생성 (DB를 쓰지 않으므로 다른 프로세스에서 실행 가능)
+def generate_chunk(spec: dict) -> dict:
+    """
+    spec의 사용자 구간에 대한 users/quests/quest_history 행(dict 목록)을 만듭니다.
+    같은 spec이면 항상 같은 행을 반환합니다.
+    """
+    rng = np.random.default_rng([spec["seed"], spec["chunk"], 1])
+    anchor: datetime = spec["anchor"]
+    counts = np.asarray(spec["quest_counts"], dtype=np.int64)
+    n_users, n_quests = len(counts), int(counts.sum())
+    user_ids = np.arange(spec["first_user_id"], spec["first_user_id"] + n_users)
+    categories = list(CATEGORY_BASE)
+
+    # 사용자 성향
+    bias = rng.normal(0.0, 0.15, n_users)
+    consistency = rng.integers(1, 6, n_users)
+    risk = rng.integers(1, 6, n_users)
+
+    # 퀘스트 속성 (사용자 순서대로 이어 붙인 배열)
+    owner = np.repeat(np.arange(n_users), counts)
+    position = np.arange(n_quests) - np.repeat(np.cumsum(counts) - counts, counts) + 1  # 사용자 안에서 몇 번째 퀘스트인지
+    cat_idx = rng.choice(len(categories), n_quests, p=[spec["category_probs"][c] for c in categories])
+    durations = rng.integers(1, spec["max_duration"] + 1, n_quests)
+    difficulties = rng.integers(1, 6, n_quests)
+    base = success_rate_base(rng, durations, difficulties, cat_idx, bias[owner])
+    rolls = rng.random(n_quests)
+    created_offsets = rng.uniform(0, spec["days"] * 86400, n_quests)
+    done_after_days = np.floor(rng.random(n_quests) * durations).astype(np.int64) + 1
+    open_progress = rng.uniform(0.1, 0.8, n_quests)
+    event_counts = rng.poisson(spec["events_per_quest"], n_quests) if spec["events_per_quest"] > 0 else np.zeros(n_quests, dtype=np.int64)
+
+    # 사용자 과거 성공률(이전 퀘스트 완료 비율)은 순서대로 누적해야 하므로 여기만 반복문
+    success = np.empty(n_quests)
+    completed = np.empty(n_quests, dtype=bool)
+    done_count = np.zeros(n_users, dtype=np.int64)
+    seen_count = np.zeros(n_users, dtype=np.int64)
+    for i, u in enumerate(owner.tolist()):
+        user_rate = done_count[u] / seen_count[u] if seen_count[u] else 0.5
+        rate = min(max(0.15 * user_rate + base[i], 0.05), 0.95)
+        success[i] = rate
+        completed[i] = rolls[i] < rate
+        seen_count[u] += 1
+        done_count[u] += completed[i]
+
+    # 시각은 에포크 마이크로초 배열로 계산하고 문자열 변환도 한 번에 처리
+    anchor_us = int(anchor.timestamp() * 1_000_000)
+    day_us = 86400 * 1_000_000
+    created_us = anchor_us - (created_offsets * 1_000_000).astype(np.int64)
+    completed_us = np.minimum(created_us + done_after_days * day_us, anchor_us)
+    created_str = format_timestamps(created_us)
+    completed_str = format_timestamps(completed_us)
+
+    rate_sum = np.bincount(owner, weights=success, minlength=n_users)
+    cat_counts = np.zeros((n_users, len(categories)), dtype=np.int64)
+    np.add.at(cat_counts, (owner, cat_idx), 1)
+    user_created, user_active = format_timestamps(np.array([anchor_us - spec["days"] * day_us, anchor_us]))
+    users = [
+        (
+            user_id, f"user{user_id}", f"user{user_id}@example.com", 1,
+            int(consistency[u]), int(risk[u]), int(counts[u]), int(done_count[u]), 0, 0,
+            categories[int(cat_counts[u].argmax())] if counts[u] else None,
+            float(rate_sum[u] / counts[u]) if counts[u] else 0.0,
+            user_created, user_active,
         )
-        db.add(user)
-        users.append(user)
-        user_bias_map[i] = bias
-
-    db.commit()
-    for u in users:
-        db.refresh(u)
-
-    return users, user_bias_map
-
-
-def calculate_success_rate(db, user_id, duration, difficulty, category, user_bias_map):
-    """현실적 성공률 계산 (category + difficulty + duration + 개인차 반영)"""
-    # 1. 사용자 과거 성공률
-    user_rate = get_user_success_rate(user_id)
-    if user_rate is None or np.isnan(user_rate):
-        user_rate = 0.5
-
-    # 2. 카테고리 평균
-    cat_base = CATEGORY_BASE.get(category, 0.55)
-
-    # 3. 난이도 분포에서 샘플링
-    difficulty = int(max(1, min(5, difficulty)))
-    dist_mean, dist_sd = DIFFICULTY_DIST[difficulty]
-
-    # 4. raw 평균 계산 (카테고리 영향 40%, 난이도 영향 60%)
-    raw_mean = 0.6 * dist_mean + 0.4 * cat_base
-
-    # 5. 기간 패널티 (길면 더 어렵다)
-    duration_penalty = 0.006 * min(duration, 60)  # 최대 -0.3
-    raw_mean -= duration_penalty
-
-    # 6. 정규분포 샘플링
-    sampled = np.random.normal(loc=raw_mean, scale=dist_sd)
-
-    # 7. 개인 편향
-    user_bias = user_bias_map.get(user_id, 0.0)
-
-    # 8. 최종 조합 (difficulty 효과를 강화)
-    final = (
-        0.15 * user_rate +
-        0.7 * sampled +
-        0.12 * user_bias +
-        0.03 * random.uniform(-0.05, 0.05)
+        for u, user_id in enumerate(user_ids.tolist())
+    ]
+
+    quest_ids = np.arange(spec["first_quest_id"], spec["first_quest_id"] + n_quests)
+    quest_users = user_ids[owner]
+    quests = [
+        (
+            qid, uid, f"퀘스트_{pos}_{categories[c]}", categories[c], dur, diff,
+            f"이 목표는 {categories[c]} 관련이다", int(done), 0, rate, 0.0,
+            created_str[i], completed_str[i] if done else None,
+        )
+        for i, (qid, uid, pos, c, dur, diff, done, rate) in enumerate(zip(
+            quest_ids.tolist(), quest_users.tolist(), position.tolist(), cat_idx.tolist(),
+            durations.tolist(), difficulties.tolist(), completed.tolist(), success.tolist(),
+        ))
+    ]
+
+    # 히스토리: 미완료는 생성 로그, 완료는 완료 로그 + 그 사이 진행률 기록 (진행률은 target까지 증가)
+    target = np.where(completed, 1.0, open_progress)
+    end_us = np.where(completed, completed_us, anchor_us)
+    event_quest = np.repeat(np.arange(n_quests), event_counts)
+    steps = rng.random(len(event_quest))
+    open_idx = np.flatnonzero(~completed)
+    done_idx = np.flatnonzero(completed)
+
+    quest_idx = np.concatenate([open_idx, event_quest, done_idx])
+    kind = np.concatenate([np.zeros(len(open_idx), np.int8), np.ones(len(event_quest), np.int8), np.full(len(done_idx), 2, np.int8)])
+    progress = np.concatenate([
+        np.where(event_counts[open_idx] > 0, 0.0, target[open_idx]),
+        target[event_quest] * steps,
+        np.ones(len(done_idx)),
+    ])
+    timestamp_us = np.concatenate([
+        created_us[open_idx],
+        created_us[event_quest] + ((end_us - created_us)[event_quest] * steps).astype(np.int64),
+        completed_us[done_idx],
+    ])
+    order = np.lexsort((kind, timestamp_us, quest_idx))  # 퀘스트별 시간 순으로 insert
+    quest_idx, kind, progress, timestamp_str = quest_idx[order], kind[order], progress[order], format_timestamps(timestamp_us[order])
+    history = [
+        (
+            int(quest_ids[q]), int(quest_users[q]), HISTORY_ACTIONS[k], p, ts, created_str[q],
+            completed_str[q] if k == 2 else None,
+            int((completed_us[q] - created_us[q]) // day_us) if k == 2 else None,
+        )
+        for q, k, p, ts in zip(quest_idx.tolist(), kind.tolist(), progress.tolist(), timestamp_str)
+    ]
+
+    return {"chunk": spec["chunk"], "users": users, "quests": quests, "history": history}
+
+def format_timestamps(epoch_us: np.ndarray) -> List[str]:
+    """에포크 마이크로초 → SQLAlchemy SQLite DateTime 저장 형식('YYYY-MM-DD HH:MM:SS.ffffff', UTC)"""
+    return [t.replace("T", " ") for t in np.datetime_as_string(epoch_us.astype("datetime64[us]"), unit="us").tolist()]
+
+
+# ----------------------------
+# 청크 계획 / 실행
+def plan_chunks(
+    num_users: int,
+    first_user_id: int,
+    first_quest_id: int,
+    seed: int,
+    quests_per_user: float,
+    quest_dist: str,
+    users_per_chunk: int,
+    **params,
+) -> Iterator[dict]:
+    """청크별 spec을 순서대로 만듭니다. 퀘스트 수를 먼저 정해 두므로 청크마다 퀘스트 id 구간이 미리 정해짐"""
+    quest_id = first_quest_id
+    for chunk, start in enumerate(range(0, num_users, users_per_chunk)):
+        n = min(users_per_chunk, num_users - start)
+        counts = draw_quest_counts(np.random.default_rng([seed, chunk, 0]), n, quests_per_user, quest_dist)
+        yield {
+            "seed": seed,
+            "chunk": chunk,
+            "first_user_id": first_user_id + start,
+            "first_quest_id": quest_id,
+            "quest_counts": counts.tolist(),
+            **params,
+        }
+        quest_id += int(counts.sum())
+
+def generate_chunks(specs: Iterator[dict], workers: int) -> Iterator[dict]:
+    """workers > 1이면 프로세스 풀에서 생성하되 결과는 청크 순서대로 반환 (대기 중인 청크 수 제한)"""
+    if workers <= 1:
+        yield from map(generate_chunk, specs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for spec in specs:
+            pending.append(pool.submit(generate_chunk, spec))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def insert_batches(conn, table, columns, rows: List[tuple], batch_size: int):
+    """행 tuple을 batch_size씩 executemany (SQLite qmark 파라미터, 값은 생성 단계에서 이미 저장 형식으로 변환됨)"""
+    sql = f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+    for start in range(0, len(rows), batch_size):
+        conn.exec_driver_sql(sql, rows[start:start + batch_size])
+
+def run_seed(
+    num_users: int = NUM_USERS,
+    quests_per_user: float = QUESTS_PER_USER,
+    quest_dist: str = "fixed",
+    events_per_quest: float = 0.0,
+    days: int = 30,
+    max_duration: int = 30,
+    category_weights: Optional[str] = None,
+    seed: int = 42,
+    workers: int = 1,
+    users_per_chunk: int = USERS_PER_CHUNK,
+    batch_size: int = BATCH_SIZE,
+    anchor: Optional[datetime] = None,
+    bind: Optional[Engine] = None,
+) -> Dict[str, int]:
+    """DB 초기화 및 시드 실행. 기존 데이터 뒤에 이어서(id를 이어 붙여) 추가합니다."""
+    if bind is None:
+        bind = engine
+        init_db()
+    else:
+        Base.metadata.create_all(bind=bind)
+
+    # 시각 기준점 (같은 seed/anchor면 같은 데이터)
+    anchor = anchor or datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    with bind.connect() as conn:
+        first_user_id = (conn.execute(select(func.max(User.id))).scalar() or 0) + 1
+        first_quest_id = (conn.execute(select(func.max(Quest.id))).scalar() or 0) + 1
+
+    specs = plan_chunks(
+        num_users, first_user_id, first_quest_id, seed, quests_per_user, quest_dist, users_per_chunk,
+        anchor=anchor,
+        days=days,
+        max_duration=max_duration,
+        events_per_quest=events_per_quest,
+        category_probs=parse_category_weights(category_weights),
+    )
+    totals = {"users": 0, "quests": 0, "history": 0}
+    started = time.perf_counter()
+    n_chunks = (num_users + users_per_chunk - 1) // users_per_chunk
+    for result in generate_chunks(specs, workers):
+        with bind.begin() as conn:
+            insert_batches(conn, User.__table__, USER_COLUMNS, result["users"], batch_size)
+            insert_batches(conn, Quest.__table__, QUEST_COLUMNS, result["quests"], batch_size)
+            insert_batches(conn, QuestHistory.__table__, HISTORY_COLUMNS, result["history"], batch_size)
+        for key in totals:
+            totals[key] += len(result[key])
+        if n_chunks > 1:
+            elapsed = time.perf_counter() - started
+            print(f"  청크 {result['chunk'] + 1}/{n_chunks}: 퀘스트 {totals['quests']:,}개 ({totals['quests'] / elapsed:,.0f}개/초)")
+
+    # 히스토리를 직접 insert했으므로 일일 활동 롤업, 스트릭 상태, 퀘스트 진행률을 한 번에 재계산
+    db = Session(bind=bind)
+    try:
+        backfill_daily_activity(db)
+        backfill_streak_state(db)
+        backfill_quest_progress(db)
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ 더미 데이터 삽입 완료: 사용자 {totals['users']:,}명, 퀘스트 {totals['quests']:,}개, "
+        f"히스토리 {totals['history']:,}개 ({elapsed:.1f}초)"
+    )
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="더미 데이터 생성 (벤치마크용 대용량 DB 포함)")
+    parser.add_argument("--users", type=int, default=NUM_USERS, help="생성할 사용자 수")
+    parser.add_argument("--quests-per-user", type=float, default=QUESTS_PER_USER, help="사용자당 퀘스트 수 (분포의 평균)")
+    parser.add_argument("--quest-dist", choices=QUEST_COUNT_DISTS, default="fixed", help="사용자당 퀘스트 수 분포")
+    parser.add_argument("--events-per-quest", type=float, default=0.0, help="퀘스트당 추가 진행률 기록 수 평균 (포아송)")
+    parser.add_argument("--days", type=int, default=30, help="퀘스트 생성 시각을 분산할 기간(일)")
+    parser.add_argument("--max-duration", type=int, default=30, help="퀘스트 기간 최댓값(일)")
+    parser.add_argument("--category-weights", default=None, help="예: reading=2,study=1,exercise=1 (기본 균등)")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드 (같은 값이면 같은 데이터)")
+    parser.add_argument("--anchor-date", default=None, help="기준 날짜 YYYY-MM-DD (기본 오늘), 생성 시각은 이 날짜 이전")
+    parser.add_argument("--workers", type=int, default=1, help="데이터 생성 프로세스 수")
+    parser.add_argument("--users-per-chunk", type=int, default=USERS_PER_CHUNK, help="한 트랜잭션에 넣을 사용자 수")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="insert 한 번에 보낼 행 수")
+    args = parser.parse_args(argv)
+
+    anchor = None
+    if args.anchor_date:
+        anchor = datetime.strptime(args.anchor_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    run_seed(
+        num_users=args.users,
+        quests_per_user=args.quests_per_user,
+        quest_dist=args.quest_dist,
+        events_per_quest=args.events_per_quest,
+        days=args.days,
+        max_duration=args.max_duration,
+        category_weights=args.category_weights,
+        seed=args.seed,
+        workers=args.workers,
+        users_per_chunk=args.users_per_chunk,
+        batch_size=args.batch_size,
+        anchor=anchor,
     )
-
-    # 9. 안전 범위 클램프
-    return float(np.clip(final, 0.05, 0.95))
-
-
-def seed_quests(db, users, user_bias_map, num_quests_per_user=QUESTS_PER_USER):
-    """유저별 퀘스트 생성"""
-    categories = list(CATEGORY_BASE.keys())
-
-    for user in users:
-        for i in range(num_quests_per_user):
-            category = random.choice(categories)
-            name = f"퀘스트_{i+1}_{category}"
-            duration = random.randint(1, 30)
-            difficulty = random.randint(1, 5)
-            motivation = f"이 목표는 {category} 관련이다"
-
-            success_rate = calculate_success_rate(db, user.id, duration, difficulty, category, user_bias_map)
-            completed = random.random() < success_rate
-
-            created = datetime.now(timezone.utc) - timedelta(days=random.randint(0, 30))
-            completed_at = created + timedelta(days=random.randint(1, duration)) if completed else None
-
-            quest = Quest(
-                user_id=user.id,
-                name=name,
-                category=category,
-                duration=duration,
-                difficulty=difficulty,
-                motivation=motivation,
-                completed=completed,
-                created_at=created,
-                completed_at=completed_at,
-                success_rate=success_rate,
-            )
-            db.add(quest)
-            db.commit()
-            db.refresh(quest)
-
-            if completed:
-                duration_days = (quest.completed_at - quest.created_at).days
-                history = QuestHistory(
-                    quest_id=quest.id,
-                    user_id=user.id,
-                    action="completed",
-                    progress=1.0,
-                    started_at=quest.created_at,
-                    completed_at=quest.completed_at,
-                    duration_days=duration_days,
-                    timestamp=quest.completed_at
-                )
-                db.add(history)
-                
-            else:
-                # 미완료 퀘스트의 경우 생성 로그만 남김
-                history = QuestHistory(
-                    quest_id=quest.id,
-                    user_id=user.id,
-                    action="created",
-                    progress=random.uniform(0.1, 0.8),
-                    started_at=quest.created_at,
-                    completed_at=None,
-                    duration_days=None,
-                    timestamp=quest.created_at
-                )
-                db.add(history)    
-            
-            db.commit()
-
-def run_seed():
-    """DB 초기화 및 시드 실행"""
-    init_db()
-    db = SessionLocal()
-    users, user_bias_map = seed_users(db)
-    seed_quests(db, users, user_bias_map)
-    db.close()
-    print("✅ 더미 데이터 삽입 완료.")
 
 
 if __name__ == "__main__":
-    run_seed()
+    main()
 
 # python -m src.seed
-
+# python -m src.seed --users 100000 --quests-per-user 40 --quest-dist lognormal --events-per-quest 2 --workers 4
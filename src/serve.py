@@ -0,0 +1,275 @@
+'''
+preload/fork 배포 모드: 마스터 프로세스에서 src.main을 한 번 임포트(모델/임베더 로드, init_db)하고
+gc.freeze() 후 워커를 fork하여 모델 메모리 페이지를 copy-on-write로 공유
+uvicorn --workers N은 워커마다 src.main을 새로 임포트하므로 SentenceTransformer와 랜덤 포레스트가 N벌 생김
+
+- Python 문서의 권장 순서대로 마스터는 시작하자마자 gc.disable(), fork 직전에 gc.freeze(), 워커는 gc.enable()
+  (GC가 부모에서 온 객체의 헤더를 건드려 공유 페이지가 복사되는 것을 막음)
+- 모델 학습(TRAIN_ON_STARTUP)은 워커가 아닌 마스터가 서브프로세스로 한 번만 실행하고(메인 루프에서 종료 확인), 끝나면 새 모델로 워커를 교체
+  마스터에 스레드를 만들지 않으므로 학습 중에 워커를 다시 fork해도 안전
+- 워커가 죽으면 마스터가 다시 fork (모델을 다시 로드하지 않음), SIGHUP이면 모델을 다시 로드한 뒤 워커를 하나씩 교체
+- SIGUSR1 또는 --report-after로 프로세스별 RSS/PSS/USS 메모리 보고서 출력 (Linux /proc 기준)
+※ fork 전에 마스터에서 추론을 돌리지 않음 (torch/OpenMP 스레드 풀이 만들어진 뒤 fork하면 워커에서 멈출 수 있음)
+
+python -m src.serve --workers 4 --port 8000 --report-after 15
+'''
+import argparse
+import gc
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+SHUTDOWN_TIMEOUT = 30
+
+# ----------------------------
+# 메모리 보고서
+def parse_smaps_rollup(text: str) -> Dict[str, int]:
+    """/proc/<pid>/smaps_rollup → {필드: KiB}"""
+    fields = {}
+    for line in text.splitlines():
+        name, _, rest = line.partition(":")
+        parts = rest.split()
+        if len(parts) == 2 and parts[1] == "kB":
+            fields[name] = int(parts[0])
+    return fields
+
+def memory_usage(pid: int) -> Optional[Dict[str, int]]:
+    """
+    프로세스 메모리(KiB): rss, pss(공유 페이지를 나눠 가진 몫), uss(이 프로세스만 쓰는 페이지), shared
+    fork 공유의 효과는 RSS가 아니라 PSS/USS 합계에서 보임 (RSS는 공유 페이지를 프로세스마다 중복으로 셈)
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            fields = parse_smaps_rollup(f.read())
+    except OSError:
+        return None
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+def memory_report(pids: Dict[int, str]) -> List[dict]:
+    rows = []
+    for pid, role in pids.items():
+        usage = memory_usage(pid)
+        if usage:
+            rows.append({"pid": pid, "role": role, **usage})
+    return rows
+
+def print_memory_report(rows: List[dict], title: str = "메모리 사용량"):
+    mb = lambda kib: f"{kib / 1024:9.1f}"
+    print(f"\n=== {title} (MiB) ===")
+    print(f"{'pid':>8}  {'role':<10}{'RSS':>9}{'PSS':>9}{'USS':>9}{'shared':>9}")
+    for r in rows:
+        print(f"{r['pid']:>8}  {r['role']:<10}{mb(r['rss'])}{mb(r['pss'])}{mb(r['uss'])}{mb(r['shared'])}")
+    total = {k: sum(r[k] for r in rows) for k in ("rss", "pss", "uss", "shared")}
+    # 실제 점유량은 PSS 합계, RSS 합계와의 차이가 공유로 아낀 양
+    print(f"{'합계':>8}  {'':<10}{mb(total['rss'])}{mb(total['pss'])}{mb(total['uss'])}{mb(total['shared'])}")
+    print(f"공유로 절약: {(total['rss'] - total['pss']) / 1024:.1f} MiB (RSS 합계 - PSS 합계)")
+    return total
+
+# ----------------------------
+# 마스터 / 워커
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(app, sock: socket.socket, log_level: str):
+    """fork된 자식: 마스터의 시그널 처리를 되돌리고 같은 소켓에서 uvicorn 실행"""
+    import uvicorn
+
+    gc.enable()
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGUSR1):
+        signal.signal(sig, signal.SIG_DFL)
+    # 마스터가 쓰던 DB 연결을 물려받지 않도록 풀을 비움 (연결은 닫지 않고 버림)
+    from .database import engine
+    engine.dispose(close=False)
+
+    server = uvicorn.Server(uvicorn.Config(app, log_level=log_level))
+    server.run(sockets=[sock])
+
+
+class Master:
+    def __init__(self, app, sock: socket.socket, workers: int, log_level: str):
+        self.app = app
+        self.sock = sock
+        self.num_workers = workers
+        self.log_level = log_level
+        self.workers: Dict[int, int] = {}  # pid → 워커 번호
+        self.stopping = False
+        self.reload_requested = False
+        self.report_requested = False
+        self.trainer: Optional[subprocess.Popen] = None
+
+    def spawn(self, index: int) -> int:
+        gc.collect()
+        gc.freeze()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app, self.sock, self.log_level)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = index
+        return pid
+
+    def pids(self) -> Dict[int, str]:
+        return {os.getpid(): "master", **{pid: f"worker-{i}" for pid, i in sorted(self.workers.items(), key=lambda item: item[1])}}
+
+    def reload(self):
+        """모델을 다시 로드하고 워커를 하나씩 교체 (새 워커를 띄운 뒤 이전 워커 종료)"""
+        from . import model
+        print("⏳ 모델 다시 로드 후 워커 교체")
+        model.load_ml_model()
+        for pid, index in list(self.workers.items()):
+            self.spawn(index)
+            self.stop_worker(pid)
+
+    def stop_worker(self, pid: int):
+        try:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+        self.workers.pop(pid, None)
+
+    def reap(self):
+        """종료된 워커를 거두고, 종료 중이 아니면 같은 번호로 다시 fork (학습 서브프로세스는 건드리지 않음)"""
+        for pid, index in list(self.workers.items()):
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done, status = pid, -1
+            if done == 0:
+                continue
+            self.workers.pop(pid, None)
+            if not self.stopping:
+                print(f"⚠️ worker-{index} (pid {pid}) 종료 (status {status}), 다시 시작")
+                self.spawn(index)
+
+    def start_training(self):
+        """
+        학습 서브프로세스 시작 (기다리지 않음, 종료는 메인 루프의 poll_training에서 확인)
+        마스터에 학습을 기다리는 스레드가 있으면 워커가 죽거나 SIGHUP으로 다시 fork할 때 그 스레드가 fork 시점에 살아 있게 됨
+        """
+        env = dict(os.environ, THREADS_RESERVED=str(self.num_workers))
+        self.trainer = subprocess.Popen([sys.executable, "-m", "src.train"], env=env)
+
+    def poll_training(self):
+        """학습이 끝났으면 거두고, 성공했으면 새 모델로 워커 교체"""
+        if self.trainer is None:
+            return
+        code = self.trainer.poll()
+        if code is None:
+            return
+        self.trainer = None
+        if code != 0:
+            print(f"⚠️ 모델 학습 실패 (exit {code}), 기존 모델로 계속 실행")
+        elif not self.stopping:
+            self.reload_requested = True
+
+    def shutdown(self):
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            os.kill(pid, signal.SIGKILL)
+        if self.trainer is not None and self.trainer.poll() is None:
+            self.trainer.terminate()
+            try:
+                self.trainer.wait(SHUTDOWN_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self.trainer.kill()
+        self.sock.close()
+
+    def run(self, report_after: float = 0, train_on_startup: bool = False):
+        def on_stop(signum, frame):
+            self.stopping = True
+
+        def on_reload(signum, frame):
+            self.reload_requested = True
+
+        def on_report(signum, frame):
+            self.report_requested = True
+
+        signal.signal(signal.SIGTERM, on_stop)
+        signal.signal(signal.SIGINT, on_stop)
+        signal.signal(signal.SIGHUP, on_reload)
+        signal.signal(signal.SIGUSR1, on_report)
+
+        for index in range(self.num_workers):
+            self.spawn(index)
+        print(f"✅ 워커 {self.num_workers}개 시작 (마스터 pid {os.getpid()}), SIGUSR1: 메모리 보고서, SIGHUP: 모델 다시 로드")
+        if train_on_startup:
+            self.start_training()
+            print(f"✅ 마스터에서 모델 학습 시작 (pid {self.trainer.pid})")
+
+        report_at = time.monotonic() + report_after if report_after else None
+        while not self.stopping:
+            self.reap()
+            self.poll_training()
+            if self.reload_requested:
+                self.reload_requested = False
+                self.reload()
+            if self.report_requested or (report_at and time.monotonic() >= report_at):
+                self.report_requested, report_at = False, None
+                print_memory_report(memory_report(self.pids()))
+            time.sleep(0.2)
+        self.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모델을 미리 로드하고 워커를 fork하는 서버 실행")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "2")))
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--report-after", type=float, default=0, help="시작 후 N초 뒤 메모리 보고서 출력 (0이면 끔)")
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, "fork"):
+        sys.exit("fork를 지원하지 않는 플랫폼입니다. uvicorn src.main:app --workers N을 사용하세요.")
+
+    # 임포트 중 생기는 객체가 GC로 흩어지지 않도록 먼저 끔 (워커에서 다시 켬)
+    gc.disable()
+    # 스레드 예산(thread_budget)이 워커 수를 알 수 있도록 임포트 전에 설정
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    from . import main as app_module
+    from .database import engine
+
+    # 학습은 워커의 lifespan이 아니라 마스터에서 한 번만
+    train_on_startup = app_module.TRAIN_ON_STARTUP
+    app_module.TRAIN_ON_STARTUP = False
+    engine.dispose()
+
+    sock = bind_socket(args.host, args.port)
+    print(f"✅ 앱/모델 로드 완료, http://{args.host}:{args.port} 에서 워커 {args.workers}개로 실행")
+    master = Master(app_module.app, sock, args.workers, args.log_level)
+    master.run(args.report_after, train_on_startup)
+
+
+if __name__ == "__main__":
+    main()
+
+# python -m src.serve --workers 4
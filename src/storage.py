@@ -0,0 +1,111 @@
+"""
+DB 관리 및 데이터 구조 정의 (백본)
+SQLite 엔진 생성과 연결 시 적용할 PRAGMA 설정(WAL, synchronous, busy_timeout 등)을 환경별로 관리
+환경 변수 DB_PROFILE로 프로필을 고르고, SQLITE_<PRAGMA> 환경 변수로 개별 값을 덮어쓸 수 있음
+"""
+
+import os
+from typing import Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from dotenv import load_dotenv
+
+# .env의 DATABASE_URL / DB_PROFILE이 엔진 생성 전에 반영되도록 먼저 로드
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./db.sqlite3")
+
+# 환경별 PRAGMA 프로필 (값이 None이면 SQLite 기본값 유지)
+STORAGE_PROFILES: Dict[str, Dict[str, Optional[str]]] = {
+    # 서버 운영: 동시 읽기/쓰기를 위한 WAL + fsync 횟수 감소
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",      # WAL에서는 체크포인트 때만 fsync, 전원 장애 시 마지막 커밋만 유실 가능
+        "busy_timeout": "5000",       # 잠금 대기(ms), 'database is locked' 대신 대기 후 재시도
+        "mmap_size": "268435456",     # 256MB 메모리 매핑 읽기
+        "cache_size": "-65536",       # 음수는 KiB 단위 (64MB)
+        "temp_store": "MEMORY",
+    },
+    # 로컬 개발: 운영과 동일하되 캐시만 작게
+    "development": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": "5000",
+        "mmap_size": "67108864",
+        "cache_size": "-16384",
+        "temp_store": "MEMORY",
+    },
+    # 테스트/벤치마크용 임시 DB: 내구성 불필요
+    "test": {
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",
+        "busy_timeout": "5000",
+        "mmap_size": None,
+        "cache_size": None,
+        "temp_store": "MEMORY",
+    },
+    # 기존 동작 (PRAGMA 적용 안 함) - 벤치마크 비교용
+    "legacy": {},
+}
+
+DEFAULT_PROFILE = os.getenv("DB_PROFILE", "production")
+
+
+def get_pragmas(profile: Optional[str] = None) -> Dict[str, str]:
+    """프로필 PRAGMA에 SQLITE_<NAME> 환경 변수 덮어쓰기를 반영한 최종 설정을 반환합니다."""
+    profile = profile or DEFAULT_PROFILE
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"알 수 없는 DB_PROFILE: {profile} (가능: {', '.join(STORAGE_PROFILES)})")
+
+    pragmas = dict(STORAGE_PROFILES[profile])
+    if profile != "legacy":
+        for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size", "temp_store"):
+            override = os.getenv(f"SQLITE_{name.upper()}")
+            if override:
+                pragmas[name] = override
+    return {k: v for k, v in pragmas.items() if v is not None}
+
+
+def apply_pragmas(engine: Engine, pragmas: Dict[str, str]):
+    """새 DBAPI 연결이 만들어질 때마다 PRAGMA를 적용하도록 이벤트를 등록합니다."""
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_configured_engine(url: Optional[str] = None, profile: Optional[str] = None, **kwargs) -> Engine:
+    """DATABASE_URL/DB_PROFILE 설정을 반영한 SQLite 엔진을 생성합니다."""
+    url = url or DATABASE_URL
+    connect_args = kwargs.pop("connect_args", {})
+    connect_args.setdefault("check_same_thread", False)
+
+    engine = create_engine(url, connect_args=connect_args, **kwargs)
+    if engine.dialect.name == "sqlite":
+        apply_pragmas(engine, get_pragmas(profile))
+    return engine
+
+
+def to_async_url(url: str) -> str:
+    """sqlite:/// URL을 aiosqlite 드라이버 URL로 변환합니다."""
+    parsed = make_url(url)
+    if parsed.drivername == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+
+def create_configured_async_engine(url: Optional[str] = None, profile: Optional[str] = None, **kwargs) -> AsyncEngine:
+    """동일한 DB/PRAGMA 설정으로 async 라우트용 엔진(aiosqlite)을 생성합니다."""
+    engine = create_async_engine(to_async_url(url or DATABASE_URL), **kwargs)
+    if engine.dialect.name == "sqlite":
+        # PRAGMA는 내부 sync 엔진의 connect 이벤트에서 적용
+        apply_pragmas(engine.sync_engine, get_pragmas(profile))
+    return engine
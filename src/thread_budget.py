@@ -0,0 +1,123 @@
+'''
+추론/학습 스레드 예산 (torch intra-op, BLAS/OpenMP, scikit-learn n_jobs)
+torch는 encode 한 번에 모든 코어를 쓰고, 랜덤 포레스트는 n_jobs=-1로 predict_proba마다 코어 수만큼 스레드를 띄우므로
+동시 요청 여러 개와 학습 서브프로세스가 겹치면 코어 수보다 훨씬 많은 스레드가 경쟁함 (oversubscription)
+역할별로 스레드 수를 정해 프로세스 시작 시 apply_policy(role)로 한 번 적용
+
+- server: 웹 워커. 요청들이 스레드풀과 워커 프로세스로 이미 병렬 처리되므로 요청 하나는 스레드 1개
+- inference: 추론만 하는 전용 프로세스(배치 예측, 벤치마크). 코어를 워커 수로 나눠 한 호출에 몰아줌
+- trainer: 학습 서브프로세스. 같은 머신의 웹 워커 몫(THREADS_RESERVED)을 뺀 나머지 코어
+THREADS_TORCH / THREADS_BLAS / THREADS_N_JOBS를 지정하면 역할과 관계없이 그 값을 사용
+'''
+import os
+from typing import Dict, Optional
+
+ROLES = ("server", "inference", "trainer")
+BLAS_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+# apply_policy로 적용된 현재 예산 (적용 전에는 None → 라이브러리 기본값)
+_current: Optional[Dict[str, int]] = None
+
+
+def available_cores() -> int:
+    """이 프로세스가 쓸 수 있는 코어 수 (taskset/cgroup cpuset 반영)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def web_workers() -> int:
+    return max(int(os.getenv("WEB_CONCURRENCY", "1")), 1)
+
+def budget(role: str, cores: int = None, workers: int = None, reserved: int = None) -> Dict[str, int]:
+    """역할별 스레드 수 {"torch", "blas", "n_jobs"}"""
+    if role not in ROLES:
+        raise ValueError(f"알 수 없는 역할: {role} (가능: {', '.join(ROLES)})")
+    cores = cores or available_cores()
+    workers = workers or web_workers()
+    reserved = int(os.getenv("THREADS_RESERVED", "0")) if reserved is None else reserved
+
+    if role == "server":
+        threads = 1
+    elif role == "inference":
+        threads = max(cores // workers, 1)
+    else:
+        threads = max(cores - reserved, 1)
+
+    result = {"torch": threads, "blas": threads, "n_jobs": threads}
+    for key in result:
+        override = os.getenv(f"THREADS_{key.upper()}")
+        if override:
+            result[key] = int(override)
+    return result
+
+def apply_policy(role: str, workers: int = None, reserved: int = None, verbose: bool = True) -> Dict[str, int]:
+    """
+    프로세스 전역 스레드 수 설정 (torch.set_num_threads, BLAS/OpenMP 스레드풀, 이후 학습/로드하는 모델의 n_jobs)
+    BLAS 환경 변수는 라이브러리 초기화 전에만 효과가 있으므로 이미 로드된 스레드풀은 threadpoolctl로 제한
+    """
+    global _current
+    result = budget(role, workers=workers, reserved=reserved)
+    for name in BLAS_ENV_VARS:
+        os.environ[name] = str(result["blas"])
+
+    import torch
+    from threadpoolctl import threadpool_limits
+
+    torch.set_num_threads(result["torch"])
+    try:
+        # inter-op 스레드 수는 병렬 작업을 한 번이라도 실행한 뒤에는 바꿀 수 없음
+        torch.set_num_interop_threads(1 if role == "server" else min(result["torch"], 4))
+    except RuntimeError:
+        pass
+    threadpool_limits(limits=result["blas"])
+
+    _current = {"role": role, **result}
+    if verbose:
+        print(f"✅ 스레드 예산({role}): torch {result['torch']}, BLAS {result['blas']}, n_jobs {result['n_jobs']} (코어 {available_cores()}개)")
+    return result
+
+def current() -> Optional[Dict[str, int]]:
+    return _current
+
+def n_jobs(default: int = -1) -> int:
+    """scikit-learn n_jobs로 쓸 값 (정책 적용 전이면 default)"""
+    return _current["n_jobs"] if _current else default
+
+def limit_estimator_jobs(estimator, jobs: int = None) -> int:
+    """
+    학습된 모델 안의 모든 추정기(Pipeline 단계, CalibratedClassifierCV의 보정 모델 등)의 n_jobs를 바꿈
+    model.pkl에는 학습 때의 n_jobs=-1이 저장되어 있어, 그대로 두면 예측마다 모든 코어에 스레드를 띄움
+    바꾼 추정기 수를 반환
+    """
+    jobs = n_jobs() if jobs is None else jobs
+    seen = set()
+    changed = 0
+
+    def visit(obj):
+        nonlocal changed
+        if id(obj) in seen:
+            return
+        seen.add(id(obj))
+        if isinstance(obj, (list, tuple)):
+            for item in obj:
+                visit(item)
+            return
+        # 보정 모델(_CalibratedClassifier)처럼 get_params가 없는 내부 객체도 따라 들어감
+        if not type(obj).__module__.startswith("sklearn") or not hasattr(obj, "__dict__"):
+            return
+        if "n_jobs" in getattr(obj, "__dict__", {}):
+            obj.n_jobs = jobs
+            changed += 1
+        for value in vars(obj).values():
+            visit(value)
+
+    visit(estimator)
+    return changed
+
+
+if __name__ == "__main__":
+    # python -m src.thread_budget: 이 머신에서 역할별 예산 확인
+    print(f"코어 {available_cores()}개, 웹 워커 {web_workers()}개 (WEB_CONCURRENCY)")
+    for role in ROLES:
+        print(f"{role:>10}: {budget(role)}")
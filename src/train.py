@@ -3,6 +3,11 @@
 utils.py의 load_data()를 사용하여 데이터를 불러오고, completed 컬럼의 평균값을 계산
 이 평균값을 pickle 라이브러리를 사용하여 model/model.pkl 파일로 저장하여, 추후 API에서 사용하도록 준비
 '''
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional
+
 import pandas as pd
 import joblib
 import numpy as np
@@ -14,13 +19,22 @@ from sklearn.compose import ColumnTransformer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.calibration import CalibratedClassifierCV
 from sklearn.impute import SimpleImputer
+from sklearn.decomposition import PCA
+from sklearn.random_projection import GaussianRandomProjection
 from src.utils import load_data
 from src.database import init_db, SessionLocal, User, QuestHistory, Quest
-from sqlalchemy import func
+from sqlalchemy import func, select, update
 from sqlalchemy.sql import case
 import torch
+from src import thread_budget
+from src.model import project_embeddings
 
 MODEL_PATH = "model/model.pkl"
+USERS_PER_BATCH = 1000
+# 임베딩(384차원)을 줄일 차원 수(0이면 줄이지 않음)와 방법(pca 또는 random)
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "32"))
+EMBEDDING_PROJECTION = os.getenv("EMBEDDING_PROJECTION", "pca").lower()
+PROJECTIONS = ("pca", "random")
 
 # DB에서 사용자 통계를 계산하고 반환(User table 갱신)
 def get_user_statistics_df(db):
@@ -56,14 +70,17 @@ def get_user_statistics_df(db):
             preferred_categories[user_id] = category
             last_user_id = user_id
 
-    # User 테이블에 계산된 값 업데이트 및 커밋
-    for user_id, total, completed, avg_success in quest_stats:
-        user = db.query(User).filter(User.id == user_id).first()
-        if user:
-            user.total_quests = total
-            user.completed_quests = completed
-            user.average_success_rate = avg_success if avg_success is not None else 0.0
-            user.preferred_category = preferred_categories.get(user_id)
+    # User 테이블에 계산된 값 업데이트 및 커밋 (사용자마다 조회하지 않고 기본키 기준 bulk UPDATE)
+    user_ids = set(db.scalars(select(User.id)))
+    rows = [{
+        'id': user_id,
+        'total_quests': total,
+        'completed_quests': completed,
+        'average_success_rate': avg_success if avg_success is not None else 0.0,
+        'preferred_category': preferred_categories.get(user_id),
+    } for user_id, total, completed, avg_success in quest_stats if user_id in user_ids]
+    for start in range(0, len(rows), USERS_PER_BATCH):
+        db.execute(update(User), rows[start:start + USERS_PER_BATCH])
     
     db.commit() # DB에 변경사항 영구 저장
 
@@ -97,68 +114,123 @@ def get_user_statistics_df(db):
 
     return final_df
 
-def train_model():
+@contextmanager
+def timed(stage: str, timings: Optional[dict]):
+    """블록 실행 시간(초)을 timings[stage]에 기록 (벤치마크의 단계별 분석용)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[stage] = time.perf_counter() - started
+
+def fit_projection(embeddings: np.ndarray, dim: int = EMBEDDING_DIM, method: str = EMBEDDING_PROJECTION):
+    """
+    임베딩(384차원)을 dim차원으로 줄이는 변환을 학습 (dim이 0이거나 원래 차원 이상이면 None = 그대로 사용)
+    정답을 쓰지 않는 변환이라도 평가 데이터가 섞이면 정확도가 부풀려지므로 학습 분할의 임베딩만 넘길 것
+    """
+    width = embeddings.shape[1]
+    if not dim or dim >= width:
+        return None
+    if method not in PROJECTIONS:
+        raise ValueError(f"알 수 없는 EMBEDDING_PROJECTION: {method} (가능: {', '.join(PROJECTIONS)})")
+    if method == "pca":
+        # PCA 차원은 샘플 수를 넘을 수 없음
+        projector = PCA(n_components=min(dim, len(embeddings)), random_state=42)
+    else:
+        projector = GaussianRandomProjection(n_components=dim, random_state=42)
+    return projector.fit(embeddings)
+
+def prepare_training_data(timings: Optional[dict] = None, embedder=None):
+    """학습 데이터프레임(텍스트 컬럼 제외)과 퀘스트 텍스트 임베딩(행 순서 동일), 임베더를 반환 (embedder를 주면 그것으로 임베딩)"""
+    timings = {} if timings is None else timings
     print("--- 1. 데이터 로드 및 임베딩 시작 ---")
-    df = load_data()
+    with timed("load_data", timings):
+        df = load_data()
     if df.empty:
         raise ValueError("데이터셋이 비어 있습니다. seed.py를 먼저 실행하세요.")
     
-    db = SessionLocal()
-    user_stats_df = get_user_statistics_df(db)
-    db.close()
+    with timed("user_stats", timings):
+        db = SessionLocal()
+        user_stats_df = get_user_statistics_df(db)
+        db.close()
 
-    df = pd.merge(df, user_stats_df, on='user_id', how='left')
+    with timed("prepare", timings):
+        df = pd.merge(df, user_stats_df, on='user_id', how='left')
 
-    required = ["difficulty", "completed"]
-    if "name" not in df.columns:
-        if "quest_name" in df.columns:
-            df.rename(columns={"quest_name": "name"}, inplace=True)
-        else:
-            df["name"] = "Unknown"
+        required = ["difficulty", "completed"]
+        if "name" not in df.columns:
+            if "quest_name" in df.columns:
+                df.rename(columns={"quest_name": "name"}, inplace=True)
+            else:
+                df["name"] = "Unknown"
 
-    if "days" not in df.columns:
-        if "duration" in df.columns:
-            df.rename(columns={"duration": "days"}, inplace=True)
-    
-    if 'motivation' not in df.columns:
-        df['motivation'] = ''
+        if "days" not in df.columns:
+            if "duration" in df.columns:
+                df.rename(columns={"duration": "days"}, inplace=True)
+        
+        if 'motivation' not in df.columns:
+            df['motivation'] = ''
 
-    df['total_quests'] = df['total_quests'].fillna(0)
-    df['completed_quests'] = df['completed_quests'].fillna(0)
-    df['streak_days'] = df['streak_days'].fillna(0)
+        df['total_quests'] = df['total_quests'].fillna(0)
+        df['completed_quests'] = df['completed_quests'].fillna(0)
+        df['streak_days'] = df['streak_days'].fillna(0)
 
-    mean_rate = df['average_success_rate'].mean()
-    df['average_success_rate'] = df['average_success_rate'].fillna(mean_rate)
-    df['user_success_rate'] = df['user_success_rate'].fillna(mean_rate)
-    df['preferred_category'] = df['preferred_category'].fillna('none')
+        mean_rate = df['average_success_rate'].mean()
+        df['average_success_rate'] = df['average_success_rate'].fillna(mean_rate)
+        df['user_success_rate'] = df['user_success_rate'].fillna(mean_rate)
+        df['preferred_category'] = df['preferred_category'].fillna('none')
 
-    embedder = SentenceTransformer("sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+    with timed("load_embedder", timings):
+        if embedder is None:
+            embedder = SentenceTransformer("sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
 
     print("임베딩 생성 중 ...")
 
-    text_features = df["name"].astype(str) + " " + df["motivation"].astype(str)
+    with timed("embed", timings):
+        text_features = df["name"].astype(str) + " " + df["motivation"].astype(str)
+        embeddings = embedder.encode(text_features.tolist(), show_progress_bar=True)
+        df = df.drop(columns=["name", "motivation"], errors="ignore").reset_index(drop=True)
+    return df, embeddings, embedder
 
-    embeddings = embedder.encode(text_features.tolist(), show_progress_bar=True)
-    emb_df = pd.DataFrame(embeddings, columns=[f"emb_{i}" for i in range(embeddings.shape[1])])
-    df = pd.concat([df.reset_index(drop=True), emb_df], axis=1)
-    df = df.drop(columns=["name", "motivation"], errors="ignore")
+def fit_success_model(
+    df: pd.DataFrame,
+    embeddings: np.ndarray,
+    embedding_dim: int = EMBEDDING_DIM,
+    projection: str = EMBEDDING_PROJECTION,
+    timings: Optional[dict] = None,
+):
+    """
+    학습/평가 분할 후 학습 분할의 임베딩으로만 차원 축소 변환을 맞추고, 줄인 임베딩을 피처에 붙여 성공 여부 모델을 학습
+    (모델, 변환(없으면 None), 테스트 정확도, X_test, y_test) 반환
+    """
+    timings = {} if timings is None else timings
+    train_idx, test_idx = train_test_split(np.arange(len(df)), test_size=0.25, random_state=42)
+    with timed("fit_projection", timings):
+        projector = fit_projection(embeddings[train_idx], embedding_dim, projection)
 
-    # 퀘스트의 success_rate (seed에서 예측값) 결측치 채우기
-    if "success_rate" not in df.columns:
-        # 컬럼이 없으면 user_success_rate(사용자 평균) 사용
-        df["success_rate"] = df["user_success_rate"] 
-    else:
-        df["success_rate"] = df["success_rate"].fillna(df["success_rate"].mean())
-    
-    cols_to_dummy = [c for c in ["category", "preferred_category"] if c in df.columns]
-    df = pd.get_dummies(df, columns=cols_to_dummy, drop_first=True, prefix_sep='_')
+    with timed("project", timings):
+        embeddings = project_embeddings(projector, embeddings)
+        emb_df = pd.DataFrame(embeddings, columns=[f"emb_{i}" for i in range(embeddings.shape[1])])
+        df = pd.concat([df.reset_index(drop=True), emb_df], axis=1)
+
+    with timed("features", timings):
+        # 퀘스트의 success_rate (seed에서 예측값) 결측치 채우기
+        if "success_rate" not in df.columns:
+            # 컬럼이 없으면 user_success_rate(사용자 평균) 사용
+            df["success_rate"] = df["user_success_rate"] 
+        else:
+            df["success_rate"] = df["success_rate"].fillna(df["success_rate"].mean())
+        
+        cols_to_dummy = [c for c in ["category", "preferred_category"] if c in df.columns]
+        df = pd.get_dummies(df, columns=cols_to_dummy, drop_first=True, prefix_sep='_')
 
-    cols_to_drop = ["completed", "last_completed_at", "user_id"]
+        cols_to_drop = ["completed", "last_completed_at", "user_id"]
 
-    X = df.drop(columns=cols_to_drop, errors='ignore')
-    y = df["completed"]
+        X = df.drop(columns=cols_to_drop, errors='ignore')
+        y = df["completed"]
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.25, random_state=42)
+        X_train, X_test, y_train, y_test = X.iloc[train_idx], X.iloc[test_idx], y.iloc[train_idx], y.iloc[test_idx]
 
     num_cols = [
         "days", "difficulty", "success_rate", "user_success_rate", 
@@ -180,7 +252,7 @@ def train_model():
         n_estimators=500,
         max_depth=18,
         class_weight={0: 1.0, 1: 3.0},
-        n_jobs=-1,
+        n_jobs=thread_budget.n_jobs(),
         random_state=42
     )
 
@@ -190,8 +262,25 @@ def train_model():
     ])
 
     print("--- 2. 모델 학습 중 ---")
-    model.fit(X_train, y_train)
-    score = model.score(X_test, y_test)
+    with timed("fit", timings):
+        model.fit(X_train, y_train)
+    with timed("score", timings):
+        score = model.score(X_test, y_test)
+    return model, projector, score, X_test, y_test
+
+def train_model(
+    model_path: str = MODEL_PATH,
+    timings: Optional[dict] = None,
+    embedding_dim: int = EMBEDDING_DIM,
+    projection: str = EMBEDDING_PROJECTION,
+) -> dict:
+    """모델을 학습해 model_path에 저장하고 단계별 소요 시간(초)을 반환"""
+    timings = {} if timings is None else timings
+    df, embeddings, embedder = prepare_training_data(timings)
+
+    model, projector, score, _, _ = fit_success_model(df, embeddings, embedding_dim, projection, timings)
+    if projector is not None:
+        print(f"임베딩 차원 축소: {embeddings.shape[1]} → {projector.n_components_} ({projection})")
     print(f"✅ 모델 학습 완료. 테스트 정확도: {score:.3f}")
 
     print("--- 3. 모델 저장 중 ---")
@@ -204,10 +293,17 @@ def train_model():
     except Exception as e:
         print(f"경고: 임베더를 CPU로 이동 중 오류 발생: {e}")
 
-    joblib.dump((model, embedder), MODEL_PATH)
-    print(f"✅ 모델 저장 완료: {MODEL_PATH}")
+    with timed("save", timings):
+        # 차원 축소를 쓰면 (모델, 임베더, 변환) 3개, 아니면 예전 형식 그대로 (모델, 임베더)
+        artifact = (model, embedder) if projector is None else (model, embedder, projector)
+        joblib.dump(artifact, model_path)
+    print(f"✅ 모델 저장 완료: {model_path}")
+    print("⏱️ 단계별 소요 시간: " + ", ".join(f"{stage} {sec:.2f}s" for stage, sec in timings.items()))
+    return timings
 
 if __name__ == "__main__":
+    # 서버와 함께 실행될 때는 THREADS_RESERVED로 웹 워커 몫 코어를 남김
+    thread_budget.apply_policy("trainer")
     init_db()
     train_model()
 
@@ -0,0 +1,88 @@
+'''
+퀘스트 목록 페이지(/quests/list) 렌더링 결과를 사용자별로 보관하는 프로세스 내 캐시
+캐시 버전은 DB의 users.view_version으로, 퀘스트 생성/토글/삭제/진행률 변경과 같은 트랜잭션에서 crud.bump_view_version()으로 올림
+- 라우트가 매 요청 PK 조회로 현재 버전을 읽어 get()에 넘기므로, 다른 워커의 변경도 커밋 즉시 반영됨
+- ETag도 같은 버전으로 만들어 어느 워커가 응답해도 같은 값 (If-None-Match가 같으면 목록을 조회하지 않고 304)
+- 렌더링 본문은 워커마다 따로 보관 (invalidate_user()는 이 프로세스의 항목만 비움)
+'''
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Optional
+
+# 항목 유지 시간(초)과 최대 사용자 수 (LRU로 오래된 항목부터 제거)
+CACHE_TTL = float(os.getenv("QUEST_LIST_CACHE_TTL", "300"))
+CACHE_MAX_USERS = int(os.getenv("QUEST_LIST_CACHE_MAX_USERS", "1000"))
+
+_lock = threading.Lock()
+_entries: "OrderedDict[int, dict]" = OrderedDict()  # user_id -> {version, day, etag, body, stored_at}
+
+# ----------------------------
+# ETag
+def make_etag(user_id: int, version: int, day: Optional[date] = None) -> str:
+    """스트릭 문구가 날짜에 따라 바뀌므로 날짜도 ETag에 포함"""
+    day = day or date.today()
+    return f'"{user_id}-{version}-{day.isoformat()}"'
+
+def invalidate_user(user_id: int):
+    """이 프로세스의 렌더링 결과를 비움 (다른 워커는 view_version이 바뀌어 다음 요청에서 버림)"""
+    with _lock:
+        _entries.pop(user_id, None)
+
+# ----------------------------
+# 렌더링 결과 보관
+def get(user_id: int, version: int) -> Optional[dict]:
+    """현재 버전(users.view_version)과 같고, 같은 날짜, TTL 이내인 캐시 항목을 반환합니다."""
+    with _lock:
+        entry = _entries.get(user_id)
+        if entry is None:
+            return None
+        if (
+            entry["version"] != version
+            or entry["day"] != date.today()
+            or time.monotonic() - entry["stored_at"] > CACHE_TTL
+        ):
+            _entries.pop(user_id, None)
+            return None
+        _entries.move_to_end(user_id)
+        return entry
+
+def put(user_id: int, version: int, body: str, **aggregates) -> bool:
+    """
+    렌더링을 시작한 시점의 version으로 저장합니다.
+    렌더링 중 다른 요청이 버전을 올렸다면 다음 get()에서 버전이 달라 버려짐
+    """
+    if CACHE_TTL <= 0:
+        return False
+    with _lock:
+        current = _entries.get(user_id)
+        if current is not None and current["version"] > version:
+            # 더 새 버전으로 렌더링된 항목을 덮어쓰지 않음
+            return False
+        _entries[user_id] = {
+            "version": version,
+            "day": date.today(),
+            "etag": make_etag(user_id, version),
+            "body": body,
+            "stored_at": time.monotonic(),
+            **aggregates,
+        }
+        _entries.move_to_end(user_id)
+        while len(_entries) > CACHE_MAX_USERS:
+            _entries.popitem(last=False)
+        return True
+
+def cache_stream(user_id: int, version: int, chunks, **aggregates):
+    """스트리밍 응답 조각을 그대로 내보내면서 모아 두었다가, 끝까지 전송되면 캐시에 저장"""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    put(user_id, version, "".join(parts), **aggregates)
+
+def clear():
+    """이 프로세스의 렌더링 결과를 모두 비움"""
+    with _lock:
+        _entries.clear()
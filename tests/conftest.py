@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+# src를 import하기 전에 테스트용 DB로 전환 (저장소의 db.sqlite3를 건드리지 않도록)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.sqlite3')}")
+os.environ.setdefault("DB_PROFILE", "test")
+# Gemini 응답 디스크 캐시도 저장소 밖에 쓰도록
+os.environ.setdefault("GEMINI_CACHE_DIR", os.path.join(tempfile.mkdtemp(), "gemini"))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.database import Base
+
+
+@pytest.fixture
+def db():
+    """테스트마다 새로 만드는 메모리 SQLite 세션 (db.sqlite3는 건드리지 않음)"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
@@ -0,0 +1,108 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from src.admission import AdmissionClass, AdmissionMiddleware, Rejected, check_thread_budget
+
+
+def test_waiters_are_admitted_in_order_and_full_queue_is_rejected():
+    async def scenario():
+        gate = AdmissionClass("heavy", limit=1, queue=2, timeout=5)
+        assert await gate.acquire() == 0.0
+        order = []
+
+        async def wait(tag):
+            await gate.acquire()
+            order.append(tag)
+
+        first = asyncio.create_task(wait("first"))
+        second = asyncio.create_task(wait("second"))
+        await asyncio.sleep(0)
+        assert gate.waiting == 2
+
+        with pytest.raises(Rejected) as rejected:
+            await gate.acquire()
+        assert rejected.value.reason == "queue_full" and rejected.value.retry_after >= 1
+
+        gate.release(0.1)
+        await first
+        gate.release(0.1)
+        await second
+        gate.release(0.1)
+        assert order == ["first", "second"]
+        assert gate.in_flight == 0 and gate.waiting == 0
+        assert gate.stats()["admitted"] == 3 and gate.stats()["rejected"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_is_rejected_and_slot_is_not_leaked():
+    async def scenario():
+        gate = AdmissionClass("heavy", limit=1, queue=1, timeout=0.05)
+        await gate.acquire()
+        with pytest.raises(Rejected) as rejected:
+            await gate.acquire()
+        assert rejected.value.reason == "timeout"
+        gate.release()
+        assert gate.in_flight == 0 and gate.waiting == 0
+        assert await gate.acquire() == 0.0
+
+    asyncio.run(scenario())
+
+
+def test_middleware_sheds_heavy_route_but_not_cheap_route():
+    release = asyncio.Event()
+
+    async def heavy(request):
+        await release.wait()
+        return PlainTextResponse("heavy")
+
+    async def cheap(request):
+        return PlainTextResponse("cheap")
+
+    inner = Starlette(routes=[Route("/heavy", heavy), Route("/cheap", cheap, methods=["PATCH"])])
+    gate = AdmissionClass("heavy", limit=1, queue=0)
+    app = AdmissionMiddleware(inner, routes={("GET", "/heavy"): "heavy"}, admission_classes={"heavy": gate})
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            running = asyncio.create_task(client.get("/heavy"))
+            while gate.in_flight == 0:
+                await asyncio.sleep(0.01)
+
+            busy = await client.get("/heavy")
+            assert busy.status_code == 503
+            assert int(busy.headers["retry-after"]) >= 1
+            assert busy.json()["admission"] == "heavy"
+
+            assert (await client.patch("/cheap")).text == "cheap"
+
+            release.set()
+            done = await running
+            assert done.status_code == 200
+            assert 'admission;dur=' in done.headers["server-timing"]
+        assert gate.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_thread_budget_warning(capsys):
+    assert check_thread_budget(40, {"a": AdmissionClass("a", 8, 1), "b": AdmissionClass("b", 8, 1)})
+    assert not check_thread_budget(10, {"a": AdmissionClass("a", 8, 1), "b": AdmissionClass("b", 8, 1)})
+    assert "스레드풀" in capsys.readouterr().out
+
+
+def test_admin_admission_metrics(monkeypatch):
+    from src.main import app
+
+    monkeypatch.setenv("PROFILE_ADMIN_TOKEN", "secret")
+    with TestClient(app, headers={"X-Admin-Token": "secret"}) as client:
+        body = client.get("/admin/admission").json()
+    assert body["enabled"] is True
+    assert set(body["classes"]) == {"recommend", "plot", "create"}
+    assert {"limit", "queue", "in_flight", "waiting", "rejected"} <= set(body["classes"]["plot"])
@@ -1,19 +1,26 @@
 from fastapi.testclient import TestClient
 from src.main import app
+from src.database import Base, engine
 
-client = TestClient(app)
+Base.metadata.create_all(bind=engine)
+client = TestClient(app, follow_redirects=False)
 
-def test_root():
+def test_root_redirects_to_login_without_cookie():
     response = client.get("/")
-    assert response.status_code == 200
-    assert "AI Quest Tracker API 준비 완료!" in response.json()["message"]
+    assert response.status_code == 303
+    assert response.headers["location"] == "/login"
 
-def test_user_completed():
-    response = client.get("/user/completed")
-    assert response.status_code == 200
-    assert "user_completed" in response.json()
+def test_login_creates_user_and_sets_cookie():
+    response = client.post("/login", data={"nickname": "api_tester", "email": "api_tester@example.com"})
+    assert response.status_code == 303
+    assert response.headers["location"] == "/onboarding"
+    assert response.cookies.get("user_id")
+
+    # 같은 이메일로 다시 로그인하면 같은 사용자
+    again = client.post("/login", data={"nickname": "api_tester", "email": "api_tester@example.com"})
+    assert again.cookies.get("user_id") == response.cookies.get("user_id")
 
-def test_quest_completion_rate():
-    response = client.get("/quest/completion_rate")
+def test_users_list():
+    response = client.get("/users/")
     assert response.status_code == 200
-    assert "quest_completion_rate" in response.json()
+    assert any(user["email"] == "api_tester@example.com" for user in response.json())
@@ -0,0 +1,57 @@
+import pytest
+
+from benchmarks.bench_compare import compare, flatten, select_run
+from benchmarks.bench_hotpaths import measure
+
+
+def run(label, commit, streak_cold, streak_warm, fit_ms):
+    return {
+        "label": label,
+        "commit": commit,
+        "results": {"small": {
+            "streak": {"cold_ms": streak_cold, "warm_ms": {"median": streak_warm, "p90": streak_warm, "min": streak_warm}},
+            "train": {"cold_ms": fit_ms + 100, "stages_ms": {"fit": fit_ms, "save": 10.0}},
+            "similar": {"error": "OSError: model not found"},
+        }},
+    }
+
+
+def test_flatten_skips_errors_and_includes_stages():
+    metrics = flatten(run(None, "abc", 50.0, 5.0, 900.0))
+    assert metrics == {
+        ("small", "streak", "cold"): 50.0,
+        ("small", "streak", "warm"): 5.0,
+        ("small", "train", "cold"): 1000.0,
+        ("small", "train", "stage:fit"): 900.0,
+        ("small", "train", "stage:save"): 10.0,
+    }
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    base = run("before", "abc1234", 50.0, 5.0, 900.0)
+    head = run(None, "def5678", 40.0, 5.3, 1200.0)
+    status = {(r["case"], r["metric"]): r["status"] for r in compare(base, head, threshold=0.10, min_ms=1.0)}
+
+    assert status[("streak", "cold")] == "improvement"
+    # 6% 변화는 임계값 안, 차이도 1ms 미만
+    assert status[("streak", "warm")] == "same"
+    assert status[("train", "stage:fit")] == "regression"
+    assert status[("train", "cold")] == "regression"
+    assert status[("train", "stage:save")] == "same"
+
+
+def test_select_run_by_index_label_and_commit():
+    history = [run("before", "abc1234", 1, 1, 1), run(None, "def5678", 1, 1, 1)]
+    assert select_run(history, "-1")["commit"] == "def5678"
+    assert select_run(history, "before")["commit"] == "abc1234"
+    assert select_run(history, "def5")["commit"] == "def5678"
+    with pytest.raises(KeyError):
+        select_run(history, "missing")
+
+
+def test_measure_reports_cold_and_warm():
+    calls = []
+    result = measure(lambda: calls.append(1), repeat=5)
+    assert len(calls) == 6
+    assert result["runs"] == 5 and result["warm_ms"]["min"] <= result["warm_ms"]["median"] <= result["warm_ms"]["p90"]
+    assert "warm_ms" not in measure(lambda: None, repeat=0)
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import event
+from src import crud
+from src.backfill import backfill_daily_activity
+from src.database import User, Quest, QuestHistory, UserDailyActivity
+
+
+def make_quests(db, n, user_id=1):
+    db.add(User(id=user_id, name=f"user{user_id}", email=f"user{user_id}@test.local"))
+    quests = [Quest(user_id=user_id, name=f"q{i}", duration=3, created_at=datetime.now(timezone.utc) - timedelta(days=2)) for i in range(n)]
+    db.add_all(quests)
+    db.commit()
+    return [q.id for q in quests]
+
+
+def rollup(db):
+    return [(r.date, r.completions, r.progress_events)
+            for r in db.query(UserDailyActivity).order_by(UserDailyActivity.date) if r.completions or r.progress_events]
+
+
+def count_statements(db, fn):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        fn()
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    return len(statements)
+
+
+def test_bulk_toggle_round_trip(db):
+    ids = make_quests(db, 5)
+    today = datetime.now(timezone.utc).date()
+
+    crud.bulk_toggle_quests(db, 1, ids[:3])
+    db.commit()
+    user = db.get(User, 1)
+    assert rollup(db) == [(today, 3, 0)]
+    assert (user.streak_days, user.last_active_date) == (1, today)
+    assert (user.total_quests, user.completed_quests) == (5, 3)
+
+    # 완료 2개를 되돌리고 미완료 1개를 완료 → 순 완료 2개
+    crud.bulk_toggle_quests(db, 1, [ids[0], ids[1], ids[3]])
+    db.commit()
+    assert rollup(db) == [(today, 2, 0)]
+    assert user.completed_quests == 2
+
+    crud.bulk_toggle_quests(db, 1, [ids[2], ids[3]])
+    db.commit()
+    assert rollup(db) == []
+    assert (user.streak_days, user.last_active_date, user.completed_quests) == (0, None, 0)
+
+    incremental = rollup(db)
+    backfill_daily_activity(db)
+    assert rollup(db) == incremental
+    assert db.query(QuestHistory).filter(QuestHistory.action == "completed").count() == 4
+
+
+def test_bulk_toggle_query_count_is_constant(db):
+    ids = make_quests(db, 40)
+    crud.bulk_toggle_quests(db, 1, ids[:2])  # 사용자 로드/오늘 첫 완료 처리는 첫 배치에서만 발생
+    few = count_statements(db, lambda: crud.bulk_toggle_quests(db, 1, ids[2:4]))
+    many = count_statements(db, lambda: crud.bulk_toggle_quests(db, 1, ids[4:]))
+    assert many == few
+
+
+def test_bulk_delete_reverts_activity(db):
+    ids = make_quests(db, 4)
+    crud.bulk_toggle_quests(db, 1, ids)
+    crud.bulk_update_progress(db, 1, {ids[0]: 50.0})
+    db.commit()
+
+    with pytest.raises(KeyError):
+        crud.bulk_delete_quests(db, 1, [ids[0], 9999])
+    db.rollback()
+    assert db.query(Quest).count() == 4
+
+    assert crud.bulk_delete_quests(db, 1, ids[:3]) == 3
+    db.commit()
+    today = datetime.now(timezone.utc).date()
+    assert rollup(db) == [(today, 1, 0)]
+    assert db.query(QuestHistory).filter(QuestHistory.quest_id.in_(ids[:3])).count() == 0
+    assert (db.get(User, 1).total_quests, db.get(User, 1).completed_quests) == (1, 1)
+
+
+def test_bulk_progress_logs_only_changes(db):
+    ids = make_quests(db, 3)
+    crud.bulk_update_progress(db, 1, {ids[0]: 33.3, ids[1]: 66.7, ids[2]: 0.0})
+    db.commit()
+    assert [q.progress for q in db.query(Quest).order_by(Quest.id)] == [33.3, 66.7, 0.0]
+    assert db.query(QuestHistory).filter(QuestHistory.action == "progress_update").count() == 2
+    assert rollup(db) == [(datetime.now(timezone.utc).date(), 0, 2)]
+
+
+def test_bulk_progress_small_steps_stay_in_sync_with_history(db):
+    ids = make_quests(db, 1)
+    for progress in (0.4, 0.5, 0.6, 0.7, 0.7):
+        crud.bulk_update_progress(db, 1, {ids[0]: progress})
+        db.commit()
+    history = [h.progress for h in db.query(QuestHistory).filter(QuestHistory.action == "progress_update").order_by(QuestHistory.id)]
+    assert history == [0.4, 0.5, 0.6, 0.7]
+    assert db.get(Quest, ids[0]).progress == history[-1]
+    assert rollup(db) == [(datetime.now(timezone.utc).date(), 0, 4)]
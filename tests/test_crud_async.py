@@ -0,0 +1,39 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from src import crud_async
+from src.database import Base, User, Quest
+from src.storage import create_configured_async_engine
+
+
+def test_async_history_write_updates_rollup_and_streak(tmp_path):
+    async def scenario():
+        engine = create_configured_async_engine(f"sqlite:///{tmp_path / 'async.sqlite3'}", profile="test")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+        now = datetime.now()
+        async with Session() as db:
+            db.add(User(id=1, name="kim", email="kim@test.local"))
+            quest = Quest(user_id=1, name="독서", duration=3, difficulty=2)
+            db.add(quest)
+            await db.flush()
+            for offset in (2, 1, 0):
+                await crud_async.log_quest_history(db, quest, "completed", timestamp=now - timedelta(days=offset))
+                await crud_async.log_quest_history(db, quest, "reopened", timestamp=now - timedelta(days=offset))
+                await crud_async.log_quest_history(db, quest, "completed", timestamp=now - timedelta(days=offset, seconds=-1))
+            await db.commit()
+
+        async with Session() as db:
+            user = await crud_async.get_user(db, 1)
+            days = [d async for d in crud_async.iter_completed_days_desc(db, 1, chunk_size=2)]
+            last = await crud_async.get_latest_history(db, quest.id)
+        await engine.dispose()
+        return user, days, last
+
+    user, days, last = asyncio.run(scenario())
+    today = datetime.now().date()
+    assert days == [today, today - timedelta(days=1), today - timedelta(days=2)]
+    assert (user.streak_days, user.longest_streak) == (3, 3)
+    assert last.action == "completed"
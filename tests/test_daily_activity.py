@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+from src import crud
+from src.backfill import backfill_daily_activity
+from src.database import User, Quest, UserDailyActivity
+
+
+def make_quest(db, user_id=1):
+    if not db.get(User, user_id):
+        db.add(User(id=user_id, name=f"user{user_id}", email=f"user{user_id}@test.local"))
+    quest = Quest(user_id=user_id, name="매일 30분 운동", category="exercise", duration=7, difficulty=3)
+    db.add(quest)
+    db.flush()
+    return quest
+
+
+def rollup(db):
+    rows = db.query(UserDailyActivity).order_by(UserDailyActivity.user_id, UserDailyActivity.date).all()
+    return [(r.user_id, r.date, r.completions, r.progress_events) for r in rows if r.completions or r.progress_events]
+
+
+def test_incremental_rollup_matches_backfill(db):
+    now = datetime.now(timezone.utc)
+    q1, q2 = make_quest(db), make_quest(db)
+    crud.log_quest_history(db, q1, "created", timestamp=now - timedelta(days=3))
+    crud.log_quest_history(db, q1, "progress_update", progress=50.0, timestamp=now - timedelta(days=2))
+    crud.log_quest_history(db, q1, "completed", progress=1.0, timestamp=now - timedelta(days=2))
+    crud.log_quest_history(db, q2, "completed", progress=1.0, timestamp=now - timedelta(days=1))
+    db.commit()
+    crud.log_quest_history(db, q2, "reopened", timestamp=now)
+    db.commit()
+
+    incremental = rollup(db)
+    assert [(d, c) for _, d, c, _ in incremental if c] == [((now - timedelta(days=2)).date(), 1)]
+
+    backfill_daily_activity(db)
+    assert rollup(db) == incremental
+
+
+def test_remove_quest_activity(db):
+    now = datetime.now(timezone.utc)
+    quest = make_quest(db)
+    crud.log_quest_history(db, quest, "progress_update", timestamp=now)
+    crud.log_quest_history(db, quest, "completed", timestamp=now)
+    db.commit()
+
+    crud.remove_quest_activity(db, quest)
+    db.commit()
+    assert rollup(db) == []
+
+
+def test_calculate_streak_days_from_rollup(db):
+    today = datetime.now().date()
+    for offset in (0, 1, 2, 4):
+        crud.record_daily_activity(db, 1, today - timedelta(days=offset), completions=1)
+    db.commit()
+    assert crud.calculate_streak_days(db, 1) == 3
+    assert crud.calculate_streak_days(db, 2) == 0
+
+
+def test_complete_then_reopen_in_one_transaction(db):
+    quest = make_quest(db)
+    crud.log_quest_history(db, quest, "completed", progress=1.0)
+    crud.log_quest_history(db, quest, "reopened")
+    db.commit()
+
+    assert rollup(db) == []
+    user = db.get(User, quest.user_id)
+    assert user.streak_days == 0 and user.last_active_date is None
+    assert crud.calculate_streak_days(db, quest.user_id) == 0
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pytest
+import torch
+from sentence_transformers import SentenceTransformer, models
+from transformers import BertConfig, BertModel, BertTokenizerFast
+
+from src.embedder_quant import quantize_embedder, serving_embedder
+
+
+@pytest.fixture
+def embedder(tmp_path):
+    """네트워크 없이 만드는 작은 BERT 기반 SentenceTransformer"""
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + list("abcdefghijklmnopqrstuvwxyz") + ["매", "일", "운", "동"]
+    (tmp_path / "vocab.txt").write_text("\n".join(vocab))
+    BertTokenizerFast(vocab_file=str(tmp_path / "vocab.txt")).save_pretrained(tmp_path)
+    config = BertConfig(vocab_size=len(vocab), hidden_size=32, num_hidden_layers=2, num_attention_heads=2, intermediate_size=64)
+    BertModel(config).save_pretrained(tmp_path)
+    transformer = models.Transformer(str(tmp_path), max_seq_length=128)
+    return SentenceTransformer(modules=[transformer, models.Pooling(transformer.get_word_embedding_dimension())], device="cpu")
+
+
+def test_quantize_embedder_replaces_linear_layers_and_caps_length(embedder):
+    quantized = quantize_embedder(embedder, max_seq_length=16)
+
+    assert quantized.max_seq_length == 16 and embedder.max_seq_length == 128
+    kinds = {type(m) for m in quantized.modules()}
+    assert torch.nn.Linear not in kinds and torch.ao.nn.quantized.dynamic.Linear in kinds
+
+    a, b = embedder.encode("매일 운동 abc"), quantized.encode("매일 운동 abc")
+    assert float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))) > 0.99
+
+
+def test_serving_embedder_persists_and_reuses_artifact(embedder, tmp_path):
+    source = tmp_path / "model.pkl"
+    source.write_bytes(b"model")
+    path = str(tmp_path / "embedder_int8.pt")
+
+    assert serving_embedder(embedder, str(source), mode="fp32", path=path) is embedder
+    assert not os.path.exists(path)
+
+    first = serving_embedder(embedder, str(source), mode="int8", path=path)
+    assert os.path.exists(path)
+    reused = serving_embedder(embedder, str(source), mode="int8", path=path)
+    assert reused is not first and np.allclose(reused.encode("abc"), first.encode("abc"))
+
+    # 모델이 다시 학습되면(model.pkl이 더 새로우면) 양자화 파일도 다시 만듦
+    stale = os.path.getmtime(source) - 100
+    os.utime(path, (stale, stale))
+    serving_embedder(embedder, str(source), mode="int8", path=path)
+    assert os.path.getmtime(path) > stale
@@ -0,0 +1,67 @@
+import asyncio
+import time
+from src.fanout import gather_with_budget, in_thread
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_stages_run_concurrently_and_slow_stage_degrades():
+    async def fast():
+        return await in_thread(time.sleep, 0.2) or "fast"
+
+    async def slow():
+        await in_thread(time.sleep, 2)
+        return "slow"
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    started = time.perf_counter()
+    results, degraded, elapsed = run(gather_with_budget(
+        {"a": fast, "b": fast, "slow": slow, "broken": broken},
+        budget=5,
+        timeouts={"slow": 0.5},
+        fallbacks={"slow": "placeholder"},
+    ))
+    took = time.perf_counter() - started
+
+    assert results == {"a": "fast", "b": "fast", "slow": "placeholder", "broken": None}
+    assert sorted(degraded) == ["broken", "slow"]
+    # 두 fast 단계는 병렬, slow는 스레드가 끝나기를 기다리지 않고 제한 시간에 끊김
+    assert took < 1.0
+    assert elapsed["slow"] < 1.0
+
+
+def test_total_budget_caps_every_stage():
+    async def sleepy():
+        await asyncio.sleep(1)
+        return "done"
+
+    started = time.perf_counter()
+    results, degraded, _ = run(gather_with_budget(
+        {"x": sleepy, "y": sleepy}, budget=0.3, timeouts={"x": 5, "y": 5}, fallbacks={"x": "-", "y": "-"}
+    ))
+    assert time.perf_counter() - started < 0.8
+    assert results == {"x": "-", "y": "-"} and sorted(degraded) == ["x", "y"]
+
+
+def test_recommend_result_renders_placeholder_prediction(monkeypatch):
+    from fastapi.testclient import TestClient
+    from src import main, model
+    from src.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(model, "predict_success_rate", lambda *args: time.sleep(2) or 0.75)
+    monkeypatch.setitem(main.RECOMMEND_STAGE_TIMEOUTS, "predict", 0.3)
+
+    client = TestClient(main.app, cookies={"user_id": "1"})
+    started = time.perf_counter()
+    res = client.post("/recommend/result", data={"quest_name": "아침 독서", "duration": 5, "difficulty": 2})
+    assert time.perf_counter() - started < 1.5
+    assert res.status_code == 200
+    assert "예측이 지연되어" in res.text and "75.0%" not in res.text
+    # 조언은 페이지 응답 후 SSE로 받아옴
+    assert "/recommend/tip/stream?" in res.text
+    assert "predict;dur=" in res.headers["server-timing"]
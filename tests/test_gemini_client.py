@@ -0,0 +1,41 @@
+import pytest
+from benchmarks.gemini_stub import GeminiStub
+from src import ai_recommend, local_coach
+
+PROFILE = dict(consistency_score=3, risk_aversion_score=2, total_quests=12, completed_quests=7)
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    server = GeminiStub(delay=0.2).start()
+    monkeypatch.setenv("GEMINI_BASE_URL", server.base_url)
+    monkeypatch.setattr(ai_recommend, "GEMINI_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(ai_recommend, "AI_COACH_TIER", "gemini")
+    ai_recommend.reset_gemini_client()
+    try:
+        yield server
+    finally:
+        server.stop()
+        monkeypatch.delenv("GEMINI_BASE_URL")
+        ai_recommend.reset_gemini_client()
+
+
+def test_response_is_cached_in_memory_and_on_disk(stub):
+    first = ai_recommend.generate_ai_recommendation("아침 운동", 7, 3, **PROFILE)
+    assert first.startswith("스텁 코치 조언")
+    # 공백/대소문자만 다른 이름은 같은 키
+    assert ai_recommend.generate_ai_recommendation("  아침   운동 ", 7, 3, **PROFILE) == first
+    assert stub.requests == 1
+
+    # 메모리 캐시를 비워도(재시작) 디스크 캐시에서 읽음
+    ai_recommend.reset_gemini_client()
+    assert ai_recommend.generate_ai_recommendation("아침 운동", 7, 3, **PROFILE) == first
+    assert stub.requests == 1
+
+
+def test_timeout_falls_back_to_local_coach(stub, monkeypatch):
+    stub.delay = 1.5
+    monkeypatch.setattr(ai_recommend, "GEMINI_TIMEOUT", 0.3)
+    monkeypatch.setattr(ai_recommend, "GEMINI_RETRY_ATTEMPTS", 1)
+    result = ai_recommend.generate_ai_recommendation("명상 10분", 3, 1, **PROFILE)
+    assert result == local_coach.local_recommendation("명상 10분", 3, 1, **PROFILE)
@@ -0,0 +1,46 @@
+import itertools
+
+import pytest
+
+from benchmarks.loadtest import DEFAULT_MIX, load_recording, parse_mix, save_recording, summarize, synthesize
+
+
+def test_parse_mix():
+    assert parse_mix(None) == DEFAULT_MIX
+    assert parse_mix("list=40,toggle=20") == {"list": 40.0, "toggle": 20.0}
+    with pytest.raises(ValueError):
+        parse_mix("unknown=1")
+
+
+def test_synthesize_is_deterministic_and_follows_mix(tmp_path):
+    targets = {1: [10, 11], 2: [], 3: [30]}
+    mix = {"toggle": 1, "progress": 1}
+    first = list(itertools.islice(synthesize(mix, targets, seed=7), 200))
+    second = list(itertools.islice(synthesize(mix, targets, seed=7), 200))
+    assert first == second
+
+    for req in first:
+        # 퀘스트가 없는 사용자는 목록 조회로 대체되고, 나머지는 자기 퀘스트만 건드림
+        if req["route"] == "list":
+            assert targets[req["user_id"]] == []
+        else:
+            quest_id = int(req["path"].split("/")[2])
+            assert quest_id in targets[req["user_id"]]
+
+    path = tmp_path / "traffic.jsonl"
+    save_recording(str(path), {"size": "small", "seed": 7}, first)
+    meta, replayed = load_recording(str(path))
+    assert meta == {"size": "small", "seed": 7} and replayed == first
+
+
+def test_summarize_percentiles_and_errors():
+    results = [("list", 200, i / 1000, 0.0, {}) for i in range(1, 101)]
+    results += [("toggle", 500, 0.05, 0.0, {}), ("toggle", "ReadTimeout", 30.0, 0.0, {}), ("login", 303, 0.01, 0.0, {})]
+    report = summarize(results, elapsed=10.0)
+
+    assert report["list"]["count"] == 100 and report["list"]["error_rate"] == 0
+    assert report["list"]["p50_ms"] == pytest.approx(50.5)
+    assert report["list"]["max_ms"] == pytest.approx(100)
+    assert report["toggle"]["error_rate"] == 1.0
+    assert report["login"]["error_rate"] == 0
+    assert report["전체"]["count"] == 103 and report["전체"]["rps"] == pytest.approx(10.3)
@@ -0,0 +1,63 @@
+from src import local_coach
+from src.database import User, Quest
+
+PROFILE = dict(consistency_score=3, risk_aversion_score=3, total_quests=20, completed_quests=10)
+
+
+def test_advice_follows_profile_rules():
+    low = local_coach.local_recommendation("아침 운동", 9, 3, **{**PROFILE, "completed_quests": 4})
+    assert "절반 분량" in low and "처음 3일" in low
+    high = local_coach.local_recommendation("아침 운동", 9, 3, **{**PROFILE, "completed_quests": 18})
+    assert "한 단계 올려" in high
+    routine = local_coach.local_recommendation("아침 운동", 9, 3, **{**PROFILE, "consistency_score": 1})
+    assert "알림" in routine
+    first = local_coach.local_recommendation("아침 운동", 9, 3, 3, 3, 0, 0)
+    assert "첫 퀘스트" in first
+
+
+def test_nearest_quests_suggests_similar_names():
+    local_coach.set_index([
+        ("저녁 독서 30분", "reading", 0.7),
+        ("아침 독서 30분", "reading", 0.6),
+        ("헬스장 가기", "exercise", 0.5),
+        ("영어 단어 외우기", "study", 0.4),
+    ])
+    try:
+        names = [name for name, _, _, _ in local_coach.nearest_quests("아침 독서 30분", "reading")]
+        assert names[0] == "저녁 독서 30분" and "아침 독서 30분" not in names
+        advice = local_coach.local_recommendation("독서 30분", 5, 2, **PROFILE, category="reading")
+        assert "'아침 독서 30분'" in advice or "'저녁 독서 30분'" in advice
+        # 비슷한 이름이 없으면 카테고리 기본 추천
+        assert local_coach.suggest_quests("요가", "exercise", None) == local_coach.CATEGORY_SUGGESTIONS["exercise"]
+    finally:
+        local_coach.set_index([])
+
+
+def test_index_only_includes_names_shared_by_several_users(db):
+    db.add_all([User(id=1, name="u1", email="u1@test.local"), User(id=2, name="u2", email="u2@test.local")])
+    db.add_all([
+        Quest(user_id=1, name="물 2L 마시기", category="health", success_rate=0.8),
+        Quest(user_id=2, name="물 2L 마시기", category="health", success_rate=0.6),
+        Quest(user_id=1, name="개인적인 목표", category="hobby", success_rate=0.5),
+    ])
+    db.commit()
+    rows = db.execute(local_coach.index_candidates_query()).all()
+    assert [(name, round(rate, 2)) for name, _, rate in rows] == [("물 2L 마시기", 0.7)]
+
+
+def test_nearest_quests_only_sorts_top_candidates(monkeypatch):
+    # 지연은 benchmarks.bench_hotpaths의 local_coach 케이스로 측정, 여기서는 인덱스 크기와 무관하게 상위 후보만 정렬하는지 확인
+    local_coach.set_index([(f"퀘스트 {i} 독서", "reading", 0.5) for i in range(2000)])
+    calls = []
+    argpartition = local_coach.np.argpartition
+
+    def recording_argpartition(a, kth, *args, **kwargs):
+        calls.append(kth)
+        return argpartition(a, kth, *args, **kwargs)
+
+    monkeypatch.setattr(local_coach.np, "argpartition", recording_argpartition)
+    try:
+        assert len(local_coach.nearest_quests("독서 20쪽", "reading", top_n=2)) == 2
+        assert calls and all(kth < 2 * 4 for kth in calls)
+    finally:
+        local_coach.set_index([])
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from src import crud
+from src.database import Base, User, Quest, QuestHistory
+
+BASE_TIME = datetime(2025, 1, 1, 9, 0, 0)
+
+
+def seed_quests(db, n=23):
+    db.add(User(id=1, name="user1", email="user1@test.local"))
+    for i in range(n):
+        # created_at이 같은 퀘스트가 섞이도록 3개씩 같은 시각
+        db.add(Quest(user_id=1, name=f"q{i}", completed=bool(i % 2), created_at=BASE_TIME + timedelta(minutes=i // 3)))
+    db.commit()
+
+
+def walk(fetch, limit):
+    seen, cursor = [], None
+    while True:
+        items, cursor = fetch(cursor, limit)
+        seen.extend(items)
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("limit", [1, 4, 50])
+def test_quest_pages_cover_all_rows_in_order(db, limit):
+    seed_quests(db)
+    expected = db.query(Quest).order_by(Quest.created_at.desc(), Quest.id.desc()).all()
+
+    seen = walk(lambda cursor, limit: crud.get_quests_page(db, 1, cursor=cursor, limit=limit), limit)
+    assert [q.id for q in seen] == [q.id for q in expected]
+
+    active = walk(lambda cursor, limit: crud.get_quests_page(db, 1, completed=False, cursor=cursor, limit=limit), limit)
+    assert [q.id for q in active] == [q.id for q in expected if not q.completed]
+
+
+def test_history_pages_cover_all_rows(db):
+    seed_quests(db, n=1)
+    quest = db.query(Quest).first()
+    for i in range(7):
+        db.add(QuestHistory(quest_id=quest.id, user_id=1, action="progress_update", progress=float(i), timestamp=BASE_TIME + timedelta(hours=i // 2)))
+    db.commit()
+
+    seen = walk(lambda cursor, limit: crud.get_quest_history_page(db, quest.id, cursor=cursor, limit=limit), 3)
+    assert [h.progress for h in seen] == [6.0, 5.0, 4.0, 3.0, 2.0, 1.0, 0.0]
+
+
+def test_invalid_cursor_raises_value_error(db):
+    seed_quests(db, n=2)
+    for cursor in ["not-a-cursor", crud.encode_cursor("yesterday", 1), crud.encode_cursor(1, 2, 3)]:
+        with pytest.raises(ValueError):
+            crud.get_quests_page(db, 1, cursor=cursor)
+
+
+def test_deep_page_uses_index_order():
+    """깊은 페이지도 인덱스 범위 탐색으로 시작하고 정렬용 임시 B-tree가 없어야 함"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        cursor = crud.encode_cursor(BASE_TIME, 100)
+        for completed in (None, False):
+            query = db.query(Quest).filter(Quest.user_id == 1)
+            if completed is not None:
+                query = query.filter(Quest.completed == completed)
+            query = query.filter(
+                (Quest.created_at < BASE_TIME) | ((Quest.created_at == BASE_TIME) & (Quest.id < 100))
+            ).order_by(Quest.created_at.desc(), Quest.id.desc()).limit(51)
+            sql = str(query.statement.compile(engine, compile_kwargs={"literal_binds": True}))
+            plan = [row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+            assert any("USING INDEX" in step or "USING COVERING INDEX" in step for step in plan), plan
+            assert not any("TEMP B-TREE" in step for step in plan), plan
+        assert crud.decode_cursor(cursor)[1] == 100
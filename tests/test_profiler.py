@@ -0,0 +1,82 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src import profiler
+from src.query_counter import QueryCountMiddleware
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+
+def make_app(tmp_path, sample_rate=0.0):
+    app = FastAPI()
+
+    @app.get("/slow/{n}")
+    def slow_endpoint(n: int):
+        busy_wait(0.05 * n)
+        return {"n": n}
+
+    app.add_middleware(QueryCountMiddleware)
+    app.add_middleware(profiler.ProfilingMiddleware, sample_rate=sample_rate, directory=str(tmp_path))
+    return app
+
+
+def test_header_triggers_profile_with_route_metadata(tmp_path):
+    client = TestClient(make_app(tmp_path))
+    assert client.get("/slow/1").status_code == 200
+    assert profiler.list_profiles(directory=str(tmp_path)) == []
+
+    client.get("/slow/4", headers={"X-Profile": "1"})
+    client.get("/slow/1", headers={"X-Profile": "1"})
+    profiles = profiler.list_profiles(directory=str(tmp_path))
+
+    assert [p["path"] for p in profiles] == ["/slow/4", "/slow/1"]
+    slowest = profiles[0]
+    assert slowest["route"] == "/slow/{n}" and slowest["status"] == 200
+    assert slowest["queries"] == 0 and slowest["samples"] > 0
+    assert any("slow_endpoint" in stack for stack in slowest["top_stacks"])
+
+    folded = profiler.read_profile(slowest["id"], directory=str(tmp_path))
+    stack, count = folded.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+    assert (tmp_path / "GET_slow_n").is_dir()
+
+
+def test_sample_rate_and_pruning(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILE_KEEP", 3)
+    client = TestClient(make_app(tmp_path, sample_rate=1.0))
+    for _ in range(5):
+        client.get("/slow/0")
+    assert len(profiler.list_profiles(directory=str(tmp_path))) == 3
+
+
+def test_parse_server_timing():
+    metrics = profiler.parse_server_timing(['predict;dur=12.5, similar;dur=3', 'db;dur=0.4;desc="7 queries"'])
+    assert metrics == {"predict": {"dur": 12.5}, "similar": {"dur": 3.0}, "db": {"dur": 0.4, "desc": "7 queries"}}
+    assert profiler.query_count(metrics["db"]["desc"]) == 7
+
+
+def test_admin_endpoints(tmp_path, monkeypatch):
+    from src import main
+
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path))
+    TestClient(make_app(tmp_path)).get("/slow/1", headers={"X-Profile": "1"})
+
+    # 토큰이 없으면 관리자 기능은 항상 거부
+    monkeypatch.delenv("PROFILE_ADMIN_TOKEN", raising=False)
+    assert TestClient(main.app).get("/admin/profiles").status_code == 403
+
+    monkeypatch.setenv("PROFILE_ADMIN_TOKEN", "secret")
+    client = TestClient(main.app, headers={"X-Admin-Token": "secret"})
+    listing = client.get("/admin/profiles").json()["profiles"]
+    assert len(listing) == 1
+    detail = client.get(listing[0]["profile_url"])
+    assert detail.status_code == 200 and "slow_endpoint" in detail.text
+    assert client.get("/admin/profiles/0000-abc").status_code == 404
+
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 403
@@ -0,0 +1,63 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from src import model
+from src.model import project_embeddings
+from src.train import fit_projection, fit_success_model
+
+
+@pytest.fixture
+def embeddings():
+    return np.random.default_rng(0).normal(size=(50, 384)).astype(np.float32)
+
+
+def test_fit_projection_skips_when_not_reducing(embeddings):
+    assert fit_projection(embeddings, 0, "pca") is None
+    assert fit_projection(embeddings, 384, "pca") is None
+    assert project_embeddings(None, embeddings) is embeddings
+    with pytest.raises(ValueError):
+        fit_projection(embeddings, 16, "umap")
+
+
+@pytest.mark.parametrize("method", ["pca", "random"])
+def test_projection_shapes(embeddings, method):
+    projector = fit_projection(embeddings, 16, method)
+    reduced = project_embeddings(projector, embeddings[:1])
+    assert reduced.shape == (1, 16) and reduced.dtype == np.float32
+    # PCA 차원은 샘플 수로 제한
+    if method == "pca":
+        assert fit_projection(embeddings, 64, method).n_components_ == 50
+
+
+def test_projection_is_fitted_on_training_split_only(embeddings):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        "days": rng.integers(1, 30, 50), "difficulty": rng.integers(1, 6, 50), "user_success_rate": rng.random(50),
+        "category": rng.choice(["study", "health"], 50), "completed": np.arange(50) % 2,
+    })
+    _, projector, _, X_test, _ = fit_success_model(df, embeddings, 8, "pca")
+
+    assert projector.n_samples_ == 50 - len(X_test)
+    assert [c for c in X_test.columns if c.startswith("emb_")] == [f"emb_{i}" for i in range(8)]
+
+
+def test_load_ml_model_accepts_projector(embeddings, tmp_path, monkeypatch):
+    projector = fit_projection(embeddings, 8, "pca")
+    clf = LogisticRegression().fit(project_embeddings(projector, embeddings), np.arange(50) % 2)
+    path = tmp_path / "model.pkl"
+    monkeypatch.setattr(model, "MODEL_PATH", str(path))
+    for name in ("ML_MODEL", "EMBEDDER", "PROJECTOR"):
+        monkeypatch.setattr(model, name, None)
+
+    joblib.dump((clf, None, projector), path)
+    model.load_ml_model()
+    assert model.ML_MODEL is not None and model.PROJECTOR is not None
+    assert model.PROJECTOR.n_components_ == 8
+
+    # 차원 축소 없이 저장한 (모델, 임베더) 파일도 그대로 로드
+    joblib.dump((clf, None), path)
+    model.load_ml_model()
+    assert model.PROJECTOR is None
@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from src.database import Base, SessionLocal, User, Quest, engine
+from src.query_counter import QueryStats, assert_max_queries, report, track_queries
+
+
+def add_user_with_quests(db, user_id, n):
+    db.add(User(id=user_id, name=f"qc{user_id}", email=f"qc{user_id}@test.local"))
+    db.add_all(Quest(user_id=user_id, name=f"q{i}", category="study", completed=bool(i % 2)) for i in range(n))
+    db.commit()
+
+
+def test_assert_max_queries_reports_repeated_statements(db):
+    add_user_with_quests(db, 1, 3)
+    with assert_max_queries(1) as stats:
+        db.execute(select(Quest)).all()
+    assert stats.count == 1
+
+    with pytest.raises(AssertionError, match="쿼리 6개 실행"):
+        with assert_max_queries(5):
+            for quest_id in range(1, 7):
+                db.execute(select(Quest).where(Quest.id == quest_id)).first()
+
+
+def test_nested_scopes_add_up_and_n_plus_one_is_reported(db, capsys):
+    add_user_with_quests(db, 1, 1)
+    with track_queries() as outer:
+        with track_queries() as inner:
+            for _ in range(5):
+                db.execute(select(User).where(User.id == 1)).first()
+        db.execute(select(Quest)).all()
+    assert inner.count == 5 and outer.count == 6
+    assert len(outer.repeated(threshold=5)) == 1
+
+    report("GET", "/x", outer, budget=20)
+    assert "N+1" in capsys.readouterr().out
+    report("GET", "/y", QueryStats(), budget=20)
+    assert capsys.readouterr().out == ""
+
+
+def test_user_statistics_query_count_does_not_grow_with_users(db):
+    from src.train import get_user_statistics_df
+
+    for user_id in range(1, 31):
+        add_user_with_quests(db, user_id, 2)
+    with assert_max_queries(6):
+        df = get_user_statistics_df(db)
+    assert len(df) == 30 and df["total_quests"].tolist() == [2] * 30
+    assert db.get(User, 7).completed_quests == 1
+
+
+@pytest.mark.parametrize("path", ["/quests/list", "/api/quests?limit=50"])
+def test_quest_list_routes_have_constant_query_count(path):
+    from src.main import app
+
+    Base.metadata.create_all(bind=engine)
+    counts = []
+    for user_id, n in ((9001, 2), (9002, 40)):
+        with SessionLocal() as db:
+            if not db.get(User, user_id):
+                add_user_with_quests(db, user_id, n)
+        client = TestClient(app, cookies={"user_id": str(user_id)})
+        with track_queries() as stats:
+            response = client.get(path)
+        assert response.status_code == 200
+        assert 'db;dur=' in response.headers["Server-Timing"]
+        counts.append(stats.count)
+    assert counts[0] == counts[1] and counts[1] <= 8
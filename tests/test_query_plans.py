@@ -0,0 +1,90 @@
+"""핫 쿼리가 풀 스캔으로 떨어지지 않는지 EXPLAIN QUERY PLAN으로 확인"""
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import create_engine, func, inspect
+from sqlalchemy.orm import Session
+from src.database import Base, User, Quest, QuestHistory, UserDailyActivity
+from src.migrations import HOT_QUERY_INDEXES, run_migrations
+
+TODAY = date(2025, 1, 31)
+
+HOT_QUERIES = {
+    "last_log_by_quest": lambda db: db.query(QuestHistory)
+        .filter(QuestHistory.quest_id == 1)
+        .order_by(QuestHistory.timestamp.desc()).limit(1),
+    "last_completion_state_by_quest": lambda db: db.query(QuestHistory.action, QuestHistory.timestamp)
+        .filter(QuestHistory.quest_id == 1, QuestHistory.action.in_(["completed", "reopened"]))
+        .order_by(QuestHistory.timestamp.desc()).limit(1),
+    "completions_by_user": lambda db: db.query(QuestHistory.timestamp)
+        .filter(QuestHistory.user_id == 1, QuestHistory.action == "completed")
+        .order_by(QuestHistory.timestamp.asc()),
+    "quests_by_user_completed": lambda db: db.query(Quest)
+        .filter(Quest.user_id == 1, Quest.completed == False),
+    "quests_by_user": lambda db: db.query(Quest).filter(Quest.user_id == 1),
+    "focus_area_by_category": lambda db: db.query(Quest.category, func.count(Quest.id))
+        .filter(Quest.user_id == 1).group_by(Quest.category),
+    "calendar_month_range": lambda db: db.query(UserDailyActivity)
+        .filter(UserDailyActivity.user_id == 1,
+                UserDailyActivity.date >= TODAY.replace(day=1),
+                UserDailyActivity.date <= TODAY,
+                UserDailyActivity.completions > 0),
+    "streak_days_desc": lambda db: db.query(UserDailyActivity.date)
+        .filter(UserDailyActivity.user_id == 1, UserDailyActivity.completions > 0)
+        .order_by(UserDailyActivity.date.desc()).limit(120),
+    "user_by_email": lambda db: db.query(User).filter(User.email == "a@b.c"),
+}
+
+
+def query_plan(db, query):
+    sql = str(query.statement.compile(db.bind, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def full_scans(plan):
+    return [step for step in plan if step.startswith("SCAN") and "INDEX" not in step]
+
+
+def legacy_engine():
+    """인덱스가 추가되기 전 스키마를 흉내낸 DB (create_all 후 복합 인덱스 제거)"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for name, _, _ in HOT_QUERY_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX {name}")
+    return engine
+
+
+def seed(db):
+    db.add_all([User(id=u, name=f"user{u}", email=f"user{u}@test.local") for u in range(1, 21)])
+    for u in range(1, 21):
+        for i in range(20):
+            quest = Quest(user_id=u, name=f"q{i}", category=f"c{i % 4}", completed=bool(i % 2))
+            db.add(quest)
+            db.flush()
+            db.add(QuestHistory(quest_id=quest.id, user_id=u, action="completed"))
+        for d in range(30):
+            db.add(UserDailyActivity(user_id=u, date=TODAY - timedelta(days=d), completions=1, progress_events=0))
+    db.commit()
+
+
+def test_migrations_add_hot_query_indexes():
+    engine = legacy_engine()
+    assert run_migrations(engine)[:2] == ["0001_daily_activity_and_streak", "0002_hot_query_indexes"]
+    assert run_migrations(engine) == []
+
+    inspector = inspect(engine)
+    for name, table, columns in HOT_QUERY_INDEXES:
+        indexes = {ix["name"]: ix["column_names"] for ix in inspector.get_indexes(table)}
+        assert indexes.get(name) == columns
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(name):
+    engine = legacy_engine()
+    with Session(engine) as db:
+        seed(db)
+    run_migrations(engine)
+
+    with Session(engine) as db:
+        plan = query_plan(db, HOT_QUERIES[name](db))
+        assert not full_scans(plan), f"{name} falls back to a full scan: {plan}"
@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from src import crud, model
+from src.database import Base, SessionLocal, engine, User, Quest, QuestHistory
+from src.main import app
+
+
+def test_create_quest_commits_once(db):
+    db.add(User(id=1, name="user1", email="user1@test.local"))
+    db.commit()
+
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(1))
+    quest = crud.create_quest(db, {"user_id": 1, "name": "스트레칭 10분", "success_rate": 0.6})
+    assert len(commits) == 1
+    history = db.query(QuestHistory).filter(QuestHistory.quest_id == quest.id).all()
+    assert [h.action for h in history] == ["created"]
+
+
+def test_deferred_prediction_fills_rate_after_response(monkeypatch):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(name="defer-user", email="defer-user@test.local", average_success_rate=0.35)
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    calls = []
+    def fake_predict(*args, **kwargs):
+        calls.append(args)
+        return 0.81
+    monkeypatch.setattr(model, "predict_success_rate", fake_predict)
+
+    client = TestClient(app)
+    body = {"user_id": user_id, "name": "주 3회 러닝", "category": "exercise", "duration": 7, "difficulty": 3}
+    res = client.post("/quests/", params={"defer_prediction": True}, json=body)
+    assert res.status_code == 200
+    data = res.json()
+    assert data["prediction_pending"] is True
+    assert data["success_rate"] == 0.35
+
+    # TestClient는 응답 후 백그라운드 작업까지 실행함
+    assert len(calls) == 1
+    db = SessionLocal()
+    try:
+        assert db.get(Quest, data["id"]).success_rate == 0.81
+    finally:
+        db.close()
+
+    res = client.post("/quests/", json=body)
+    assert res.json()["success_rate"] == 0.81 and res.json()["prediction_pending"] is False
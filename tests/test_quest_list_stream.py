@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+from src import crud
+from src.database import User, Quest
+from src.main import templates
+
+
+class RecordingQuests:
+    """템플릿이 언제 퀘스트를 읽기 시작하는지 기록하는 KeysetStream 대용"""
+    def __init__(self, quests, next_cursor=None):
+        self.quests, self.next_cursor, self.started = quests, next_cursor, False
+
+    def __iter__(self):
+        self.started = True
+        return iter(self.quests)
+
+
+def page_context(active, completed):
+    return {
+        "request": None,
+        "user": SimpleNamespace(id=1, name="tester"),
+        "total": 1, "completed": 0, "completion_rate": 0.0, "streak": 0,
+        "ai_message": "",
+        "active_quests": active, "completed_quests": completed,
+    }
+
+
+def test_page_streams_before_reading_quests():
+    quest = SimpleNamespace(id=7, name="<script>x</script>", category="study", duration=3, difficulty=2,
+                            motivation=None, completed=False, ai_recommended=False, success_rate=0.42,
+                            progress=33.33, created_at=None, completed_at=None)
+    active = RecordingQuests([quest], next_cursor="abc")
+    chunks = templates.get_template("quests_list.html").generate(page_context(active, RecordingQuests([])))
+
+    # 헤더는 퀘스트 커서를 열기 전에 전송됨
+    first = next(chunks)
+    assert "<!DOCTYPE html>" in first
+    assert not active.started
+
+    html = first + "".join(chunks)
+    assert active.started
+    assert "&lt;script&gt;x&lt;/script&gt;" in html and "<script>x</script>" not in html
+    assert 'data-progress="33.3"' in html and "성공률: 42.0%" in html
+    assert 'data-cursor="abc"' in html
+    assert "완료된 퀘스트가 없습니다." in html
+
+
+def test_keyset_stream_matches_page(db):
+    db.add(User(id=1, name="user1", email="user1@test.local"))
+    db.add_all([Quest(user_id=1, name=f"q{i}", completed=False) for i in range(7)])
+    db.commit()
+
+    items, next_cursor = crud.get_quests_page(db, 1, completed=False, limit=3)
+    stream = crud.stream_quests_page(db, 1, completed=False, limit=3)
+    assert [q.id for q in stream] == [q.id for q in items]
+    assert stream.next_cursor == next_cursor
+
+    last = crud.stream_quests_page(db, 1, completed=False, cursor=next_cursor, limit=10)
+    assert len(list(last)) == 4 and last.next_cursor is None
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from src import crud, view_cache
+from src.backfill import backfill_quest_progress
+from src.database import Base, SessionLocal, engine, User, Quest
+from src.main import app
+
+
+def test_progress_follows_latest_history(db):
+    now = datetime.now(timezone.utc)
+    db.add(User(id=1, name="user1", email="user1@test.local"))
+    quest = Quest(user_id=1, name="독서 20쪽", category="reading", duration=5, difficulty=2)
+    db.add(quest)
+    db.flush()
+
+    crud.log_quest_history(db, quest, "created", timestamp=now - timedelta(days=1))
+    crud.log_quest_history(db, quest, "progress_update", progress=40.0, timestamp=now)
+    db.commit()
+    assert quest.progress == 40.0
+
+    quest.progress = 0.0
+    db.commit()
+    backfill_quest_progress(db)
+    db.refresh(quest)
+    assert quest.progress == 40.0
+
+
+def count_list_queries(client):
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # 라우트를 거치지 않고 DB를 직접 바꾸므로 렌더링 캐시를 비우고 측정
+    view_cache.clear()
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        assert client.get("/quests/list").status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+    return len(statements)
+
+
+def test_quests_list_query_count_is_constant():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(name="list-user", email="list-user@test.local")
+        db.add(user)
+        db.commit()
+
+        def add_quests(n):
+            for i in range(n):
+                quest = Quest(user_id=user.id, name=f"퀘스트 {i}", category="study", duration=3, difficulty=2)
+                db.add(quest)
+                db.flush()
+                crud.log_quest_history(db, quest, "progress_update", progress=float(i))
+            db.commit()
+
+        client = TestClient(app, cookies={"user_id": str(user.id)})
+        add_quests(2)
+        few = count_list_queries(client)
+        add_quests(30)
+        many = count_list_queries(client)
+        assert many == few
+    finally:
+        db.close()
+
+
+def test_progress_route_small_steps_stay_in_sync_with_history():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(name="step-user", email="step-user@test.local")
+        db.add(user)
+        db.flush()
+        quest = Quest(user_id=user.id, name="스트레칭", category="health", duration=3, difficulty=1)
+        db.add(quest)
+        db.commit()
+
+        client = TestClient(app, cookies={"user_id": str(user.id)})
+        for progress in (0.2, 0.3, 0.34, 0.4, 0.5):
+            assert client.patch(f"/quests/{quest.id}/progress", json={"progress": progress}).status_code == 200
+
+        db.expire_all()
+        history = [h.progress for h in sorted(db.get(Quest, quest.id).history, key=lambda h: h.id)]
+        assert history == [0.2, 0.3, 0.4, 0.5]
+        assert db.get(Quest, quest.id).progress == 0.5
+    finally:
+        db.close()
@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+from sqlalchemy import create_engine, text
+from src import seed
+
+ANCHOR = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def seeded(tmp_path, name, **kwargs):
+    engine = create_engine(f"sqlite:///{tmp_path / name}")
+    seed.run_seed(anchor=ANCHOR, bind=engine, **kwargs)
+    return engine
+
+
+def dump(engine, sql):
+    with engine.connect() as conn:
+        return conn.execute(text(sql)).all()
+
+
+def test_same_seed_gives_same_data_regardless_of_workers(tmp_path):
+    options = dict(num_users=30, quests_per_user=6, quest_dist="poisson", events_per_quest=1.5, users_per_chunk=7, seed=7)
+    serial = seeded(tmp_path, "serial.sqlite3", workers=1, **options)
+    parallel = seeded(tmp_path, "parallel.sqlite3", workers=2, **options)
+    for sql in ("SELECT * FROM users", "SELECT * FROM quests", "SELECT * FROM quest_history", "SELECT * FROM user_daily_activity"):
+        assert dump(serial, sql) == dump(parallel, sql)
+
+    other = seeded(tmp_path, "other.sqlite3", workers=1, **{**options, "seed": 8})
+    assert dump(other, "SELECT * FROM quests") != dump(serial, "SELECT * FROM quests")
+
+
+def test_seeded_rows_are_consistent(tmp_path):
+    engine = seeded(tmp_path, "db.sqlite3", num_users=12, quests_per_user=5, events_per_quest=2, users_per_chunk=5)
+    assert dump(engine, "SELECT COUNT(*) FROM users") == [(12,)]
+    # 사용자 카운터와 실제 퀘스트 수 일치
+    assert dump(engine, """
+        SELECT COUNT(*) FROM users u
+        WHERE u.total_quests != (SELECT COUNT(*) FROM quests q WHERE q.user_id = u.id)
+           OR u.completed_quests != (SELECT COUNT(*) FROM quests q WHERE q.user_id = u.id AND q.completed)
+    """) == [(0,)]
+    # 완료 퀘스트마다 완료 로그 하나, 진행률은 마지막 히스토리 값
+    assert dump(engine, "SELECT COUNT(*) FROM quest_history WHERE action = 'completed'") == \
+        dump(engine, "SELECT COUNT(*) FROM quests WHERE completed")
+    assert dump(engine, "SELECT COUNT(*) FROM quests WHERE completed AND progress != 1.0") == [(0,)]
+    assert dump(engine, "SELECT MAX(timestamp) <= '2026-03-01 00:00:00.000000' FROM quest_history") == [(1,)]
+
+    # 기존 데이터 뒤에 이어서 추가
+    seed.run_seed(num_users=3, quests_per_user=2, anchor=ANCHOR, bind=engine)
+    assert dump(engine, "SELECT MIN(id), MAX(id) FROM users") == [(1, 15)]
+
+
+def test_quest_count_distributions():
+    import numpy as np
+    rng = np.random.default_rng(0)
+    for dist in seed.QUEST_COUNT_DISTS:
+        counts = seed.draw_quest_counts(rng, 20000, 30, dist)
+        assert abs(counts.mean() - 30) < 1.5
+    assert seed.parse_category_weights("reading=3,study=1")["reading"] == 0.75
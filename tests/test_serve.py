@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from src.serve import Master, memory_usage, parse_smaps_rollup, print_memory_report
+
+SMAPS = """55d0c0000000-7ffd00000000 ---p 00000000 00:00 0                          [rollup]
+Rss:              204800 kB
+Pss:               61440 kB
+Shared_Clean:     150000 kB
+Shared_Dirty:       4800 kB
+Private_Clean:     10000 kB
+Private_Dirty:     40000 kB
+Swap:                  0 kB
+"""
+
+
+def test_parse_smaps_rollup():
+    fields = parse_smaps_rollup(SMAPS)
+    assert fields["Rss"] == 204800 and fields["Pss"] == 61440 and fields["Private_Dirty"] == 40000
+    assert "55d0c0000000-7ffd00000000 ---p 00000000 00" not in fields
+
+
+def test_report_totals_show_shared_savings(capsys):
+    rows = [
+        {"pid": 1, "role": "master", "rss": 200 * 1024, "pss": 80 * 1024, "uss": 20 * 1024, "shared": 180 * 1024},
+        {"pid": 2, "role": "worker-0", "rss": 210 * 1024, "pss": 90 * 1024, "uss": 30 * 1024, "shared": 180 * 1024},
+    ]
+    total = print_memory_report(rows)
+    assert total["rss"] == 410 * 1024 and total["pss"] == 170 * 1024
+    assert "공유로 절약: 240.0 MiB" in capsys.readouterr().out
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="/proc 필요")
+def test_forked_child_shares_parent_pages():
+    if memory_usage(os.getpid()) is None:
+        pytest.skip("smaps_rollup 없음")
+    # 부모에서 만든 큰 버퍼는 자식에서 읽기만 하면 공유 페이지로 남음
+    payload = bytearray(64 * 1024 * 1024)
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.write(write_fd, bytes(payload[-1:]))
+            time.sleep(2)
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    os.read(read_fd, 1)
+    try:
+        child = memory_usage(pid)
+        assert child["shared"] >= 60 * 1024
+        assert child["pss"] < child["rss"]
+    finally:
+        os.waitpid(pid, 0)
+
+
+@pytest.mark.parametrize("code, reload", [(0, True), (1, False)])
+def test_training_runs_as_polled_subprocess(code, reload):
+    master = Master(app=None, sock=None, workers=2, log_level="warning")
+    threads = threading.active_count()
+    # 학습 대신 바로 끝나는 서브프로세스 (마스터에 스레드가 생기지 않아야 학습 중 fork가 안전)
+    master.trainer = subprocess.Popen([sys.executable, "-c", f"raise SystemExit({code})"])
+    assert threading.active_count() == threads
+    master.trainer.wait()
+
+    master.poll_training()
+    assert master.trainer is None and master.reload_requested is reload
+
@@ -0,0 +1,21 @@
+import pytest
+from sqlalchemy import text
+from src.storage import create_configured_engine, get_pragmas
+
+
+def test_profile_pragmas_applied_on_connect(tmp_path):
+    engine = create_configured_engine(f"sqlite:///{tmp_path / 'wal.sqlite3'}", profile="production")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+    engine.dispose()
+
+
+def test_env_override_and_unknown_profile(monkeypatch):
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT", "250")
+    assert get_pragmas("production")["busy_timeout"] == "250"
+    assert get_pragmas("legacy") == {}
+    with pytest.raises(ValueError):
+        get_pragmas("nope")
@@ -0,0 +1,75 @@
+import random
+from datetime import datetime, timedelta
+from src import crud
+from src.database import User, Quest
+
+
+def full_scan_streak(dates, today):
+    """기존 calculate_streak_days의 전체 스캔 알고리즘 (비교 기준). (현재 스트릭, 최장 스트릭) 반환"""
+    if not dates:
+        return 0, 0
+
+    dates = sorted(dates)
+    streak = 1
+    max_streak = 1
+
+    for i in range(1, len(dates)):
+        if (dates[i] - dates[i - 1]) == timedelta(days=1):
+            streak += 1
+        elif dates[i] != dates[i - 1]:
+            streak = 1
+        max_streak = max(max_streak, streak)
+
+    if dates[-1] < today - timedelta(days=1):
+        return 0, max_streak
+    return streak, max_streak
+
+
+def simulate(db, rng, user_id, steps=60):
+    db.add(User(id=user_id, name=f"user{user_id}", email=f"user{user_id}@test.local"))
+    db.flush()
+
+    now = datetime(2025, 1, 1, 9, 0, 0)
+    open_quests, completed_at = [], {}
+
+    for _ in range(steps):
+        roll = rng.random()
+        if roll < 0.3:
+            now += timedelta(days=rng.choice([1, 1, 1, 2, 3]))
+        elif roll < 0.75 or not completed_at:
+            if not open_quests:
+                quest = Quest(user_id=user_id, name="퀘스트", duration=7, difficulty=3)
+                db.add(quest)
+                db.flush()
+                open_quests.append(quest)
+            quest = open_quests.pop(rng.randrange(len(open_quests)))
+            crud.log_quest_history(db, quest, "completed", progress=1.0, timestamp=now)
+            completed_at[quest] = now.date()
+        else:
+            quest = rng.choice(list(completed_at))
+            crud.log_quest_history(db, quest, "reopened", timestamp=now)
+            del completed_at[quest]
+            open_quests.append(quest)
+
+        now += timedelta(minutes=1)
+        db.commit()
+
+        user = db.get(User, user_id)
+        for today in (now.date(), now.date() + timedelta(days=1), now.date() + timedelta(days=2)):
+            expected_current, expected_longest = full_scan_streak(list(completed_at.values()), today)
+            assert crud.current_streak(user, today=today) == expected_current
+        assert (user.longest_streak or 0) == expected_longest
+
+
+def test_incremental_streak_matches_full_scan(db):
+    for seed in range(60):
+        simulate(db, random.Random(seed), user_id=seed + 1)
+
+
+def test_recompute_matches_incremental_state(db):
+    simulate(db, random.Random(123), user_id=1)
+    user = db.get(User, 1)
+    state = (user.streak_days, user.last_active_date, user.longest_streak)
+
+    crud.recompute_streak_state(db, 1)
+    assert (user.streak_days, user.last_active_date, user.longest_streak) == state
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.thread_budget import budget, limit_estimator_jobs
+
+
+@pytest.fixture(autouse=True)
+def no_overrides(monkeypatch):
+    for name in ("THREADS_TORCH", "THREADS_BLAS", "THREADS_N_JOBS", "THREADS_RESERVED"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_budget_per_role():
+    assert budget("server", cores=16, workers=4) == {"torch": 1, "blas": 1, "n_jobs": 1}
+    assert budget("inference", cores=16, workers=4)["torch"] == 4
+    assert budget("inference", cores=2, workers=4)["torch"] == 1
+    assert budget("trainer", cores=16, workers=4, reserved=4)["n_jobs"] == 12
+    assert budget("trainer", cores=2, workers=1, reserved=4)["n_jobs"] == 1
+    with pytest.raises(ValueError):
+        budget("gpu")
+
+
+def test_env_override_wins(monkeypatch):
+    monkeypatch.setenv("THREADS_TORCH", "3")
+    assert budget("server", cores=16, workers=1) == {"torch": 3, "blas": 1, "n_jobs": 1}
+
+
+def test_limit_estimator_jobs_reaches_calibrated_forests():
+    rng = np.random.default_rng(0)
+    X, y = rng.normal(size=(60, 4)), np.array([0, 1] * 30)
+    model = Pipeline([
+        ("pre", StandardScaler()),
+        ("clf", CalibratedClassifierCV(RandomForestClassifier(n_estimators=5, n_jobs=-1, random_state=0), cv=3)),
+    ]).fit(X, y)
+
+    assert limit_estimator_jobs(model, 1) >= 4
+    calibrated = model.named_steps["clf"].calibrated_classifiers_
+    assert [c.estimator.n_jobs for c in calibrated] == [1, 1, 1]
+    assert model.predict_proba(X[:1]).shape == (1, 2)
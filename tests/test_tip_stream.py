@@ -0,0 +1,133 @@
+import asyncio
+import json
+import time
+import pytest
+from fastapi.testclient import TestClient
+from benchmarks.gemini_stub import GeminiStub
+from src import ai_recommend, main
+from src.database import Base, engine
+
+PROFILE = dict(consistency_score=3, risk_aversion_score=2, total_quests=12, completed_quests=7)
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    server = GeminiStub(chunk_delay=0.05).start()
+    monkeypatch.setenv("GEMINI_BASE_URL", server.base_url)
+    monkeypatch.setattr(ai_recommend, "GEMINI_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(ai_recommend, "AI_COACH_TIER", "gemini")
+    ai_recommend.reset_gemini_client()
+    try:
+        yield server
+    finally:
+        server.stop()
+        monkeypatch.delenv("GEMINI_BASE_URL")
+        ai_recommend.reset_gemini_client()
+
+
+def read_events(res):
+    events = []
+    for block in res.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_tip_streams_tokens_then_done(stub):
+    Base.metadata.create_all(bind=engine)
+    client = TestClient(main.app, cookies={"user_id": "1"})
+    params = {"quest_name": "아침 독서", "duration": 5, "difficulty": 2}
+
+    res = client.get("/recommend/tip/stream", params=params)
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+    events = read_events(res)
+    tokens = [data["text"] for event, data in events if event == "token"]
+    assert len(tokens) > 1 and events[-1][0] == "done"
+    assert "".join(tokens) == stub.reply_for(stub.prompts[0])
+
+    # 완성된 응답은 캐시되어 다음 요청은 업스트림 호출 없이 한 번에 전송
+    again = read_events(client.get("/recommend/tip/stream", params=params))
+    assert [data["text"] for event, data in again if event == "token"] == ["".join(tokens)]
+    assert stub.requests == 1
+
+
+def test_closing_stream_early_aborts_upstream(stub):
+    async def read_two_chunks():
+        tokens = ai_recommend.stream_ai_recommendation("저녁 산책", 3, 1, **PROFILE)
+        received = [await tokens.__anext__(), await tokens.__anext__()]
+        await tokens.aclose()
+        return received
+
+    assert len(asyncio.run(read_two_chunks())) == 2
+    deadline = time.monotonic() + 3
+    while stub.aborted_streams == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert stub.aborted_streams == 1 and stub.completed_streams == 0
+    # 끝까지 받지 못한 응답은 캐시하지 않음
+    key = ai_recommend.prompt_fingerprint("저녁 산책", 3, 1, ai_recommend.bucket_profile(12, 7, 3, 2))
+    assert ai_recommend.cache_get(key) is None
+
+
+async def collect(tokens, limit=None):
+    received = []
+    async for text in tokens:
+        received.append(text)
+        if limit and len(received) == limit:
+            break
+    await tokens.aclose()
+    return received
+
+
+def test_concurrent_identical_prompts_share_one_stream(stub):
+    async def burst():
+        return await asyncio.gather(*[
+            collect(ai_recommend.stream_ai_recommendation(f"독서 {i % 2}", 5, 2, **PROFILE)) for i in range(6)
+        ])
+
+    results = ["".join(tokens) for tokens in asyncio.run(burst())]
+    assert len(set(results)) == 2
+    assert stub.requests == 2 and stub.completed_streams == 2
+    assert set(results) == {stub.reply_for(prompt) for prompt in stub.prompts}
+
+
+def test_shared_stream_survives_one_subscriber_leaving(stub):
+    async def run():
+        first = ai_recommend.stream_ai_recommendation("요가 20분", 7, 2, **PROFILE)
+        second = ai_recommend.stream_ai_recommendation("요가 20분", 7, 2, **PROFILE)
+        # 먼저 떠나는 구독자가 있어도 남은 구독자는 끝까지 받음
+        return await asyncio.gather(collect(first, limit=1), collect(second))
+
+    early, full = asyncio.run(run())
+    assert len(early) == 1
+    assert "".join(full) == stub.reply_for(stub.prompts[0])
+    assert stub.requests == 1 and stub.aborted_streams == 0
+
+
+def test_slow_reader_does_not_hold_concurrency_slot(stub, monkeypatch):
+    monkeypatch.setattr(ai_recommend, "GEMINI_MAX_CONCURRENCY", 1)
+
+    async def run():
+        # 첫 번째 스트림은 첫 조각만 읽고 멈춘 느린 클라이언트
+        slow = ai_recommend.stream_ai_recommendation("저녁 산책", 3, 1, **PROFILE)
+        await slow.__anext__()
+        try:
+            fast = ai_recommend.stream_ai_recommendation("아침 독서", 5, 2, **PROFILE)
+            first = await asyncio.wait_for(fast.__anext__(), 2)
+            await fast.aclose()
+            return first
+        finally:
+            await slow.aclose()
+
+    first = asyncio.run(run())
+    assert stub.reply_for(stub.prompts[1]).startswith(first)
+
+
+def test_local_tier_streams_single_local_tip(monkeypatch):
+    monkeypatch.setattr(ai_recommend, "AI_COACH_TIER", "local")
+    Base.metadata.create_all(bind=engine)
+    client = TestClient(main.app, cookies={"user_id": "1"})
+    res = client.get("/recommend/tip/stream", params={"quest_name": "요가 20분", "duration": 7, "difficulty": 2, "category": "exercise"})
+    events = read_events(res)
+    assert [event for event, _ in events] == ["token", "done"]
+    assert "'스트레칭 10분'" in events[0][1]["text"] or "함께 해볼 만한 퀘스트" in events[0][1]["text"]
@@ -0,0 +1,83 @@
+import importlib.util
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from src import main, view_cache
+from src.database import Base, SessionLocal, engine, User, Quest
+from src.main import app
+
+
+def make_user_with_quest(name="cache-user"):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(name=name, email=f"{name}@test.local")
+        db.add(user)
+        db.flush()
+        quest = Quest(user_id=user.id, name="물 2L 마시기", category="health", duration=3, difficulty=1)
+        db.add(quest)
+        db.commit()
+        return user.id, quest.id
+    finally:
+        db.close()
+
+
+def test_conditional_get_only_checks_version_until_mutation():
+    user_id, quest_id = make_user_with_quest()
+    client = TestClient(app, cookies={"user_id": str(user_id)})
+
+    first = client.get("/quests/list")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        repeat = client.get("/quests/list", headers={"If-None-Match": etag})
+        cached = client.get("/quests/list")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert repeat.status_code == 304
+    assert cached.status_code == 200 and cached.text == first.text
+    # 요청마다 users.view_version PK 조회 한 번만
+    assert len(statements) == 2 and all("view_version" in s and "FROM users" in s for s in statements)
+
+    assert client.patch(f"/quests/{quest_id}/toggle").status_code == 200
+    after = client.get("/quests/list", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["etag"] != etag
+    assert "✅ 완료" in after.text
+
+
+def test_entry_is_only_served_for_its_version():
+    assert view_cache.put(999, 2, "<html>v2</html>")
+    # 렌더링 중 버전이 바뀐 이전 렌더링은 새 항목을 덮어쓰지 않음
+    assert not view_cache.put(999, 1, "<html>v1</html>")
+    assert view_cache.get(999, 2)["body"] == "<html>v2</html>"
+    assert view_cache.get(999, 3) is None
+    assert view_cache.get(999, 2) is None
+
+
+def test_write_on_another_worker_invalidates_cached_list(monkeypatch):
+    # 워커 B의 캐시 = 같은 모듈을 따로 로드한 인스턴스 (워커 A는 src.view_cache)
+    spec = importlib.util.spec_from_file_location("view_cache_worker_b", view_cache.__file__)
+    worker_b = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(worker_b)
+
+    user_id, quest_id = make_user_with_quest("cache-user-b")
+    client = TestClient(app, cookies={"user_id": str(user_id)})
+
+    monkeypatch.setattr(main, "view_cache", worker_b)
+    before = client.get("/quests/list")
+    assert before.status_code == 200 and "완료: 0" in before.text
+    assert worker_b._entries
+
+    # 토글은 워커 A가 처리 (워커 B의 메모리는 건드리지 않음)
+    monkeypatch.setattr(main, "view_cache", view_cache)
+    assert client.patch(f"/quests/{quest_id}/toggle").status_code == 200
+
+    monkeypatch.setattr(main, "view_cache", worker_b)
+    after = client.get("/quests/list", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200 and "완료: 1" in after.text
+    assert after.headers["etag"] != before.headers["etag"]